@@ -0,0 +1,409 @@
+#!/bin/bash
+set -euo pipefail
+
+# Benchmark harness for the marketplace tooling
+#
+# Generates synthetic marketplaces (N plugins, each with M skills, agents,
+# commands and hooks.json entries, laid out like senior-engineer/), runs the
+# tools against them and reports wall time, peak RSS and child-process spawns.
+#
+# Usage: ./scripts/benchmark.sh [options]
+#   --sizes LIST       Plugin counts to generate (default: 10,100,1000)
+#   --components M     Skills/agents/commands/hooks per plugin (default: 3)
+#   --tools LIST       validate,doctor,integration (default: all three)
+#   --runs R           Timed runs per tool and size; the median is reported (default: 3)
+#   --jobs N           Passed through as --jobs to every tool (default: 1)
+#   --warm             Keep tool caches between runs (default: every run is cold)
+#   --output FILE      Where to write results JSON (default: .cache/benchmark/results.json)
+#   --baseline FILE    Compare against an earlier results file; exit 1 on regression
+#   --threshold PCT    Allowed slowdown/growth vs. the baseline (default: 20)
+#
+# Measurement:
+#   wall time   $EPOCHREALTIME (bash 5) or GNU date
+#   peak RSS    GNU time (%M, /usr/bin/time or gtime); largest single process,
+#               reported as n/a without GNU time
+#   spawns      strace -f (forks, excluding threads) in one extra untimed run;
+#               without strace, the system-wide PID delta from /proc/loadavg (approximate)
+#
+# Generated marketplaces are kept in .cache/benchmark/ and reused. Each run copies
+# the working-tree scripts/ into them, so local changes are what gets measured:
+#   ./scripts/benchmark.sh --output baseline.json          # on main
+#   ./scripts/benchmark.sh --baseline baseline.json        # on your branch
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
+# Colors
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+BLUE='\033[0;34m'
+NC='\033[0m'
+
+GENERATOR_VERSION=1
+BENCH_DIR="${BENCHMARK_DIR:-$MARKETPLACE_ROOT/.cache/benchmark}"
+SIZES="10,100,1000"
+COMPONENTS=3
+TOOLS="validate,doctor,integration"
+RUNS=3
+JOBS=1
+WARM=false
+OUTPUT_FILE="$BENCH_DIR/results.json"
+BASELINE=""
+THRESHOLD=20
+USAGE="Usage: $0 [--sizes LIST] [--components M] [--tools LIST] [--runs R] [--jobs N] [--warm] [--output FILE] [--baseline FILE] [--threshold PCT]"
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --sizes|--components|--tools|--runs|--jobs|--output|--baseline|--threshold)
+            [ $# -ge 2 ] || { echo "$USAGE"; exit 1; }
+            case "$1" in
+                --sizes) SIZES="$2" ;;
+                --components) COMPONENTS="$2" ;;
+                --tools) TOOLS="$2" ;;
+                --runs) RUNS="$2" ;;
+                --jobs) JOBS="$2" ;;
+                --output) OUTPUT_FILE="$2" ;;
+                --baseline) BASELINE="$2" ;;
+                --threshold) THRESHOLD="$2" ;;
+            esac
+            shift ;;
+        --warm) WARM=true ;;
+        -h|--help) echo "$USAGE"; exit 0 ;;
+        *) echo -e "${RED}Unknown option: $1${NC}"; echo "$USAGE"; exit 1 ;;
+    esac
+    shift
+done
+
+for value in "$COMPONENTS" "$RUNS" "$THRESHOLD"; do
+    if [[ ! "$value" =~ ^[0-9]+$ ]]; then
+        echo -e "${RED}Expected a number, got '$value'${NC}"
+        exit 1
+    fi
+done
+[ "$RUNS" -ge 1 ] || RUNS=1
+JOBS=$(resolve_jobs "$JOBS") || exit 1
+IFS=',' read -ra SIZE_LIST <<< "$SIZES"
+IFS=',' read -ra TOOL_LIST <<< "$TOOLS"
+for tool in "${TOOL_LIST[@]}"; do
+    case "$tool" in
+        validate|doctor|integration) ;;
+        *) echo -e "${RED}Unknown tool '$tool' (expected validate, doctor, integration)${NC}"; exit 1 ;;
+    esac
+done
+if [ -n "$BASELINE" ] && [ ! -f "$BASELINE" ]; then
+    echo -e "${RED}Baseline not found: $BASELINE${NC}"
+    exit 1
+fi
+
+# ─── Measurement backends ───────────────────────────────────────────
+STRACE=$(command -v strace || true)
+if [ -n "$STRACE" ] && ! "$STRACE" -f -qq -o /dev/null true >/dev/null 2>&1; then
+    STRACE=""  # e.g. ptrace not permitted in this container
+fi
+
+detect_rss_method
+if [ -n "$STRACE" ]; then
+    SPAWN_METHOD="strace"
+elif [ -r /proc/loadavg ]; then
+    SPAWN_METHOD="pid-delta"
+else
+    SPAWN_METHOD="none"
+fi
+
+last_pid() {
+    local load1 load5 load15 running pid
+    read -r load1 load5 load15 running pid < /proc/loadavg
+    LAST_PID=$pid
+}
+
+# measure <log> <cmd...>: sets M_WALL_US, M_RSS_KB ("" if unknown), M_EXIT
+measure() {
+    local log="$1"
+    shift
+    local start rc=0
+    M_RSS_KB=""
+
+    now_us; start=$NOW_US
+    run_with_rss "$WORK/rss" "$@" > "$log" 2>&1 || rc=$?
+    now_us
+    M_WALL_US=$((NOW_US - start))
+    M_EXIT=$rc
+    M_RSS_KB=$(tail -n 1 "$WORK/rss" | tr -dc '0-9')
+}
+
+# count_spawns <cmd...>: prints the number of processes the command forked
+count_spawns() {
+    if [ "$SPAWN_METHOD" = "strace" ]; then
+        "$STRACE" -f -qq -o "$WORK/trace" -e trace=process "$@" > /dev/null 2>&1 || true
+        # clone() without CLONE_THREAD, fork() and vfork(); "resumed" lines are continuations
+        awk '/(clone3?|v?fork)\(/ && !/CLONE_THREAD/ && !/resumed>/ && !/= -1 / { n++ } END { print n + 0 }' "$WORK/trace"
+    fi
+}
+
+# ─── Synthetic marketplace generator ────────────────────────────────
+BODY=""
+for i in 1 2 3 4 5 6 7 8; do
+    BODY="${BODY}## Step $i
+
+Read every file in the target area before changing anything. Map imports,
+state flow and framework entry points, then compare them against the current
+documentation. Record each finding with a file:line reference and a severity.
+"$'\n'
+done
+
+HOOK_EVENTS=(PreToolUse PostToolUse SessionStart Stop UserPromptSubmit)
+
+generate_plugin() {
+    local root="$1" name="$2" m="$3"
+    local dir="$root/$name"
+    local i e skills="" agents="" hooks="" hook
+    local groups=() dirs=("$dir/.claude-plugin" "$dir/agents" "$dir/commands" "$dir/hooks")
+
+    for ((i = 1; i <= m; i++)); do dirs+=("$dir/skills/skill-$i"); done
+    mkdir -p "${dirs[@]}"
+    for ((i = 1; i <= m; i++)); do
+        printf -- '---\nname: skill-%d\ndescription: >\n  Synthetic skill %d for %s. Reads all files in the target area, maps\n  dependencies and state flow, and ranks structural issues by criticality.\nargument-hint: "[module or directory]"\nuser-invocable: true\n---\n\n# Skill %d\n\n%s' \
+            "$i" "$i" "$name" "$i" "$BODY" > "$dir/skills/skill-$i/SKILL.md"
+        printf -- '---\nname: agent-%d\ndescription: "Synthetic agent %d — explores the codebase and returns a dependency map."\ntools:\n  - Read\n  - Grep\n  - Glob\nmodel: sonnet\npermissionMode: plan\nskills:\n  - skill-%d\n---\n\n# Agent %d\n\n%s' \
+            "$i" "$i" "$i" "$i" "$BODY" > "$dir/agents/agent-$i.md"
+        printf -- '---\ndescription: Synthetic command %d\nargument-hint: "[target]"\n---\n\nRun skill-%d against $ARGUMENTS.\n' \
+            "$i" "$i" > "$dir/commands/command-$i.md"
+        printf '#!/bin/bash\ncat > /dev/null\nexit 0\n' > "$dir/hooks/hook-$i.sh"
+
+        skills="$skills${skills:+, }\"./skills/skill-$i\""
+        agents="$agents${agents:+, }\"./agents/agent-$i.md\""
+
+        # Hooks cycle through the events; each event holds a list of groups
+        e=$(( (i - 1) % ${#HOOK_EVENTS[@]} ))
+        hook="{\"hooks\": [{\"type\": \"command\", \"command\": \"\${CLAUDE_PLUGIN_ROOT}/hooks/hook-$i.sh\"}]}"
+        case "${HOOK_EVENTS[$e]}" in
+            PreToolUse|PostToolUse) hook="{\"matcher\": \"Bash\", ${hook#\{}" ;;
+        esac
+        groups[$e]="${groups[$e]:-}${groups[$e]:+, }$hook"
+    done
+    for e in "${!HOOK_EVENTS[@]}"; do
+        [ -n "${groups[$e]:-}" ] || continue
+        hooks="$hooks${hooks:+,
+    }\"${HOOK_EVENTS[$e]}\": [${groups[$e]}]"
+    done
+
+    printf '{\n  "name": "%s",\n  "version": "1.0.0",\n  "description": "Synthetic benchmark plugin",\n  "author": {"name": "Benchmark"},\n  "skills": [%s],\n  "agents": [%s]\n}\n' \
+        "$name" "$skills" "$agents" > "$dir/.claude-plugin/plugin.json"
+    printf '{\n  "hooks": {\n    %s\n  }\n}\n' "$hooks" > "$dir/hooks/hooks.json"
+}
+
+generate_marketplace() {
+    local root="$1" n="$2" m="$3"
+    local i name entries=""
+
+    echo -e "${BLUE}Generating synthetic marketplace: $n plugins × $m components → $root${NC}"
+    rm -rf "$root"
+    mkdir -p "$root/.claude-plugin"
+    for ((i = 1; i <= n; i++)); do
+        printf -v name 'bench-plugin-%04d' "$i"
+        generate_plugin "$root" "$name" "$m"
+        entries="$entries${entries:+,
+    }{\"name\": \"$name\", \"description\": \"Synthetic benchmark plugin\", \"version\": \"1.0.0\", \"source\": \"./$name\", \"category\": \"workflows\"}"
+    done
+    printf '{\n  "name": "flight505-plugins",\n  "version": "1.0.0",\n  "owner": {"name": "Benchmark"},\n  "plugins": [\n    %s\n  ]\n}\n' \
+        "$entries" > "$root/.claude-plugin/marketplace.json"
+
+    find "$root" -name '*.sh' -path '*/hooks/*' -exec chmod +x {} +
+
+    git -C "$root" init -q
+    git -C "$root" add -A
+    git -C "$root" -c user.name=benchmark -c user.email=benchmark@localhost commit -q -m "synthetic marketplace"
+    touch "$root/.generated"
+}
+
+# Fake $HOME where every plugin is "installed" from its source directory, and a
+# claude stub so the doctor measures this repo's code rather than the CLI
+prepare_home() {
+    local root="$1" n="$2"
+    local home="$root/.bench-home" sha i name installed=""
+    mkdir -p "$home/.claude/plugins" "$root/.bench-bin"
+    printf '#!/bin/sh\nexit 0\n' > "$root/.bench-bin/claude"
+    chmod +x "$root/.bench-bin/claude"
+    sha=$(git -C "$root" rev-parse HEAD)
+    echo '{"flight505-plugins": {"source": {"source": "directory"}}}' > "$home/.claude/plugins/known_marketplaces.json"
+    for ((i = 1; i <= n; i++)); do
+        printf -v name 'bench-plugin-%04d' "$i"
+        installed="$installed${installed:+,}\"$name@flight505-plugins\": [{\"version\": \"1.0.0\", \"installPath\": \"$root/$name\", \"gitCommitSha\": \"$sha\"}]"
+    done
+    printf '{"version": 2, "plugins": {%s}}\n' "$installed" > "$home/.claude/plugins/installed_plugins.json"
+}
+
+prepare_root() {
+    local n="$1"
+    local root="$BENCH_DIR/mp-$n-$COMPONENTS-g$GENERATOR_VERSION"
+    if [ ! -f "$root/.generated" ]; then
+        generate_marketplace "$root" "$n" "$COMPONENTS"
+        prepare_home "$root" "$n"
+    fi
+    rm -rf "$root/scripts"
+    cp -R "$SCRIPT_DIR" "$root/scripts"
+    ROOT="$root"
+}
+
+tool_command() {
+    local tool="$1" root="$2"
+    local base=(env -u MARKETPLACE_ROOT -u COMPONENT_CATALOG_DIR -u VALIDATE_CACHE_DIR -u DOCTOR_INDEX_DIR)
+    case "$tool" in
+        validate)
+            CMD=("${base[@]}" "$root/scripts/validate-plugin-manifests.sh" --jobs "$JOBS") ;;
+        doctor)
+            CMD=("${base[@]}" HOME="$root/.bench-home" PATH="$root/.bench-bin:$PATH"
+                 "$root/scripts/plugin-doctor.sh" --jobs "$JOBS") ;;
+        integration)
+            CMD=("${base[@]}" PATH="$root/.bench-bin:$PATH" TMPDIR="$WORK"
+                 "$root/scripts/test-marketplace-integration.sh" --jobs "$JOBS") ;;
+    esac
+}
+
+reset_caches() {
+    [ "$WARM" = true ] && return 0
+    rm -rf "$1/.cache"
+}
+
+# ─── Run ────────────────────────────────────────────────────────────
+mkdir -p "$BENCH_DIR" "$(dirname "$OUTPUT_FILE")"
+rm -f "$BENCH_DIR"/*.log
+WORK="$(mktemp -d "${TMPDIR:-/tmp}/benchmark.XXXXXX")"
+trap 'rm -rf "$WORK"' EXIT
+RESULTS="$WORK/results.tsv"
+: > "$RESULTS"
+
+echo -e "${BLUE}Benchmark: sizes=$SIZES components=$COMPONENTS tools=$TOOLS runs=$RUNS jobs=$JOBS${NC}"
+echo -e "${BLUE}Peak RSS: $RSS_METHOD  spawns: $SPAWN_METHOD${NC}"
+[ "$RSS_METHOD" = "unavailable" ] && echo -e "${YELLOW}GNU time not found — peak RSS is reported as n/a (install the time / gnu-time package)${NC}"
+[ "$SPAWN_METHOD" = "pid-delta" ] && echo -e "${YELLOW}strace not available — spawn counts are a system-wide PID delta (approximate)${NC}"
+echo ""
+printf '%-12s %8s %10s %10s %10s %8s %5s\n' "tool" "plugins" "wall_ms" "min_ms" "rss_kb" "spawns" "exit"
+
+for n in "${SIZE_LIST[@]}"; do
+    if [[ ! "$n" =~ ^[0-9]+$ ]] || [ "$n" -lt 1 ]; then
+        echo -e "${RED}Invalid size '$n'${NC}"
+        exit 1
+    fi
+    prepare_root "$n"
+    for tool in "${TOOL_LIST[@]}"; do
+        tool_command "$tool" "$ROOT"
+        walls=() rss_max="" exit_code=0 spawns=""
+
+        for ((run = 1; run <= RUNS; run++)); do
+            reset_caches "$ROOT"
+            [ "$SPAWN_METHOD" = "pid-delta" ] && [ "$run" -eq 1 ] && last_pid && pid_before=$LAST_PID
+            measure "$WORK/$tool-$n.log" "${CMD[@]}"
+            if [ "$SPAWN_METHOD" = "pid-delta" ] && [ "$run" -eq 1 ]; then
+                last_pid
+                # Minus the measurement wrapper itself; wraps at pid_max
+                spawns=$(( LAST_PID - pid_before - 1 ))
+                [ "$spawns" -lt 0 ] && spawns=$(( spawns + $(cat /proc/sys/kernel/pid_max 2>/dev/null || echo 32768) ))
+            fi
+            walls+=("$M_WALL_US")
+            [ "$M_EXIT" -ne 0 ] && exit_code=$M_EXIT
+            if [ -n "$M_RSS_KB" ] && { [ -z "$rss_max" ] || [ "$M_RSS_KB" -gt "$rss_max" ]; }; then
+                rss_max=$M_RSS_KB
+            fi
+        done
+
+        if [ "$SPAWN_METHOD" = "strace" ]; then
+            reset_caches "$ROOT"
+            spawns=$(count_spawns "${CMD[@]}")
+        fi
+
+        sorted=($(printf '%s\n' "${walls[@]}" | sort -n))
+        median_ms=$(( sorted[${#sorted[@]} / 2] / 1000 ))
+        min_ms=$(( sorted[0] / 1000 ))
+        printf '%-12s %8s %10s %10s %10s %8s %5s\n' "$tool" "$n" "$median_ms" "$min_ms" "${rss_max:-n/a}" "${spawns:--}" "$exit_code"
+        printf '%s\t%s\t%s\t%s\t%s\t%s\t%s\n' "$tool" "$n" "$median_ms" "$min_ms" "$rss_max" "$spawns" "$exit_code" >> "$RESULTS"
+        if [ "$exit_code" -ne 0 ]; then
+            cp "$WORK/$tool-$n.log" "$BENCH_DIR/$tool-$n.log"
+        fi
+    done
+done
+
+jq -R -s \
+    --argjson generator "$GENERATOR_VERSION" \
+    --argjson components "$COMPONENTS" \
+    --argjson runs "$RUNS" \
+    --argjson jobs "$JOBS" \
+    --arg spawn_method "$SPAWN_METHOD" \
+    --arg rss_method "$RSS_METHOD" \
+    --arg host "$(uname -srm)" \
+    --arg cpus "$(cpu_count)" \
+    --arg commit "$(git -C "$MARKETPLACE_ROOT" rev-parse --short HEAD 2>/dev/null || echo unknown)" '
+    def num: if . == "" then null else tonumber end;
+    {
+      generator: $generator,
+      commit: $commit,
+      host: $host,
+      cpus: ($cpus | tonumber),
+      components: $components,
+      runs: $runs,
+      jobs: $jobs,
+      spawn_method: $spawn_method,
+      rss_method: $rss_method,
+      results: [split("\n")[] | select(length > 0) | split("\t") | {
+        tool: .[0],
+        plugins: (.[1] | tonumber),
+        wall_ms: (.[2] | tonumber),
+        wall_ms_min: (.[3] | tonumber),
+        peak_rss_kb: (.[4] | num),
+        spawns: (.[5] | num),
+        exit_code: (.[6] | tonumber)
+      }]
+    }' "$RESULTS" > "$OUTPUT_FILE"
+
+echo ""
+echo -e "${BLUE}Results written to $OUTPUT_FILE${NC}"
+if ls "$BENCH_DIR"/*.log >/dev/null 2>&1; then
+    echo -e "${YELLOW}Non-zero exits: logs in $BENCH_DIR/*.log${NC}"
+fi
+
+[ -z "$BASELINE" ] && exit 0
+
+# ─── Baseline comparison ────────────────────────────────────────────
+echo ""
+echo -e "${BLUE}Comparing against $BASELINE (threshold ${THRESHOLD}%)${NC}"
+rows=$(jq -r -n --slurpfile cur "$OUTPUT_FILE" --slurpfile base "$BASELINE" --argjson threshold "$THRESHOLD" '
+    $cur[0] as $c | $base[0] as $b
+    | ($b.results | map({key: "\(.tool)/\(.plugins)", value: .}) | from_entries) as $old
+    | if $c.components != $b.components or $c.generator != $b.generator then
+        ["skip", "baseline uses a different synthetic marketplace (components/generator)"] | @tsv
+      else
+        $c.results[] | . as $r | $old["\($r.tool)/\($r.plugins)"] // empty | . as $o
+        | ["wall_ms"]
+          + (if $c.rss_method == $b.rss_method then ["peak_rss_kb"] else [] end)
+          + (if $c.spawn_method == $b.spawn_method and $c.spawn_method == "strace" then ["spawns"] else [] end)
+        | .[] as $metric
+        | select($r[$metric] != null and $o[$metric] != null)
+        | (if $o[$metric] > 0 then (($r[$metric] - $o[$metric]) * 100 / $o[$metric]) else 0 end) as $pct
+        | [$r.tool, ($r.plugins | tostring), $metric, ($o[$metric] | tostring), ($r[$metric] | tostring),
+           ($pct | floor | tostring), (if $pct > $threshold then "REGRESSION" else "ok" end)]
+        | @tsv
+      end')
+
+regressions=0
+printf '%-12s %8s %-12s %10s %10s %7s\n' "tool" "plugins" "metric" "baseline" "current" "change"
+while IFS=$'\t' read -r tool n metric old new pct status; do
+    [ -z "$tool" ] && continue
+    if [ "$tool" = "skip" ]; then
+        echo -e "${YELLOW}Skipped: $n${NC}"
+        continue
+    fi
+    if [ "$status" = "REGRESSION" ]; then
+        regressions=$((regressions + 1))
+        printf "${RED}%-12s %8s %-12s %10s %10s %6s%%  REGRESSION${NC}\n" "$tool" "$n" "$metric" "$old" "$new" "$pct"
+    else
+        printf '%-12s %8s %-12s %10s %10s %6s%%\n' "$tool" "$n" "$metric" "$old" "$new" "$pct"
+    fi
+done <<< "$rows"
+
+echo ""
+if [ "$regressions" -gt 0 ]; then
+    echo -e "${RED}❌ $regressions metric(s) regressed by more than ${THRESHOLD}%${NC}"
+    exit 1
+fi
+echo -e "${GREEN}✅ No regressions beyond ${THRESHOLD}%${NC}"
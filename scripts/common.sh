@@ -33,3 +33,301 @@ is_valid_plugin() {
     local name="$1"
     get_plugins | grep -qx "$name"
 }
+
+# Number of online CPUs (Linux and macOS)
+cpu_count() {
+    getconf _NPROCESSORS_ONLN 2>/dev/null || sysctl -n hw.ncpu 2>/dev/null || echo 1
+}
+
+# Normalize a --jobs value: 0 means one worker per CPU
+resolve_jobs() {
+    local jobs="$1"
+    if [[ ! "$jobs" =~ ^[0-9]+$ ]]; then
+        echo "Invalid --jobs value '$jobs' (expected a number, 0 = all cores)" >&2
+        return 1
+    fi
+    [ "$jobs" -eq 0 ] && jobs=$(cpu_count)
+    echo "$jobs"
+}
+
+# Run "<func> <plugin>" for every plugin on a pool of <jobs> workers.
+# Usage: run_plugins_parallel <jobs> "<COUNTER ...>" <func> <plugin>...
+#
+# Workers are subshells whose stdout/stderr is buffered and replayed in
+# argument order (i.e. marketplace.json order), so the merged log is identical
+# from run to run. The named integer counters (e.g. "ERRORS_FOUND
+# WARNINGS_FOUND") are merged back by adding each worker's delta, and exit
+# codes are stored in PLUGIN_POOL_STATUS[] in the same order. With <jobs> = 1
+# each call runs in a foreground subshell, unbuffered, one after the other.
+#
+# The function runs under the caller's `set -e`, so a failing command inside
+# it stops that plugin's check just as it would stop a plain loop. If any call
+# exits non-zero, run_plugins_parallel returns that status once every plugin
+# has run; callers that inspect PLUGIN_POOL_STATUS themselves set
+# PLUGIN_POOL_ALLOW_FAILURES=1. Never call it from an `if`, `!`, `&&` or `||`
+# context: bash turns `set -e` off for everything run from there.
+#
+# Inside a buffered worker (<jobs> > 1) PLUGIN_POOL_WORKER=1; its output only
+# reaches the terminal when the buffer is replayed. Set PLUGIN_POOL_REPLAY to a
+# function name to replay buffers yourself; it is called as
+# "<fn> <buffer> <plugin>".
+run_plugins_parallel() {
+    local jobs="$1" counters="$2" func="$3"
+    shift 3
+    local plugins=("$@")
+    local count=${#plugins[@]}
+    local errexit=false i
+    PLUGIN_POOL_STATUS=()
+    [ "$count" -gt 0 ] || return 0
+    case $- in *e*) errexit=true ;; esac
+
+    local pool_dir
+    pool_dir="$(mktemp -d "${TMPDIR:-/tmp}/plugin-pool.XXXXXX")"
+
+    if [ "$jobs" -le 1 ] || [ "$count" -le 1 ]; then
+        for ((i = 0; i < count; i++)); do
+            # Capture the status without an `||`, which would disable set -e inside
+            set +e
+            ( [ "$errexit" = true ] && set -e; _plugin_pool_worker "$pool_dir/$i" "$counters" "$func" "${plugins[$i]}" )
+            [ "$errexit" = true ] && set -e
+            _plugin_pool_merge "$pool_dir/$i.meta" "$i"
+        done
+    else
+        local pids=()
+        local next=0 done_count=0
+
+        while [ "$done_count" -lt "$count" ]; do
+            # Keep up to $jobs workers running ahead of the next buffer to replay
+            while [ "$next" -lt "$count" ] && [ $((next - done_count)) -lt "$jobs" ]; do
+                { PLUGIN_POOL_WORKER=1; _plugin_pool_worker "$pool_dir/$next" "$counters" "$func" "${plugins[$next]}"; } \
+                    > "$pool_dir/$next.out" 2>&1 &
+                pids[$next]=$!
+                next=$((next + 1))
+            done
+
+            wait "${pids[$done_count]}" 2>/dev/null || true
+            if [ -n "${PLUGIN_POOL_REPLAY:-}" ]; then
+                "$PLUGIN_POOL_REPLAY" "$pool_dir/$done_count.out" "${plugins[$done_count]}"
+            else
+                cat "$pool_dir/$done_count.out"
+            fi
+            _plugin_pool_merge "$pool_dir/$done_count.meta" "$done_count"
+            done_count=$((done_count + 1))
+        done
+    fi
+
+    rm -rf "$pool_dir"
+
+    [ -n "${PLUGIN_POOL_ALLOW_FAILURES:-}" ] && return 0
+    for ((i = 0; i < count; i++)); do
+        if [ "${PLUGIN_POOL_STATUS[$i]}" -ne 0 ]; then
+            echo "$func ${plugins[$i]} exited with status ${PLUGIN_POOL_STATUS[$i]}" >&2
+            return "${PLUGIN_POOL_STATUS[$i]}"
+        fi
+    done
+    return 0
+}
+
+# Worker body (always in a subshell): run the function and, however the
+# subshell ends — return, exit or a set -e abort — record its exit code and
+# counter deltas
+_plugin_pool_worker() {
+    local c
+    _PLUGIN_POOL_META="$1.meta"
+    _PLUGIN_POOL_COUNTERS="$2"
+    _PLUGIN_POOL_BASE=()
+    for c in $_PLUGIN_POOL_COUNTERS; do _PLUGIN_POOL_BASE+=("${!c}"); done
+
+    trap '_plugin_pool_record $?' EXIT
+    "$3" "$4"
+}
+
+_plugin_pool_record() {
+    local rc="$1" c i=0
+    {
+        echo "status $rc"
+        for c in $_PLUGIN_POOL_COUNTERS; do
+            echo "$c $(( ${!c} - ${_PLUGIN_POOL_BASE[$i]} ))"
+            i=$((i + 1))
+        done
+    } > "$_PLUGIN_POOL_META"
+}
+
+_plugin_pool_merge() {
+    local meta="$1" index="$2" key value
+    if [ ! -f "$meta" ]; then
+        # Worker was killed before it could record a result
+        PLUGIN_POOL_STATUS[$index]=1
+        return 0
+    fi
+    while read -r key value; do
+        if [ "$key" = "status" ]; then
+            PLUGIN_POOL_STATUS[$index]=$value
+        else
+            printf -v "$key" '%d' $(( ${!key} + value ))
+        fi
+    done < "$meta"
+}
+
+# ─── Component catalog ──────────────────────────────────────────────
+# One JSON index per plugin directory of its skills, agents and commands:
+#   {plugin, root, components: [{kind, name, path, size, hash, body_bytes,
+#                                frontmatter, errors, warnings}]}
+# Frontmatter comes from a single pass of scripts/frontmatter.awk over every
+# component file (errors = malformed YAML, warnings = keys skipped as
+# unsupported, see frontmatter.awk); hashes are git blob SHAs. The cached file is rebuilt when a
+# component, directory or plugin.json under the plugin is newer than it.
+COMMON_SH="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/common.sh"
+CATALOG_PARSER="${COMMON_SH%/*}/frontmatter.awk"
+CATALOG_DIR="${COMPONENT_CATALOG_DIR:-$MARKETPLACE_ROOT/.cache/component-catalog}"
+
+# Print the path of an up-to-date catalog for a plugin directory
+component_catalog() {
+    local dir="$1"
+    local name catalog
+    name=$(basename "$dir")
+    if [ "$dir" = "$MARKETPLACE_ROOT/$name" ]; then
+        catalog="$CATALOG_DIR/$name.json"
+    else
+        catalog="$CATALOG_DIR/$name-$(printf '%s' "$dir" | git hash-object --stdin | cut -c1-12).json"
+    fi
+
+    if [ -f "$catalog" ] && [ ! "$CATALOG_PARSER" -nt "$catalog" ] && [ ! "$COMMON_SH" -nt "$catalog" ] \
+        && [ -z "$(find "$dir" \( -name node_modules -o -name .git \) -prune \
+            -o -newer "$catalog" \( -type d -o -name '*.md' -o -name plugin.json \) -print 2>/dev/null | head -n 1)" ]; then
+        echo "$catalog"
+        return 0
+    fi
+
+    _build_component_catalog "$dir" "$catalog" || return 1
+    echo "$catalog"
+}
+
+_build_component_catalog() {
+    local dir="$1" catalog="$2"
+    local work kind path
+    local kinds=() files=()
+
+    mkdir -p "$CATALOG_DIR" || return 1
+    work="$(mktemp -d "${TMPDIR:-/tmp}/catalog.XXXXXX")" || return 1
+    # Stamp the start time so edits made during the build still invalidate it
+    touch "$work/stamp"
+
+    # Components declared in plugin.json first (they may live anywhere), then
+    # the conventional skills/*/SKILL.md, agents/*.md and commands/*.md
+    while IFS=$'\t' read -r kind path; do
+        [ -n "$path" ] && [ -f "$dir/$path" ] || continue
+        case " ${files[*]+${files[*]}} " in *" $path "*) continue ;; esac
+        kinds+=("$kind")
+        files+=("$path")
+    done < <(
+        cd "$dir" || exit 0
+        jq -r '
+            def paths: if type == "string" then [.] elif type == "array" then map(strings) else [] end;
+            def rel: sub("^\\./"; "") | rtrimstr("/");
+            (.skills | paths[] | ["skill", (rel + "/SKILL.md")]),
+            (.agents | paths[] | ["agent", rel]),
+            (.commands | arrays | paths[] | ["command", rel])
+            | @tsv' .claude-plugin/plugin.json 2>/dev/null || true
+        find skills agents commands -type f \( -path 'skills/*' -name SKILL.md \
+            -o -path 'agents/*' -name '*.md' -o -path 'commands/*' -name '*.md' \) 2>/dev/null \
+            | LC_ALL=C sort | awk -F/ '{ k = ($1 == "skills") ? "skill" : ($1 == "agents") ? "agent" : "command"; print k "\t" $0 }'
+    )
+
+    : > "$work/parsed"
+    : > "$work/meta"
+    if [ ${#files[@]} -gt 0 ]; then
+        (
+            set -o pipefail
+            cd "$dir" || exit 1
+            LC_ALL=C awk -f "$CATALOG_PARSER" "${files[@]}" > "$work/parsed" || exit 1
+            # Raw blob SHAs (no .gitattributes filters); paths must be absolute
+            # because hash-object resolves them from the top of any enclosing repo
+            printf '%s\n' "${files[@]/#/$dir/}" | git hash-object --no-filters --stdin-paths > "$work/hashes" || exit 1
+            wc -c "${files[@]}" | awk '{ print $1 }' | head -n ${#files[@]} > "$work/sizes" || exit 1
+            printf '%s\n' "${kinds[@]}" > "$work/kinds"
+            printf '%s\n' "${files[@]}" > "$work/files"
+            paste "$work/kinds" "$work/files" "$work/hashes" "$work/sizes" > "$work/meta"
+        ) || { rm -rf "$work"; return 1; }
+    fi
+
+    if ! jq -n --arg plugin "$(basename "$dir")" --arg root "$dir" \
+        --slurpfile parsed "$work/parsed" --rawfile meta "$work/meta" '
+        ($parsed | map({(.path): .}) | add // {}) as $p
+        | {
+            plugin: $plugin,
+            root: $root,
+            components: [$meta | split("\n")[] | select(length > 0) | split("\t")
+              | . as [$kind, $path, $hash, $size]
+              | ($p[$path] // {frontmatter: null, errors: [], warnings: [], body_bytes: 0}) as $f
+              | {
+                  kind: $kind,
+                  name: ($path | split("/") | if $kind == "skill" then .[-2] else (.[-1] | rtrimstr(".md")) end),
+                  path: $path,
+                  size: ($size | tonumber),
+                  hash: $hash,
+                  body_bytes: $f.body_bytes,
+                  frontmatter: $f.frontmatter,
+                  errors: $f.errors,
+                  warnings: ($f.warnings // [])
+                }]
+          }' > "$work/catalog.json"; then
+        rm -rf "$work"
+        return 1
+    fi
+
+    touch -r "$work/stamp" "$work/catalog.json"
+    mv "$work/catalog.json" "$catalog.$$"
+    mv "$catalog.$$" "$catalog"
+    rm -rf "$work"
+}
+
+# Number of components of one kind (skill, agent, command) in a catalog
+catalog_count() {
+    jq --arg kind "$2" '[.components[] | select(.kind == $kind)] | length' "$1"
+}
+
+# ─── Measurement helpers (benchmark.sh, profile-hooks.sh) ──────────
+
+# Microseconds since the epoch in NOW_US (no subshell when bash has EPOCHREALTIME)
+now_us() {
+    if [ -n "${EPOCHREALTIME:-}" ]; then
+        NOW_US=${EPOCHREALTIME//[.,]/}
+    else
+        NOW_US=$(( $(date +%s%N) / 1000 ))
+    fi
+}
+
+# Pick the peak-RSS backend once: GNU time (%M), as /usr/bin/time or gtime
+# (Homebrew gnu-time). Sets RSS_METHOD to "GNU time" or "unavailable" and
+# RSS_TIME_BIN. There is deliberately no interpreter fallback: max RSS carries
+# across fork+exec, so getrusage() from e.g. python would count python's own
+# ~10 MB against every command it runs.
+detect_rss_method() {
+    [ -n "${RSS_METHOD:-}" ] && return 0
+    local candidate
+    RSS_METHOD="unavailable"
+    RSS_TIME_BIN=""
+    for candidate in /usr/bin/time $(command -v gtime || true); do
+        if [ -x "$candidate" ] && "$candidate" --version 2>&1 | grep -q GNU; then
+            RSS_METHOD="GNU time"
+            RSS_TIME_BIN="$candidate"
+            return 0
+        fi
+    done
+}
+
+# run_with_rss <rss-file> <cmd...>: runs the command (stdio inherited) and
+# writes the peak RSS of its largest process, in KB, as the last line of
+# <rss-file> (left empty when RSS_METHOD is "unavailable"; report it as n/a).
+# Returns the command's exit code.
+run_with_rss() {
+    local rss_file="$1"
+    shift
+    detect_rss_method
+    : > "$rss_file"
+    case "$RSS_METHOD" in
+        "GNU time") "${RSS_TIME_BIN:-/usr/bin/time}" -f '%M' -o "$rss_file" "$@" ;;
+        *) "$@" ;;
+    esac
+}
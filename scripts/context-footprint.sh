@@ -0,0 +1,445 @@
+#!/bin/bash
+set -euo pipefail
+
+# Context Footprint Analyzer
+#
+# Estimates how many tokens each plugin puts into the model's context:
+#   always-loaded  skill/command/agent names + descriptions, present in every
+#                  session once the plugin is installed
+#   on-invoke      a component's body when it is used: skill and command bodies
+#                  with their !`command` expansions inlined, agent prompts plus
+#                  the skills they preload via `skills:`
+#
+# Usage: ./scripts/context-footprint.sh [plugin...] [options]
+#   --components        List every component, not just per-plugin totals
+#   --run-expansions    Execute !`command` expansions (from the marketplace root,
+#                       10s timeout each) instead of estimating their output
+#   --history N         Footprint of the last N marketplace commits (first-parent),
+#                       read from git — submodule plugins need their history fetched
+#   --format text|json  Also emit results as JSON (default: text)
+#   --warn-only         Report exceeded budgets as warnings and exit 0
+#   --output FILE       Write the JSON report to FILE instead of stdout (without
+#                       it, json mode keeps stdout for the report and logs to stderr)
+#
+# Token counts are an offline approximation of a BPE tokenizer (word, number and
+# punctuation runs; see FOOTPRINT_AWK). They are meant for trends and budgets,
+# not billing. Components are read through the component catalog, so parsing
+# matches validate-plugin-manifests.sh.
+#
+# Budgets come from marketplace.json and are checked against the current tree:
+#   "contextBudget": {
+#     "alwaysLoadedTokens": 12000,                    <- all plugins together
+#     "plugin": {"alwaysLoadedTokens": 2000},         <- each plugin
+#     "component": {"onInvokeTokens": 10000},         <- each skill, agent and command
+#     "plugins": {"taskplex": {"plugin": {"alwaysLoadedTokens": 3000}}}   <- per-plugin overrides
+#   }
+# `claude plugin validate` passes with an "unknown field" warning for it; the CLI
+# ignores the field at load time.
+#
+# Exit 0 = within budget (or --warn-only), Exit 1 = a budget exceeded.
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
+# Colors
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+BLUE='\033[0;34m'
+NC='\033[0m'
+
+FOOTPRINT_VERSION=1
+CACHE_DIR="${FOOTPRINT_CACHE_DIR:-$MARKETPLACE_ROOT/.cache/context-footprint}"
+SHOW_COMPONENTS=false
+RUN_EXPANSIONS=0
+HISTORY=0
+OUTPUT_FORMAT="text"
+OUTPUT_FILE=""
+WARN_ONLY=false
+TARGETS=()
+FAILURES=0
+USAGE="Usage: $0 [plugin...] [--components] [--run-expansions] [--history N] [--format text|json] [--output FILE] [--warn-only]"
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --history|--format|--output)
+            [ $# -ge 2 ] || { echo "$USAGE"; exit 1; }
+            case "$1" in
+                --history) HISTORY="$2" ;;
+                --format) OUTPUT_FORMAT="$2" ;;
+                --output) OUTPUT_FILE="$2" ;;
+            esac
+            shift ;;
+        --components) SHOW_COMPONENTS=true ;;
+        --run-expansions) RUN_EXPANSIONS=1 ;;
+        --warn-only) WARN_ONLY=true ;;
+        -h|--help) echo "$USAGE"; exit 0 ;;
+        -*) echo -e "${RED}Unknown option: $1${NC}"; echo "$USAGE"; exit 1 ;;
+        *) TARGETS+=("$1") ;;
+    esac
+    shift
+done
+
+if [[ ! "$HISTORY" =~ ^[0-9]+$ ]]; then
+    echo -e "${RED}--history expects a number of commits, got '$HISTORY'${NC}"
+    exit 1
+fi
+case "$OUTPUT_FORMAT" in
+    text|json) ;;
+    *) echo -e "${RED}--format must be text or json${NC}"; exit 1 ;;
+esac
+
+# Keep stdout clean for the JSON report; the log goes to stderr
+if [ "$OUTPUT_FORMAT" = "json" ] && [ -z "$OUTPUT_FILE" ]; then
+    exec 4>&1 1>&2
+fi
+for plugin in ${TARGETS[@]+"${TARGETS[@]}"}; do
+    if ! is_valid_plugin "$plugin"; then
+        echo -e "${RED}Error: Unknown plugin '$plugin'${NC}"
+        echo "Valid plugins: $(get_plugins_string)"
+        exit 1
+    fi
+done
+
+fail() { echo -e "${RED}FAIL: $1${NC}"; FAILURES=$((FAILURES + 1)); }
+
+# Catalog components as \x1f-separated rows: plugin, kind, name, absolute path,
+# loaded (0 when disable-model-invocation keeps it out of context), the
+# always-loaded text, the skills an agent preloads (comma-joined), relative path
+COMPONENT_ROWS_JQ='
+  def text: if type == "string" then . elif . == null then "" else tojson end | gsub("[\n\u001f]"; " ");
+  .plugin as $plugin | .root as $root
+  | .components[] | (.frontmatter // {}) as $fm
+  | [$plugin, .kind, .name, ($root + "/" + .path),
+     (if .kind != "agent" and ($fm["disable-model-invocation"] | tostring) == "true" then "0" else "1" end),
+     ((($fm.name // .name) | text) + ": " + ($fm.description | text)),
+     (if .kind == "agent" then [$fm.skills | if type == "array" then .[] elif type == "string" then splits(", *") else empty end | text] | join(",") else "" end),
+     .path]
+  | join("\u001f")'
+
+# Token estimator. Reads COMPONENT_ROWS_JQ rows, opens each component file and
+# prints: plugin kind name path always body expansions expansion_tokens preload on_invoke
+#
+# Heuristic, tuned on English markdown: a letter run costs one token per 7
+# letters (most words are a single token), a digit run one per 3 digits, a
+# punctuation run one per 2 characters, each newline one, UTF-8 continuation
+# bytes nothing. !`cmd` output is estimated from the command unless
+# run_expansions=1, in which case it is executed and its output counted.
+FOOTPRINT_AWK='
+function tok(s,    n, c, len) {
+    n = 0
+    while (match(s, /[A-Za-z]+|[0-9]+|[^A-Za-z0-9 \t]+/)) {
+        c = substr(s, RSTART, 1)
+        len = RLENGTH
+        if (c ~ /[A-Za-z]/) n += 1 + int((len - 1) / 7)
+        else if (c ~ /[0-9]/) n += 1 + int((len - 1) / 3)
+        else n += punct(substr(s, RSTART, len))
+        s = substr(s, RSTART + len)
+    }
+    return n
+}
+
+# Punctuation runs; bytes of multi-byte UTF-8 characters count once per character
+function punct(s,    i, c, n, ascii) {
+    n = 0; ascii = 0
+    for (i = 1; i <= length(s); i++) {
+        c = substr(s, i, 1)
+        if (c >= "\300") n++
+        else if (c < "\200") ascii++
+    }
+    return n + (ascii ? 1 + int((ascii - 1) / 2) : 0)
+}
+
+function shq(s) { gsub(/\047/, "\047\\\047\047", s); return "\047" s "\047" }
+
+# Tokens a !`cmd` expansion adds when the component is invoked
+function expansion(cmd,    sh, line, n) {
+    if (run_expansions) {
+        sh = "cd " shq(root) " && " timeout_bin " bash -c " shq(cmd) " 2>/dev/null | head -c 200000"
+        n = 0
+        while ((sh | getline line) > 0) n += tok(line) + 1
+        close(sh)
+        return n
+    }
+    if (cmd ~ /git +(rev-parse|config)|pwd|basename|dirname|date|whoami|uname|hostname/) return 10
+    if (cmd ~ /git +(status|branch|remote)/) return 150
+    if (cmd ~ /git +(log|show --stat)/) return 400
+    if (cmd ~ /git +(diff|show)/) return 2000
+    if (cmd ~ /(^|[ |;&(])(ls|find|tree|fd)( |$)/) return 300
+    if (cmd ~ /(^|[ |;&(])(cat|head|tail|jq|sed|awk)( |$)/) return 800
+    return 100
+}
+
+BEGIN { FS = "\037" }
+
+{
+    plugin = $1; kind = $2; name = $3; path = $4
+    always = ($5 == "1") ? tok($6) : 0
+    body = 0; exp_n = 0; exp_t = 0; state = 0; ln = 0
+    while ((getline line < path) > 0) {
+        ln++
+        sub(/\r$/, "", line)
+        if (state == 0) {
+            state = 2
+            if (ln == 1 && line ~ /^---[ \t]*$/) { state = 1; continue }
+        }
+        if (state == 1) {
+            if (line ~ /^(---|\.\.\.)[ \t]*$/) state = 2
+            continue
+        }
+        body += tok(line) + 1
+        if (kind == "agent") continue
+        while (match(line, /!`[^`]+`/)) {
+            # expansion() calls match() too, so take the rest of the line first
+            cmd = substr(line, RSTART + 2, RLENGTH - 3)
+            line = substr(line, RSTART + RLENGTH)
+            exp_n++
+            exp_t += expansion(cmd)
+        }
+    }
+    close(path)
+    n++
+    R_plugin[n] = plugin; R_kind[n] = kind; R_name[n] = name; R_path[n] = $8
+    R_always[n] = always; R_body[n] = body; R_exp_n[n] = exp_n; R_exp_t[n] = exp_t
+    R_preload[n] = $7
+    if (kind == "skill") skill_tokens[plugin SUBSEP name] = body + exp_t
+}
+
+END {
+    for (i = 1; i <= n; i++) {
+        pre = 0
+        k = split(R_preload[i], skills, ",")
+        for (j = 1; j <= k; j++) {
+            sub(/^.*:/, "", skills[j])
+            if ((R_plugin[i] SUBSEP skills[j]) in skill_tokens) pre += skill_tokens[R_plugin[i] SUBSEP skills[j]]
+        }
+        printf "%s\t%s\t%s\t%s\t%d\t%d\t%d\t%d\t%d\t%d\n", R_plugin[i], R_kind[i], R_name[i], R_path[i], \
+            R_always[i], R_body[i], R_exp_n[i], R_exp_t[i], pre, R_body[i] + R_exp_t[i] + pre
+    }
+}'
+
+TIMEOUT_BIN=$(command -v timeout || command -v gtimeout || true)
+[ -n "$TIMEOUT_BIN" ] && TIMEOUT_BIN="$TIMEOUT_BIN 10"
+
+WORK="$(mktemp -d "${TMPDIR:-/tmp}/context-footprint.XXXXXX")"
+trap 'rm -rf "$WORK"' EXIT
+
+# footprint_rows <dir>...: component rows (FOOTPRINT_AWK output) for plugin directories
+footprint_rows() {
+    local dir catalog
+    local catalogs=()
+    for dir in "$@"; do
+        if ! catalog=$(component_catalog "$dir"); then
+            echo -e "${YELLOW}WARN: could not build the component catalog for $(basename "$dir")${NC}" >&2
+            continue
+        fi
+        catalogs+=("$catalog")
+    done
+    [ ${#catalogs[@]} -gt 0 ] || return 0
+    jq -r "$COMPONENT_ROWS_JQ" "${catalogs[@]}" \
+        | LC_ALL=C awk -v run_expansions="$RUN_EXPANSIONS" -v root="$MARKETPLACE_ROOT" \
+            -v timeout_bin="$TIMEOUT_BIN" "$FOOTPRINT_AWK"
+}
+
+# Per-plugin totals from component rows, in marketplace.json order
+SUMMARY_JQ='
+  [split("\n")[] | select(length > 0) | split("\t")
+    | {plugin: .[0], kind: .[1], name: .[2], path: .[3],
+       always_tokens: (.[4] | tonumber), body_tokens: (.[5] | tonumber),
+       expansions: (.[6] | tonumber), expansion_tokens: (.[7] | tonumber),
+       preload_tokens: (.[8] | tonumber), on_invoke_tokens: (.[9] | tonumber)}]
+  | reduce .[] as $c ({}; .[$c.plugin] += [$c]) | [.[]]
+  | map({
+      plugin: .[0].plugin,
+      skills: map(select(.kind == "skill")) | length,
+      agents: map(select(.kind == "agent")) | length,
+      commands: map(select(.kind == "command")) | length,
+      always_tokens: (map(.always_tokens) | add),
+      on_invoke_tokens: (map(.on_invoke_tokens) | add),
+      largest: (max_by(.on_invoke_tokens) | {kind, name, on_invoke_tokens}),
+      components: map(del(.plugin))
+    })'
+
+# ─── History ────────────────────────────────────────────────────────
+if [ "$HISTORY" -gt 0 ]; then
+    mkdir -p "$CACHE_DIR"
+    HISTORY_TSV="$WORK/history.tsv"
+    : > "$HISTORY_TSV"
+    echo -e "${BLUE}Context footprint over the last $HISTORY commits (≈ tokens, expansions estimated)${NC}"
+    echo ""
+    printf '%-9s %-10s %-9s %8s %10s %10s %8s\n' "commit" "date" "version" "plugins" "always" "on_invoke" "Δalways"
+    RUN_EXPANSIONS=0
+    prev=""
+    while read -r commit date; do
+        manifest=$(git -C "$MARKETPLACE_ROOT" show "$commit:.claude-plugin/marketplace.json" 2>/dev/null) || continue
+        version=$(jq -r '.version // "-"' <<< "$manifest")
+        read -ra plugins <<< "$(jq -r '.plugins[].name' <<< "$manifest" | tr '\n' ' ')"
+        if [ ${#TARGETS[@]} -gt 0 ]; then
+            read -ra plugins <<< "${TARGETS[*]}"
+        fi
+        always=0 on_invoke=0 found=0
+        for plugin in ${plugins[@]+"${plugins[@]}"}; do
+            # A gitlink (submodule commit) or a tree, depending on how the plugin is vendored
+            mode="" type="" sha=""
+            read -r mode type sha _ <<< "$(git -C "$MARKETPLACE_ROOT" ls-tree "$commit" -- "$plugin")" || true
+            [ -n "${sha:-}" ] || continue
+            cached="$CACHE_DIR/$plugin-$sha-v$FOOTPRINT_VERSION.tsv"
+            if [ ! -f "$cached" ]; then
+                dest="$WORK/history/$sha/$plugin"
+                mkdir -p "$dest"
+                if [ "$type" = commit ]; then
+                    git -C "$MARKETPLACE_ROOT/$plugin" archive "$sha" 2>/dev/null | tar -x -C "$dest" 2>/dev/null || { rm -rf "$dest"; continue; }
+                else
+                    git -C "$MARKETPLACE_ROOT" archive "$sha" | tar -x -C "$dest"
+                fi
+                footprint_rows "$dest" > "$cached.$$"
+                mv "$cached.$$" "$cached"
+                rm -f "$(component_catalog "$dest")"
+                rm -rf "$WORK/history/$sha"
+            fi
+            found=$((found + 1))
+            read -r a o <<< "$(awk -F'\t' '{ a += $5; o += $10 } END { print a + 0, o + 0 }' "$cached")"
+            always=$((always + a))
+            on_invoke=$((on_invoke + o))
+        done
+        printf '%s\t%s\t%s\t%s\t%s\t%s\t%s\n' "$commit" "$date" "$version" "$found" "${#plugins[@]}" "$always" "$on_invoke" >> "$HISTORY_TSV"
+    done < <(git -C "$MARKETPLACE_ROOT" log --first-parent -n "$HISTORY" --format='%H %cs')
+
+    # Oldest first, so the delta reads as growth over time
+    awk -F'\t' '{ rows[NR] = $0 } END { for (i = NR; i >= 1; i--) print rows[i] }' "$HISTORY_TSV" > "$WORK/history.asc"
+    while IFS=$'\t' read -r commit date version found total always on_invoke; do
+        delta="-"
+        [ -n "$prev" ] && delta=$(printf '%+d' $((always - prev)))
+        printf '%-9s %-10s %-9s %8s %10s %10s %8s\n' "${commit:0:7}" "$date" "$version" "$found/$total" "$always" "$on_invoke" "$delta"
+        prev=$always
+    done < "$WORK/history.asc"
+    echo ""
+    echo -e "${BLUE}Plugins without local history (submodules not checked out or not fetched) are left out of the totals${NC}"
+
+    if [ "$OUTPUT_FORMAT" = "json" ]; then
+        report=$(jq -R -s '{
+            tool: "context-footprint",
+            history: [split("\n")[] | select(length > 0) | split("\t")
+              | {commit: .[0], date: .[1], version: .[2], plugins_measured: (.[3] | tonumber),
+                 plugins: (.[4] | tonumber), always_tokens: (.[5] | tonumber), on_invoke_tokens: (.[6] | tonumber)}]
+          }' "$WORK/history.asc")
+        if [ -n "$OUTPUT_FILE" ]; then
+            printf '%s\n' "$report" > "$OUTPUT_FILE"
+            echo -e "${BLUE}JSON report written to $OUTPUT_FILE${NC}"
+        else
+            printf '%s\n' "$report" >&4
+        fi
+    fi
+    exit 0
+fi
+
+# ─── Current tree ───────────────────────────────────────────────────
+read -ra ALL_PLUGINS <<< "$(get_plugins_string)"
+[ ${#TARGETS[@]} -gt 0 ] || TARGETS=("${ALL_PLUGINS[@]}")
+
+DIRS=()
+MISSING=()
+for plugin in "${TARGETS[@]}"; do
+    if [ -f "$MARKETPLACE_ROOT/$plugin/.claude-plugin/plugin.json" ]; then
+        DIRS+=("$MARKETPLACE_ROOT/$plugin")
+    else
+        MISSING+=("$plugin")
+    fi
+done
+
+if [ ${#DIRS[@]} -gt 0 ]; then
+    footprint_rows "${DIRS[@]}" > "$WORK/rows.tsv"
+else
+    : > "$WORK/rows.tsv"
+fi
+SUMMARY=$(jq -R -s "$SUMMARY_JQ" "$WORK/rows.tsv")
+
+echo -e "${BLUE}Context footprint (≈ tokens, $([ "$RUN_EXPANSIONS" = 1 ] && echo "expansions executed" || echo "expansions estimated"))${NC}"
+echo ""
+printf '%-24s %6s %6s %6s %8s %10s  %s\n' "plugin" "skills" "agents" "cmds" "always" "on_invoke" "largest on invoke"
+jq -r '.[] | [.plugin, .skills, .agents, .commands, .always_tokens, .on_invoke_tokens,
+        "\(.largest.name) (\(.largest.kind), \(.largest.on_invoke_tokens))"] | @tsv' <<< "$SUMMARY" \
+    | while IFS=$'\t' read -r plugin skills agents commands always on_invoke largest; do
+        printf '%-24s %6s %6s %6s %8s %10s  %s\n' "$plugin" "$skills" "$agents" "$commands" "$always" "$on_invoke" "$largest"
+    done
+
+if [ "$SHOW_COMPONENTS" = true ]; then
+    echo ""
+    printf '%-24s %-8s %-28s %8s %8s %10s %10s\n' "plugin" "kind" "name" "always" "body" "expansions" "on_invoke"
+    jq -r '.[] | .plugin as $p | .components[]
+        | [$p, .kind, .name, .always_tokens, .body_tokens,
+           "\(.expansions)/\(.expansion_tokens)", .on_invoke_tokens] | @tsv' <<< "$SUMMARY" \
+        | while IFS=$'\t' read -r plugin kind name always body expansions on_invoke; do
+            printf '%-24s %-8s %-28s %8s %8s %10s %10s\n' "$plugin" "$kind" "$name" "$always" "$body" "$expansions" "$on_invoke"
+        done
+fi
+
+TOTAL_ALWAYS=$(jq '[.[].always_tokens] | add // 0' <<< "$SUMMARY")
+echo ""
+echo -e "Always loaded with all $((${#TARGETS[@]} - ${#MISSING[@]})) plugin(s) installed: ${TOTAL_ALWAYS} tokens"
+if [ ${#MISSING[@]} -gt 0 ]; then
+    echo -e "${YELLOW}Not checked out (run git submodule update --init): ${MISSING[*]}${NC}"
+fi
+
+# ─── Budgets ────────────────────────────────────────────────────────
+# One violation per line: message
+VIOLATIONS=$(jq -r --argjson summary "$SUMMARY" --argjson partial "$([ ${#TARGETS[@]} -lt ${#ALL_PLUGINS[@]} ] && echo true || echo false)" '
+    (.contextBudget // {}) as $budget
+    | ($budget.plugins // {}) as $own
+    | ($summary | map(.always_tokens) | add // 0) as $total
+    | (if ($partial | not) and $budget.alwaysLoadedTokens and $total > $budget.alwaysLoadedTokens then
+        "marketplace: \($total) always-loaded tokens exceeds the budget of \($budget.alwaysLoadedTokens)"
+       else empty end),
+      ($summary[] | . as $p
+        | (($budget.plugin // {}) + ($own[$p.plugin].plugin // {})) as $b
+        | (($budget.component // {}) + ($own[$p.plugin].component // {})) as $c
+        | (if $b.alwaysLoadedTokens and $p.always_tokens > $b.alwaysLoadedTokens then
+             "\($p.plugin): \($p.always_tokens) always-loaded tokens exceeds the budget of \($b.alwaysLoadedTokens)"
+           else empty end),
+          ($p.components[] | select($c.onInvokeTokens and .on_invoke_tokens > $c.onInvokeTokens)
+            | "\($p.plugin): \(.kind) \(.name) loads \(.on_invoke_tokens) tokens on invoke, over the budget of \($c.onInvokeTokens)"))
+' "$MARKETPLACE_JSON")
+
+if [ "$(jq 'has("contextBudget")' "$MARKETPLACE_JSON")" != true ]; then
+    echo -e "${YELLOW}No contextBudget in marketplace.json — budgets not enforced${NC}"
+fi
+while IFS= read -r violation; do
+    [ -n "$violation" ] || continue
+    if [ "$WARN_ONLY" = true ]; then
+        echo -e "${YELLOW}WARN: $violation${NC}"
+        # Surfaces as an annotation on the workflow run
+        [ -n "${GITHUB_ACTIONS:-}" ] && echo "::warning title=Context budget::$violation"
+        FAILURES=$((FAILURES + 1))
+    else
+        fail "$violation"
+    fi
+done <<< "$VIOLATIONS"
+
+if [ "$OUTPUT_FORMAT" = "json" ]; then
+    report=$(jq -n --argjson summary "$SUMMARY" --arg violations "$VIOLATIONS" \
+        --argjson run_expansions "$RUN_EXPANSIONS" --slurpfile marketplace "$MARKETPLACE_JSON" '{
+            tool: "context-footprint",
+            version: '"$FOOTPRINT_VERSION"',
+            expansions: (if $run_expansions == 1 then "executed" else "estimated" end),
+            always_tokens: ($summary | map(.always_tokens) | add // 0),
+            budget: ($marketplace[0].contextBudget // null),
+            violations: ($violations | split("\n") | map(select(length > 0))),
+            plugins: $summary
+        }')
+    if [ -n "$OUTPUT_FILE" ]; then
+        printf '%s\n' "$report" > "$OUTPUT_FILE"
+        echo -e "${BLUE}JSON report written to $OUTPUT_FILE${NC}"
+    else
+        printf '%s\n' "$report" >&4
+    fi
+fi
+
+if [ "$FAILURES" -gt 0 ] && [ "$WARN_ONLY" = true ]; then
+    echo -e "${YELLOW}$FAILURES context budget(s) exceeded (--warn-only)${NC}"
+    exit 0
+elif [ "$FAILURES" -gt 0 ]; then
+    echo -e "${RED}$FAILURES context budget(s) exceeded${NC}"
+    exit 1
+fi
+echo -e "${GREEN}Context footprint within budget${NC}"
+exit 0
@@ -2,10 +2,12 @@
 set -euo pipefail
 
 # Quick development testing script for individual plugins
-# Usage: ./scripts/dev-test.sh [plugin-name]
+# Usage: ./scripts/dev-test.sh [--jobs N] [plugin-name]
 # Example: ./scripts/dev-test.sh sdk-bridge
+#
+# In all-plugins mode, --jobs N runs the static checks (steps 1-3) for N
+# plugins at a time (0 = all cores); the interactive load test stays serial.
 
-PLUGIN=${1:-}
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 MARKETPLACE_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 source "$SCRIPT_DIR/common.sh"
@@ -21,7 +23,7 @@ NC='\033[0m' # No Color
 read -ra AVAILABLE_PLUGINS <<< "$(get_plugins_string)"
 
 usage() {
-    echo "Usage: $0 [plugin-name]"
+    echo "Usage: $0 [--jobs N] [plugin-name]"
     echo ""
     echo "Available plugins:"
     for p in "${AVAILABLE_PLUGINS[@]}"; do
@@ -31,10 +33,31 @@ usage() {
     echo "Examples:"
     echo "  $0 sdk-bridge              # Test single plugin"
     echo "  $0                         # Test all plugins"
+    echo "  $0 --jobs 0                # Test all plugins, static checks on all cores"
     exit 1
 }
 
+PLUGIN=""
+JOBS=1
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --jobs|-j) [ $# -ge 2 ] || usage; JOBS="$2"; shift ;;
+        --jobs=*) JOBS="${1#*=}" ;;
+        -h|--help) usage ;;
+        *) PLUGIN="$1" ;;
+    esac
+    shift
+done
+JOBS=$(resolve_jobs "$JOBS") || usage
+
 test_plugin() {
+    local plugin=$1
+    check_plugin_static "$plugin" || return 1
+    load_plugin_interactive "$plugin"
+}
+
+# Steps 1-3: manifest, structure and permissions (no user interaction)
+check_plugin_static() {
     local plugin=$1
     local plugin_dir="$MARKETPLACE_ROOT/$plugin"
 
@@ -81,31 +104,43 @@ test_plugin() {
 
     local has_components=false
 
+    # Component counts and frontmatter come from the cached component catalog
+    local catalog cmd_count=0 skill_count=0 agent_count=0 fm_errors="" fm_warnings=""
+    if catalog=$(component_catalog "$plugin_dir"); then
+        read -r cmd_count skill_count agent_count < <(jq -r '
+            [.components[].kind] | [map(select(. == "command")), map(select(. == "skill")), map(select(. == "agent"))]
+            | map(length) | @tsv' "$catalog")
+        fm_errors=$(jq -r '.components[] | select(.errors | length > 0) | "\(.path): \(.errors | join("; "))"' "$catalog")
+        fm_warnings=$(jq -r '.components[] | select(.warnings // [] | length > 0) | "\(.path): \(.warnings | join("; "))"' "$catalog")
+    else
+        echo -e "${YELLOW}⚠️  Could not build component catalog${NC}"
+    fi
+
     # Check for commands
-    if [ -d "$plugin_dir/commands" ]; then
-        local cmd_count=$(find "$plugin_dir/commands" -name "*.md" -type f | wc -l | tr -d ' ')
-        if [ "$cmd_count" -gt 0 ]; then
-            echo -e "${GREEN}✅ Commands: $cmd_count found${NC}"
-            has_components=true
-        fi
+    if [ "$cmd_count" -gt 0 ]; then
+        echo -e "${GREEN}✅ Commands: $cmd_count found${NC}"
+        has_components=true
     fi
 
     # Check for skills
-    if [ -d "$plugin_dir/skills" ]; then
-        local skill_count=$(find "$plugin_dir/skills" -name "SKILL.md" -type f | wc -l | tr -d ' ')
-        if [ "$skill_count" -gt 0 ]; then
-            echo -e "${GREEN}✅ Skills: $skill_count found${NC}"
-            has_components=true
-        fi
+    if [ "$skill_count" -gt 0 ]; then
+        echo -e "${GREEN}✅ Skills: $skill_count found${NC}"
+        has_components=true
     fi
 
     # Check for agents
-    if [ -d "$plugin_dir/agents" ]; then
-        local agent_count=$(find "$plugin_dir/agents" -name "*.md" -type f | wc -l | tr -d ' ')
-        if [ "$agent_count" -gt 0 ]; then
-            echo -e "${GREEN}✅ Agents: $agent_count found${NC}"
-            has_components=true
-        fi
+    if [ "$agent_count" -gt 0 ]; then
+        echo -e "${GREEN}✅ Agents: $agent_count found${NC}"
+        has_components=true
+    fi
+
+    if [ -n "$fm_errors" ]; then
+        echo -e "${YELLOW}⚠️  Invalid frontmatter:${NC}"
+        echo "$fm_errors" | sed 's/^/   /'
+    fi
+    if [ -n "$fm_warnings" ]; then
+        echo -e "${YELLOW}⚠️  Unsupported frontmatter (skipped):${NC}"
+        echo "$fm_warnings" | sed 's/^/   /'
     fi
 
     # Check for hooks
@@ -137,6 +172,12 @@ test_plugin() {
         echo -e "${GREEN}✅ All scripts executable${NC}"
     fi
     echo ""
+}
+
+# Step 4: load the plugin in Claude Code (interactive)
+load_plugin_interactive() {
+    local plugin=$1
+    local plugin_dir="$MARKETPLACE_ROOT/$plugin"
 
     # Step 4: Test loading with --plugin-dir
     echo -e "${YELLOW}Step 4: Testing plugin load...${NC}"
@@ -186,11 +227,23 @@ else
     echo "Testing all plugins..."
 
     failed_plugins=()
-    for plugin in "${AVAILABLE_PLUGINS[@]}"; do
-        if ! test_plugin "$plugin"; then
-            failed_plugins+=("$plugin")
-        fi
-    done
+    if [ "$JOBS" -gt 1 ]; then
+        # Static checks in parallel (output replayed in marketplace order),
+        # then the interactive load test for each plugin that passed
+        PLUGIN_POOL_ALLOW_FAILURES=1 run_plugins_parallel "$JOBS" "" check_plugin_static "${AVAILABLE_PLUGINS[@]}"
+        for i in "${!AVAILABLE_PLUGINS[@]}"; do
+            plugin="${AVAILABLE_PLUGINS[$i]}"
+            if [ "${PLUGIN_POOL_STATUS[$i]}" -ne 0 ] || ! load_plugin_interactive "$plugin"; then
+                failed_plugins+=("$plugin")
+            fi
+        done
+    else
+        for plugin in "${AVAILABLE_PLUGINS[@]}"; do
+            if ! test_plugin "$plugin"; then
+                failed_plugins+=("$plugin")
+            fi
+        done
+    fi
 
     # Final summary
     echo ""
@@ -0,0 +1,373 @@
+# One-pass YAML frontmatter parser for SKILL.md / agent / command files.
+# Usage: LC_ALL=C awk -f scripts/frontmatter.awk FILE...
+#
+# Prints one JSON object per non-empty file:
+#   {"path": FILE, "frontmatter": {...} | null, "errors": [...],
+#    "warnings": [...], "body_bytes": N}
+#
+# Handles the YAML subset used in plugin frontmatter: plain, quoted and block
+# (|, >, with chomping indicators) scalars, multi-line plain scalars, block and
+# flow sequences, and one level of nested mappings. Messages carry their line
+# number and come in two kinds:
+#   errors    the frontmatter is malformed (tabs, unterminated quotes, a line
+#             that is not "key: value", duplicate keys, ...)
+#   warnings  valid YAML this parser does not read (deeper nesting, sequences
+#             of mappings, nested flow collections, multi-line quoted scalars)
+#             — the key is left out of "frontmatter" rather than misread — and
+#             plain values containing ': ', which strict YAML rejects but
+#             Claude Code loads as text
+# POSIX awk only (BSD/macOS awk, mawk, gawk).
+
+function js(s) {
+    gsub(/\\/, "\\\\", s)
+    gsub(/"/, "\\\"", s)
+    gsub(/\n/, "\\n", s)
+    gsub(/\r/, "\\r", s)
+    gsub(/\t/, "\\t", s)
+    gsub(/[[:cntrl:]]/, "", s)
+    return "\"" s "\""
+}
+
+function err(msg, ln) {
+    if (ln == "") ln = FNR
+    errors = errors (errors == "" ? "" : ",") js("line " ln ": " msg)
+}
+
+function unsupported(msg, ln) {
+    if (ln == "") ln = FNR
+    warnings = warnings (warnings == "" ? "" : ",") js("line " ln ": " msg)
+}
+
+# The value of the current key uses YAML we cannot read: leave the key out
+# and skip its remaining lines
+function skip_key(msg) {
+    unsupported(msg)
+    if (pend == "" && last_put == pkey) fm = fm_before
+    seen[pkey] = 1
+    pend = "skip"
+}
+
+function trim(s) {
+    sub(/^[ \t]+/, "", s)
+    sub(/[ \t]+$/, "", s)
+    return s
+}
+
+# Add "key": <json> to the frontmatter object, rejecting duplicates
+function put(key, json) {
+    if (key in seen) {
+        err("duplicate key '" key "'", pline)
+        return
+    }
+    seen[key] = 1
+    fm_before = fm
+    last_put = key
+    fm = fm (fm == "" ? "" : ",") js(key) ":" json
+}
+
+# Parse a single-line scalar into JSON. With allow_open set, a quoted scalar
+# that does not close on this line sets open_quote instead of an error.
+function scalar(v,    q, out, i, c, rest) {
+    v = trim(v)
+    q = substr(v, 1, 1)
+    if (q == "\"") {
+        out = ""
+        for (i = 2; i <= length(v); i++) {
+            c = substr(v, i, 1)
+            if (c == "\\") {
+                i++
+                c = substr(v, i, 1)
+                if (c == "n") c = "\n"
+                else if (c == "t") c = "\t"
+                out = out c
+            } else if (c == "\"") {
+                rest = trim(substr(v, i + 1))
+                if (rest != "" && rest !~ /^#/) {
+                    err("unexpected text after quoted string")
+                }
+                return js(out)
+            } else {
+                out = out c
+            }
+        }
+        if (allow_open) { open_quote = q; return "null" }
+        err("unterminated double-quoted string")
+        return "null"
+    }
+    if (q == "'") {
+        out = ""
+        for (i = 2; i <= length(v); i++) {
+            c = substr(v, i, 1)
+            if (c == "'") {
+                if (substr(v, i + 1, 1) == "'") { out = out "'"; i++; continue }
+                rest = trim(substr(v, i + 1))
+                if (rest != "" && rest !~ /^#/) {
+                    err("unexpected text after quoted string")
+                }
+                return js(out)
+            }
+            out = out c
+        }
+        if (allow_open) { open_quote = q; return "null" }
+        err("unterminated single-quoted string")
+        return "null"
+    }
+    v = plain(v)
+    if (v == "" || v == "~" || v == "null") return "null"
+    return js(v)
+}
+
+# Unquoted scalar text without its trailing comment
+function plain(v) {
+    v = trim(v)
+    sub(/[ \t]+#.*$/, "", v)
+    if (v ~ /: / || v ~ /:$/) {
+        unsupported("plain value contains ': ' (quote the value for strict YAML parsers)")
+    }
+    return v
+}
+
+# [a, "b, c", 'd'] -> JSON array. Commas only split outside quotes; a nested
+# flow collection skips the key (check pend == "skip" after the call).
+function flow_seq(v,    i, c, q, item, out, rest) {
+    v = trim(v)
+    q = ""; item = ""; out = ""
+    for (i = 2; i <= length(v); i++) {
+        c = substr(v, i, 1)
+        if (q != "") {
+            item = item c
+            if (q == "\"" && c == "\\") {
+                i++
+                item = item substr(v, i, 1)
+            } else if (q == "'" && c == "'" && substr(v, i + 1, 1) == "'") {
+                i++
+                item = item c
+            } else if (c == q) {
+                q = ""
+            }
+            continue
+        }
+        if ((c == "\"" || c == "'") && trim(item) == "") {
+            q = c
+            item = item c
+        } else if (c == "[" || c == "{") {
+            skip_key("nested flow collections are not supported; '" pkey "' skipped")
+            return ""
+        } else if (c == ",") {
+            out = out (out == "" ? "" : ",") scalar(item)
+            item = ""
+        } else if (c == "]") {
+            # "[]" and a trailing comma add no entry
+            if (trim(item) != "") out = out (out == "" ? "" : ",") scalar(item)
+            break
+        } else {
+            item = item c
+        }
+    }
+    if (i > length(v)) {
+        err(q == "" ? "unterminated flow sequence" : "unterminated " (q == "\"" ? "double" : "single") "-quoted string")
+        return "null"
+    }
+    rest = trim(substr(v, i + 1))
+    if (rest != "" && rest !~ /^#/) err("unexpected text after flow sequence")
+    return "[" out "]"
+}
+
+function block_value(    i, n, out, trailing) {
+    n = blk_n
+    while (n > 0 && blk[n] == "") n--
+    trailing = blk_n - n
+    out = ""
+    for (i = 1; i <= n; i++) {
+        if (blk_style == "|") {
+            out = out (i > 1 ? "\n" : "") blk[i]
+        } else if (blk[i] == "") {
+            out = out "\n"
+        } else if (out == "" || substr(out, length(out), 1) == "\n") {
+            out = out blk[i]
+        } else {
+            out = out " " blk[i]
+        }
+    }
+    if (out != "" && blk_chomp != "-") out = out "\n"
+    if (blk_chomp == "+") while (trailing-- > 0) out = out "\n"
+    return js(out)
+}
+
+# Emit the value of a key whose content spans several lines
+function finish_pending() {
+    if (pend == "empty") put(pkey, "null")
+    else if (pend == "plain") put(pkey, js(pval))
+    else if (pend == "block") put(pkey, block_value())
+    else if (pend == "seq") put(pkey, "[" pval "]")
+    else if (pend == "map") put(pkey, "{" pval "}")
+    else if (pend == "skip" && skip_quote != "")
+        err("unterminated " (skip_quote == "\"" ? "double" : "single") "-quoted string", pline)
+    pend = ""; skip_quote = ""
+}
+
+function fm_line(line,    indent, body, key, val, m) {
+    if (line ~ /^[ \t]*$/) {
+        if (pend == "block") blk[++blk_n] = ""
+        return
+    }
+    if (line ~ /^ *\t/) {
+        err("tab used for indentation")
+        return
+    }
+    match(line, /^ */)
+    indent = RLENGTH
+    body = substr(line, indent + 1)
+
+    if (pend == "block") {
+        if (indent > 0) {
+            if (blk_indent == 0) blk_indent = indent
+            if (indent < blk_indent) err("block scalar line is less indented than the first line")
+            blk[++blk_n] = substr(line, blk_indent + 1)
+            return
+        }
+        finish_pending()
+    }
+    if (pend == "skip") {
+        if (indent > 0 || body ~ /^-([ \t]|$)/) {
+            if (skip_quote != "" && index(body, skip_quote)) {
+                unsupported("multi-line quoted value of '" pkey "' is not supported; '" pkey "' skipped", pline)
+                skip_quote = ""
+            }
+            return
+        }
+        finish_pending()
+    }
+    if (body ~ /^#/) return
+
+    # Sequence items (YAML allows them at the key's own indentation)
+    if (body ~ /^-([ \t]|$)/ && (pend == "empty" || pend == "seq")) {
+        if (substr(trim(substr(body, 2)), 1, 1) ~ /[-\[{]/ || trim(substr(body, 2)) ~ /^[A-Za-z0-9_-]+:([ \t]|$)/) {
+            skip_key("nested structures in sequences are not supported; '" pkey "' skipped")
+            return
+        }
+        val = scalar(substr(body, 2))
+        pval = pval (pend == "seq" ? "," : "") val
+        pend = "seq"
+        return
+    }
+
+    if (indent > 0) {
+        if (pend == "plain") {
+            pval = pval " " plain(body)
+            return
+        }
+        if ((pend == "empty" || pend == "map") && body ~ /^[A-Za-z0-9_][A-Za-z0-9_.-]*[ \t]*:([ \t]|$)/) {
+            m = index(body, ":")
+            key = trim(substr(body, 1, m - 1))
+            val = trim(substr(body, m + 1))
+            if (val == "" || val ~ /^[|>]/) {
+                skip_key("nested value for '" pkey "." key "' is not supported; '" pkey "' skipped")
+                return
+            } else if (substr(val, 1, 1) == "[") {
+                val = flow_seq(val)
+                if (pend == "skip") return
+            } else {
+                val = scalar(val)
+            }
+            pval = pval (pend == "map" ? "," : "") js(key) ":" val
+            pend = "map"
+            return
+        }
+        if (pend == "empty") {
+            # Plain scalar starting on the line after its key
+            pval = plain(body)
+            pend = "plain"
+            return
+        }
+        if (pkey == "") {
+            err("unexpected indentation")
+            return
+        }
+        skip_key("indented continuation of '" pkey "' is not supported; '" pkey "' skipped")
+        return
+    }
+
+    finish_pending()
+    if (body !~ /^[A-Za-z0-9_][A-Za-z0-9_.-]*[ \t]*:([ \t]|$)/) {
+        err("expected 'key: value'")
+        return
+    }
+    m = index(body, ":")
+    pkey = trim(substr(body, 1, m - 1))
+    pline = FNR
+    val = trim(substr(body, m + 1))
+    pval = ""
+
+    if (val == "" || val ~ /^#/) {
+        pend = "empty"
+    } else if (val ~ /^[|>][-+]?[1-9]?[ \t]*(#.*)?$/ || val ~ /^[|>][1-9][-+][ \t]*(#.*)?$/) {
+        pend = "block"
+        blk_style = substr(val, 1, 1)
+        blk_chomp = val ~ /^.[1-9]?-/ ? "-" : (val ~ /^.[1-9]?\+/ ? "+" : "")
+        blk_indent = (match(substr(val, 2, 2), /[1-9]/) ? substr(val, RSTART + 1, 1) + 0 : 0)
+        blk_n = 0
+    } else if (substr(val, 1, 1) == "[") {
+        val = flow_seq(val)
+        if (pend != "skip") put(pkey, val)
+    } else if (val ~ /^[{&*!]/) {
+        # Flow mappings, anchors, aliases and tags are kept verbatim
+        put(pkey, js(val))
+    } else if (val ~ /^["']/) {
+        allow_open = 1; open_quote = ""
+        val = scalar(val)
+        allow_open = 0
+        if (open_quote == "") {
+            put(pkey, val)
+        } else {
+            # Reported once the closing quote is found, as an error if it never is
+            seen[pkey] = 1
+            pend = "skip"
+            skip_quote = open_quote
+        }
+    } else {
+        pval = plain(val)
+        if (pval == "~" || pval == "null") put(pkey, "null")
+        else pend = "plain"
+    }
+}
+
+function start_file() {
+    state = 0; fm = ""; errors = ""; warnings = ""; pend = ""; body_bytes = 0
+    fm_before = ""; last_put = ""; skip_quote = ""
+    split("", seen)
+}
+
+function end_file() {
+    if (state == 1) {
+        finish_pending()
+        errors = errors (errors == "" ? "" : ",") js("unterminated frontmatter (no closing ---)")
+    }
+    printf "{\"path\":%s,\"frontmatter\":%s,\"errors\":[%s],\"warnings\":[%s],\"body_bytes\":%d}\n", \
+        js(prev_file), (state == 2 ? "null" : "{" fm "}"), errors, warnings, body_bytes
+}
+
+FNR == 1 {
+    if (NR > 1) end_file()
+    start_file()
+    prev_file = FILENAME
+}
+
+{
+    line = $0
+    sub(/\r$/, "", line)
+    if (state == 0) {
+        if (FNR == 1 && line ~ /^---[ \t]*$/) { state = 1; next }
+        state = 2
+    }
+    if (state == 1) {
+        if (line ~ /^(---|\.\.\.)[ \t]*$/) { finish_pending(); state = 3; next }
+        fm_line(line)
+        next
+    }
+    body_bytes += length($0) + 1
+}
+
+END {
+    if (NR > 0) end_file()
+}
@@ -8,7 +8,17 @@ set -euo pipefail
 #   2. Cache drift detection — compares source against installed cache
 #      using installed_plugins.json, git SHAs, and file diffs
 #      (works inside a running session; does NOT call `claude plugin list`)
-#   3. Offline sanity — executable hooks, valid event names, no duplicate hooks field
+#      With --deep, every file is compared via per-directory Merkle trees
+#   3. Offline sanity — executable hooks, valid event names, no duplicate hooks field,
+#      parseable skill/agent/command frontmatter (via the component catalog)
+#
+# Usage: ./scripts/plugin-doctor.sh [--jobs N] [--deep]
+#   --jobs N  Run the per-plugin part of each check on N workers (0 = all cores).
+#             Output is buffered per plugin and printed in marketplace.json order.
+#   --deep    Compare the full source tree against the installed cache and list
+#             every differing file. A stat/hash index per tree is kept in
+#             $DOCTOR_INDEX_DIR (default ~/.cache/flight505-marketplace/drift-index),
+#             so later runs only rehash files whose size/mtime changed.
 #
 # Exit 0 = all pass, Exit 1 = any failure.
 
@@ -27,6 +37,23 @@ read -ra PLUGINS <<< "$(get_plugins_string)"
 MARKETPLACE_NAME="flight505-plugins"
 FAILURES=0
 WARNINGS=0
+JOBS=1
+DEEP_MODE=false
+USAGE="Usage: $0 [--jobs N] [--deep]"
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --jobs|-j)
+            [ $# -ge 2 ] || { echo "$USAGE"; exit 1; }
+            JOBS="$2"; shift ;;
+        --jobs=*) JOBS="${1#*=}" ;;
+        --deep) DEEP_MODE=true ;;
+        -h|--help) echo "$USAGE"; exit 0 ;;
+        *) echo -e "${RED}Unknown option: $1${NC}"; echo "$USAGE"; exit 1 ;;
+    esac
+    shift
+done
+JOBS=$(resolve_jobs "$JOBS") || exit 1
 
 # Plugin cache and registry paths
 PLUGIN_CACHE="$HOME/.claude/plugins/cache/$MARKETPLACE_NAME"
@@ -34,6 +61,10 @@ INSTALLED_JSON="$HOME/.claude/plugins/installed_plugins.json"
 KNOWN_MARKETPLACES="$HOME/.claude/plugins/known_marketplaces.json"
 MARKETPLACE_CLONE="$HOME/.claude/plugins/marketplaces/$MARKETPLACE_NAME"
 
+# Deep drift index: a private bare repo holding only tree objects, plus one
+# git index file per compared directory (the persisted path/size/mtime/hash table)
+DRIFT_INDEX_DIR="${DOCTOR_INDEX_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/flight505-marketplace/drift-index}"
+
 # Valid hook event names (case-sensitive, Claude Code CLI spec)
 VALID_EVENTS="PreToolUse PostToolUse PostToolUseFailure Stop Notification SubagentStart SubagentStop TaskCompleted PreCompact SessionStart SessionEnd PermissionRequest TeammateIdle UserPromptSubmit"
 
@@ -57,16 +88,7 @@ check_cli_validate() {
         return 0
     fi
 
-    for plugin in "${PLUGINS[@]}"; do
-        local path
-        path=$(get_plugin_path "$plugin")
-        if claude plugin validate "$path" >/dev/null 2>&1; then
-            pass "$plugin"
-        else
-            fail "$plugin — claude plugin validate failed"
-            claude plugin validate "$path" 2>&1 | sed 's/^/       /' || true
-        fi
-    done
+    run_plugins_parallel "$JOBS" "FAILURES WARNINGS" check_cli_validate_plugin "${PLUGINS[@]}"
 
     # Marketplace-level validation
     if claude plugin validate "$MARKETPLACE_ROOT" >/dev/null 2>&1; then
@@ -77,6 +99,18 @@ check_cli_validate() {
     fi
 }
 
+check_cli_validate_plugin() {
+    local plugin=$1
+    local path
+    path=$(get_plugin_path "$plugin")
+    if claude plugin validate "$path" >/dev/null 2>&1; then
+        pass "$plugin"
+    else
+        fail "$plugin — claude plugin validate failed"
+        claude plugin validate "$path" 2>&1 | sed 's/^/       /' || true
+    fi
+}
+
 # ─── Check 2: Cache drift detection ────────────────────────────────
 # Compares source against installed cache by reading files directly.
 # Does NOT call `claude plugin list` (hangs inside a running session).
@@ -100,68 +134,15 @@ check_cache_drift() {
     fi
     pass "Marketplace '$MARKETPLACE_NAME' registered"
 
-    # 2b. Per-plugin: compare source SHA against installed SHA and cache content
-    for plugin in "${PLUGINS[@]}"; do
-        local src_path
-        src_path=$(get_plugin_path "$plugin")
-        local src_manifest="$src_path/.claude-plugin/plugin.json"
-
-        # Skip if source doesn't exist (submodule not initialized)
-        if [ ! -f "$src_manifest" ]; then
-            info "$plugin: source not found (submodule not initialized?)"
-            continue
-        fi
-
-        local src_version
-        src_version=$(jq -r '.version' "$src_manifest" 2>/dev/null) || true
-
-        # Check if plugin is in installed_plugins.json
-        local installed_entry
-        installed_entry=$(jq -r ".plugins[\"${plugin}@${MARKETPLACE_NAME}\"][0] // empty" "$INSTALLED_JSON" 2>/dev/null) || true
-
-        if [ -z "$installed_entry" ]; then
-            warn "$plugin v$src_version: not in installed_plugins.json (cached but not installed?)"
-            info "Run: claude plugin install ${plugin}@${MARKETPLACE_NAME}"
-            continue
-        fi
-
-        local installed_version installed_sha install_path
-        installed_version=$(echo "$installed_entry" | jq -r '.version') || true
-        installed_sha=$(echo "$installed_entry" | jq -r '.gitCommitSha // empty') || true
-        install_path=$(echo "$installed_entry" | jq -r '.installPath') || true
-
-        # Compare versions
-        if [ "$src_version" != "$installed_version" ]; then
-            fail "$plugin: version drift — source=$src_version, installed=$installed_version"
-            info "Run: claude plugin update ${plugin}@${MARKETPLACE_NAME}  (then restart Claude Code)"
-            continue
-        fi
-
-        # Compare git SHAs if available
-        local src_sha=""
-        if git -C "$src_path" rev-parse HEAD >/dev/null 2>&1; then
-            src_sha=$(git -C "$src_path" rev-parse HEAD 2>/dev/null) || true
-        fi
-
-        if [ -n "$installed_sha" ] && [ -n "$src_sha" ] && [ "$installed_sha" != "$src_sha" ]; then
-            fail "$plugin v$src_version: commit drift — source=${src_sha:0:7}, installed=${installed_sha:0:7}"
-            info "Source has newer commits. Run: claude plugin update ${plugin}@${MARKETPLACE_NAME}  (then restart)"
-            continue
-        fi
-
-        # Compare cached plugin.json against source plugin.json
-        local cached_manifest="$install_path/.claude-plugin/plugin.json"
-        if [ -f "$cached_manifest" ]; then
-            if ! diff -q "$src_manifest" "$cached_manifest" >/dev/null 2>&1; then
-                fail "$plugin v$src_version: plugin.json differs between source and cache"
-                diff "$src_manifest" "$cached_manifest" 2>/dev/null | sed 's/^/       /' || true
-                info "Run: claude plugin update ${plugin}@${MARKETPLACE_NAME}  (then restart)"
-                continue
-            fi
+    if [ "$DEEP_MODE" = true ]; then
+        if ! init_drift_index; then
+            warn "Cannot create drift index in $DRIFT_INDEX_DIR — falling back to plugin.json comparison"
+            DEEP_MODE=false
         fi
+    fi
 
-        pass "$plugin v$src_version (sha ${installed_sha:0:7})"
-    done
+    # 2b. Per-plugin: compare source SHA against installed SHA and cache content
+    run_plugins_parallel "$JOBS" "FAILURES WARNINGS" check_cache_drift_plugin "${PLUGINS[@]}"
 
     # 2c. Check marketplace clone freshness
     if [ -d "$MARKETPLACE_CLONE" ]; then
@@ -179,48 +160,141 @@ check_cache_drift() {
     fi
 }
 
+# Per-plugin part of check 2 (2b)
+check_cache_drift_plugin() {
+    local plugin=$1
+    local src_path
+    src_path=$(get_plugin_path "$plugin")
+    local src_manifest="$src_path/.claude-plugin/plugin.json"
+
+    # Skip if source doesn't exist (submodule not initialized)
+    if [ ! -f "$src_manifest" ]; then
+        info "$plugin: source not found (submodule not initialized?)"
+        return 0
+    fi
+
+    local src_version
+    src_version=$(jq -r '.version' "$src_manifest" 2>/dev/null) || true
+
+    # Check if plugin is in installed_plugins.json
+    local installed_entry
+    installed_entry=$(jq -r ".plugins[\"${plugin}@${MARKETPLACE_NAME}\"][0] // empty" "$INSTALLED_JSON" 2>/dev/null) || true
+
+    if [ -z "$installed_entry" ]; then
+        warn "$plugin v$src_version: not in installed_plugins.json (cached but not installed?)"
+        info "Run: claude plugin install ${plugin}@${MARKETPLACE_NAME}"
+        return 0
+    fi
+
+    local installed_version installed_sha install_path
+    installed_version=$(echo "$installed_entry" | jq -r '.version') || true
+    installed_sha=$(echo "$installed_entry" | jq -r '.gitCommitSha // empty') || true
+    install_path=$(echo "$installed_entry" | jq -r '.installPath') || true
+
+    # Compare versions
+    if [ "$src_version" != "$installed_version" ]; then
+        fail "$plugin: version drift — source=$src_version, installed=$installed_version"
+        info "Run: claude plugin update ${plugin}@${MARKETPLACE_NAME}  (then restart Claude Code)"
+        return 0
+    fi
+
+    # Compare git SHAs if available
+    local src_sha=""
+    if git -C "$src_path" rev-parse HEAD >/dev/null 2>&1; then
+        src_sha=$(git -C "$src_path" rev-parse HEAD 2>/dev/null) || true
+    fi
+
+    if [ -n "$installed_sha" ] && [ -n "$src_sha" ] && [ "$installed_sha" != "$src_sha" ]; then
+        fail "$plugin v$src_version: commit drift — source=${src_sha:0:7}, installed=${installed_sha:0:7}"
+        info "Source has newer commits. Run: claude plugin update ${plugin}@${MARKETPLACE_NAME}  (then restart)"
+        return 0
+    fi
+
+    if [ "$DEEP_MODE" = true ] && [ -d "$install_path" ]; then
+        check_tree_drift "$plugin" "$src_version" "$src_path" "$install_path" || return 0
+        pass "$plugin v$src_version (sha ${installed_sha:0:7}, tree ${DRIFT_TREE:0:7})"
+        return 0
+    fi
+
+    # Compare cached plugin.json against source plugin.json
+    local cached_manifest="$install_path/.claude-plugin/plugin.json"
+    if [ -f "$cached_manifest" ]; then
+        if ! diff -q "$src_manifest" "$cached_manifest" >/dev/null 2>&1; then
+            fail "$plugin v$src_version: plugin.json differs between source and cache"
+            diff "$src_manifest" "$cached_manifest" 2>/dev/null | sed 's/^/       /' || true
+            info "Run: claude plugin update ${plugin}@${MARKETPLACE_NAME}  (then restart)"
+            return 0
+        fi
+    fi
+
+    pass "$plugin v$src_version (sha ${installed_sha:0:7})"
+}
+
+# ─── Deep drift: Merkle trees over source and cache ─────────────────
+init_drift_index() {
+    mkdir -p "$DRIFT_INDEX_DIR" 2>/dev/null || return 1
+    [ -d "$DRIFT_INDEX_DIR/objects.git" ] && return 0
+    git init -q --bare "$DRIFT_INDEX_DIR/objects.git" >/dev/null 2>&1
+}
+
+# Print the root tree hash of a directory. update-index --refresh only rehashes
+# entries whose stat data changed; --info-only records blob hashes without
+# storing file contents, so the object store only ever holds trees.
+drift_tree_hash() {
+    local dir=$1
+    local key
+    key=$(printf '%s' "$dir" | git hash-object --stdin)
+    (
+        export GIT_DIR="$DRIFT_INDEX_DIR/objects.git"
+        export GIT_INDEX_FILE="$DRIFT_INDEX_DIR/$key.index"
+        export GIT_WORK_TREE="$dir"
+        cd "$dir" || exit 1
+        git ls-files -z --deleted | git update-index -z --remove --stdin
+        git update-index -q --refresh >/dev/null || true
+        git ls-files -z --modified --others --exclude=node_modules/ --exclude-per-directory=.gitignore \
+            | git update-index -z --add --remove --info-only --stdin
+        git write-tree --missing-ok
+    ) 2>/dev/null
+}
+
+# Compare source and cache trees; sets DRIFT_TREE. Returns 1 (after reporting)
+# when they differ. Identical subtrees share a hash, so diff-tree never walks them.
+check_tree_drift() {
+    local plugin=$1 version=$2 src_path=$3 install_path=$4
+    local src_tree cache_tree
+    DRIFT_TREE=""
+    src_tree=$(drift_tree_hash "$src_path") || true
+    cache_tree=$(drift_tree_hash "$install_path") || true
+    if [ -z "$src_tree" ] || [ -z "$cache_tree" ]; then
+        warn "$plugin v$version: could not index source or cache for deep comparison"
+        return 1
+    fi
+    DRIFT_TREE=$src_tree
+    [ "$src_tree" = "$cache_tree" ] && return 0
+
+    local changes count
+    changes=$(GIT_DIR="$DRIFT_INDEX_DIR/objects.git" git diff-tree -r --no-renames --raw "$src_tree" "$cache_tree" \
+        | awk -F'\t' '{
+            split($1, m, " ")
+            if (m[5] == "A") what = "only in cache"
+            else if (m[5] == "D") what = "missing from cache"
+            else if (m[3] == m[4]) what = "mode differs"
+            else what = "content differs"
+            printf "%s  (%s)\n", $2, what
+        }') || true
+    count=$(printf '%s\n' "$changes" | grep -c . || true)
+    fail "$plugin v$version: $count file(s) differ between source and cache"
+    printf '%s\n' "$changes" | sed 's/^/       /'
+    info "Run: claude plugin update ${plugin}@${MARKETPLACE_NAME}  (then restart)"
+    return 1
+}
+
 # ─── Check 3: Offline sanity checks ────────────────────────────────
 check_offline_sanity() {
     echo ""
     echo -e "${BLUE}=== Check 3: Offline sanity checks ===${NC}"
 
-    for plugin in "${PLUGINS[@]}"; do
-        local path
-        path=$(get_plugin_path "$plugin")
-        local hooks_dir="$path/hooks"
-        local hooks_json="$hooks_dir/hooks.json"
-        local manifest="$path/.claude-plugin/plugin.json"
-
-        # 3a. Hook scripts must be executable
-        if [ -d "$hooks_dir" ]; then
-            while IFS= read -r script; do
-                if [ ! -x "$script" ]; then
-                    fail "$plugin: not executable — $script"
-                fi
-            done < <(find "$hooks_dir" -name "*.sh" -type f 2>/dev/null)
-        fi
-
-        # 3b. hooks.json event names must be valid
-        if [ -f "$hooks_json" ]; then
-            local events
-            events=$(jq -r '.hooks | keys[]' "$hooks_json" 2>/dev/null) || true
-            for event in $events; do
-                if ! echo "$VALID_EVENTS" | tr ' ' '\n' | grep -qx "$event"; then
-                    fail "$plugin: unknown hook event '$event' in hooks.json"
-                fi
-            done
-            pass "$plugin: hook events valid"
-        fi
-
-        # 3c. Manifest must NOT have a "hooks" field (hooks/hooks.json is auto-discovered)
-        if [ -f "$manifest" ]; then
-            local hooks_field
-            hooks_field=$(jq -r 'if .hooks then (.hooks | type) else empty end' "$manifest" 2>/dev/null) || true
-            if [ -n "$hooks_field" ]; then
-                fail "$plugin: plugin.json has explicit 'hooks' field ($hooks_field) — remove it; hooks/hooks.json is auto-discovered"
-            fi
-        fi
-    done
+    run_plugins_parallel "$JOBS" "FAILURES WARNINGS" check_offline_sanity_plugin "${PLUGINS[@]}"
 
     # 3d. Marketplace-level check
     local mp_manifest="$MARKETPLACE_ROOT/.claude-plugin/plugin.json"
@@ -235,6 +309,70 @@ check_offline_sanity() {
     pass "Offline sanity checks complete"
 }
 
+# Per-plugin part of check 3 (3a-3c, 3e)
+check_offline_sanity_plugin() {
+    local plugin=$1
+    local path
+    path=$(get_plugin_path "$plugin")
+    local hooks_dir="$path/hooks"
+    local hooks_json="$hooks_dir/hooks.json"
+    local manifest="$path/.claude-plugin/plugin.json"
+
+    # 3a. Hook scripts must be executable
+    if [ -d "$hooks_dir" ]; then
+        while IFS= read -r script; do
+            if [ ! -x "$script" ]; then
+                fail "$plugin: not executable — $script"
+            fi
+        done < <(find "$hooks_dir" -name "*.sh" -type f 2>/dev/null)
+    fi
+
+    # 3b. hooks.json event names must be valid
+    if [ -f "$hooks_json" ]; then
+        local events
+        events=$(jq -r '.hooks | keys[]' "$hooks_json" 2>/dev/null) || true
+        for event in $events; do
+            if ! echo "$VALID_EVENTS" | tr ' ' '\n' | grep -qx "$event"; then
+                fail "$plugin: unknown hook event '$event' in hooks.json"
+            fi
+        done
+        pass "$plugin: hook events valid"
+    fi
+
+    # 3c. Manifest must NOT have a "hooks" field (hooks/hooks.json is auto-discovered)
+    if [ -f "$manifest" ]; then
+        local hooks_field
+        hooks_field=$(jq -r 'if .hooks then (.hooks | type) else empty end' "$manifest" 2>/dev/null) || true
+        if [ -n "$hooks_field" ]; then
+            fail "$plugin: plugin.json has explicit 'hooks' field ($hooks_field) — remove it; hooks/hooks.json is auto-discovered"
+        fi
+    fi
+
+    # 3e. Skill/agent/command frontmatter must parse (from the component catalog);
+    #     valid YAML the parser skips is only a warning
+    [ -d "$path" ] || return 0
+    local catalog
+    if ! catalog=$(component_catalog "$path"); then
+        warn "$plugin: could not build component catalog"
+        return 0
+    fi
+    local component_errors component_warnings
+    component_errors=$(jq -r '.components[] | select(.errors | length > 0) | "\(.path): \(.errors | join("; "))"' "$catalog") || true
+    component_warnings=$(jq -r '.components[] | select(.warnings // [] | length > 0) | "\(.path): \(.warnings | join("; "))"' "$catalog") || true
+    if [ -n "$component_warnings" ]; then
+        while IFS= read -r line; do
+            warn "$plugin: unsupported frontmatter skipped — $line"
+        done <<< "$component_warnings"
+    fi
+    if [ -n "$component_errors" ]; then
+        while IFS= read -r line; do
+            fail "$plugin: invalid frontmatter — $line"
+        done <<< "$component_errors"
+    else
+        pass "$plugin: $(jq -r '[.components | group_by(.kind)[] | "\(length) \(.[0].kind)s"] | join(", ") | if . == "" then "no components" else . end' "$catalog") — frontmatter valid"
+    fi
+}
+
 # ─── Main ───────────────────────────────────────────────────────────
 echo -e "${BLUE}Plugin Doctor — Native CLI Validation${NC}"
 echo -e "${BLUE}Marketplace: $MARKETPLACE_ROOT${NC}"
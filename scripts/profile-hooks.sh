@@ -0,0 +1,440 @@
+#!/bin/bash
+set -euo pipefail
+
+# Hook Latency Profiler
+#
+# Runs every command hook in each plugin's hooks/hooks.json against synthetic
+# event payloads and reports p50/p95/p99 latency and peak RSS per hook. Hooks on
+# PreToolUse/PostToolUse/UserPromptSubmit run on every tool call or prompt, so a
+# slow one adds latency to every session of every user.
+#
+# Usage: ./scripts/profile-hooks.sh [plugin...] [options]
+#   --runs N            Timed runs per hook and payload (default: 20)
+#   --warmup N          Untimed runs first, to fill disk caches (default: 2)
+#   --budget EVENT=MS   Override the latency budget for one event (repeatable);
+#                       a bare MS sets it for every event
+#   --percentile P      Percentile compared against the budget: 50, 95 or 99 (default: 95)
+#   --format text|json  Also emit results as JSON (default: text)
+#   --output FILE       Write the JSON report to FILE instead of stdout (without
+#                       it, json mode keeps stdout for the report and logs to stderr)
+#
+# Each hook runs the way Claude Code runs it: `${CLAUDE_PLUGIN_ROOT}` is
+# expanded, the command is run with `bash -c` from the project directory with
+# the event payload on stdin, and the hook's own `timeout` (default 60s) applies.
+# Everything happens in a throwaway sandbox — a copy of the plugin, a small git
+# project, a transcript file and an empty $HOME — so hooks that write state
+# cannot touch the source tree or your real ~/.claude.
+#
+# Payloads are built per event and matcher: a PreToolUse hook matching
+# "Edit|Write" is profiled once with an Edit payload and once with a Write
+# payload; catch-all matchers use Bash, Edit and Read. Hooks are run one at a
+# time so the numbers are not skewed by each other.
+#
+# Exit 0 = every hook within budget, Exit 1 = a hook over budget, timed out or not runnable.
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
+# Colors
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+BLUE='\033[0;34m'
+NC='\033[0m'
+
+RUNS=20
+WARMUP=2
+PERCENTILE=95
+OUTPUT_FORMAT="text"
+OUTPUT_FILE=""
+BUDGET_OVERRIDES=()
+TARGETS=()
+FAILURES=0
+WARNINGS=0
+USAGE="Usage: $0 [plugin...] [--runs N] [--warmup N] [--budget EVENT=MS]... [--percentile 50|95|99] [--format text|json] [--output FILE]"
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --runs|--warmup|--budget|--percentile|--format|--output)
+            [ $# -ge 2 ] || { echo "$USAGE"; exit 1; }
+            case "$1" in
+                --runs) RUNS="$2" ;;
+                --warmup) WARMUP="$2" ;;
+                --budget) BUDGET_OVERRIDES+=("$2") ;;
+                --percentile) PERCENTILE="$2" ;;
+                --format) OUTPUT_FORMAT="$2" ;;
+                --output) OUTPUT_FILE="$2" ;;
+            esac
+            shift ;;
+        -h|--help) echo "$USAGE"; exit 0 ;;
+        -*) echo -e "${RED}Unknown option: $1${NC}"; echo "$USAGE"; exit 1 ;;
+        *) TARGETS+=("$1") ;;
+    esac
+    shift
+done
+
+for value in "$RUNS" "$WARMUP"; do
+    if [[ ! "$value" =~ ^[0-9]+$ ]]; then
+        echo -e "${RED}Expected a number, got '$value'${NC}"
+        exit 1
+    fi
+done
+[ "$RUNS" -ge 1 ] || RUNS=1
+case "$PERCENTILE" in
+    50|95|99) ;;
+    *) echo -e "${RED}--percentile must be 50, 95 or 99${NC}"; exit 1 ;;
+esac
+case "$OUTPUT_FORMAT" in
+    text|json) ;;
+    *) echo -e "${RED}--format must be text or json${NC}"; exit 1 ;;
+esac
+
+# Keep stdout clean for the JSON report; the log goes to stderr
+if [ "$OUTPUT_FORMAT" = "json" ] && [ -z "$OUTPUT_FILE" ]; then
+    exec 4>&1 1>&2
+fi
+for override in ${BUDGET_OVERRIDES[@]+"${BUDGET_OVERRIDES[@]}"}; do
+    if [[ ! "$override" =~ ^([A-Za-z]+=)?[0-9]+$ ]]; then
+        echo -e "${RED}Invalid --budget '$override' (expected EVENT=MS or MS)${NC}"
+        exit 1
+    fi
+done
+
+if [ ${#TARGETS[@]} -eq 0 ]; then
+    read -ra TARGETS <<< "$(get_plugins_string)"
+fi
+for plugin in "${TARGETS[@]}"; do
+    if ! is_valid_plugin "$plugin"; then
+        echo -e "${RED}Error: Unknown plugin '$plugin'${NC}"
+        echo "Valid plugins: $(get_plugins_string)"
+        exit 1
+    fi
+done
+
+# Per-event latency budgets in ms. Events on the tool-call and prompt path get
+# the tightest budgets; session-level events run once and can afford more.
+default_budget() {
+    case "$1" in
+        PreToolUse|PostToolUse|PermissionRequest) echo 100 ;;
+        PostToolUseFailure|UserPromptSubmit) echo 200 ;;
+        Stop|SubagentStart|SubagentStop|Notification|TaskCompleted|TeammateIdle) echo 500 ;;
+        *) echo 1000 ;;
+    esac
+}
+
+# An EVENT=MS override beats a bare MS one, which beats the default
+budget_for() {
+    local event="$1" all="" specific="" override
+    for override in ${BUDGET_OVERRIDES[@]+"${BUDGET_OVERRIDES[@]}"}; do
+        case "$override" in
+            "$event="*) specific=${override#*=} ;;
+            *=*) ;;
+            *) all=$override ;;
+        esac
+    done
+    if [ -n "$specific" ]; then
+        echo "$specific"
+    elif [ -n "$all" ]; then
+        echo "$all"
+    else
+        default_budget "$event"
+    fi
+}
+
+TIMEOUT_BIN=$(command -v timeout || command -v gtimeout || true)
+detect_rss_method
+
+# ─── Payloads ───────────────────────────────────────────────────────
+
+# Tools a PreToolUse/PostToolUse/PermissionRequest matcher is tried against
+KNOWN_TOOLS="Bash Edit MultiEdit Write Read Glob Grep Task WebFetch WebSearch NotebookEdit TodoWrite mcp__memory__search_nodes"
+
+# Values fed to each event's matcher (SessionStart source, PreCompact trigger, ...)
+matcher_values() {
+    case "$1" in
+        SessionStart) echo "startup resume clear compact" ;;
+        SessionEnd) echo "clear logout prompt_input_exit other" ;;
+        PreCompact) echo "manual auto" ;;
+        Notification) echo "permission_prompt idle_prompt" ;;
+        *) echo "" ;;
+    esac
+}
+
+# payload_targets <event> <matcher>: the tool names / matcher values to profile
+# the hook with, one per line ("-" for events without a matcher)
+payload_targets() {
+    local event="$1" matcher="$2" candidates="" value matched=""
+    case "$event" in
+        PreToolUse|PostToolUse|PostToolUseFailure|PermissionRequest)
+            if [ -z "$matcher" ] || [ "$matcher" = "*" ] || [ "$matcher" = ".*" ]; then
+                printf '%s\n' Bash Edit Read
+                return 0
+            fi
+            candidates=$KNOWN_TOOLS ;;
+        SubagentStart|SubagentStop)
+            # Matchers name agent types; without one, any agent
+            if [ -z "$matcher" ] || [ "$matcher" = "*" ]; then
+                echo "general-purpose"
+            else
+                echo "${matcher%%|*}"
+            fi
+            return 0 ;;
+        *)
+            candidates=$(matcher_values "$event")
+            if [ -z "$candidates" ]; then
+                echo "-"
+                return 0
+            fi
+            if [ -z "$matcher" ] || [ "$matcher" = "*" ]; then
+                echo "${candidates%% *}"
+                return 0
+            fi ;;
+    esac
+
+    for value in $candidates; do
+        if [[ "$value" =~ ^($matcher)$ ]]; then
+            echo "$value"
+            matched=1
+        fi
+    done
+    # A literal name we have no template for (e.g. an MCP tool) still gets a payload
+    [ -n "$matched" ] || echo "${matcher%%|*}"
+}
+
+PAYLOAD_JQ='
+  def tool_input:
+    if $tool == "Bash" then {command: "git status --short && npm test -- --silent", description: "Show working tree status and run tests"}
+    elif $tool == "Edit" then {file_path: ($cwd + "/src/app.py"), old_string: "return a + b", new_string: "return sum((a, b))"}
+    elif $tool == "MultiEdit" then {file_path: ($cwd + "/src/app.py"), edits: [{old_string: "return a + b", new_string: "return sum((a, b))"}]}
+    elif $tool == "Write" then {file_path: ($cwd + "/src/report.py"), content: "def report(items):\n    return len(items)\n"}
+    elif $tool == "Read" then {file_path: ($cwd + "/src/app.py")}
+    elif $tool == "Glob" then {pattern: "src/**/*.py"}
+    elif $tool == "Grep" then {pattern: "def ", path: "src", output_mode: "files_with_matches"}
+    elif $tool == "Task" then {description: "Map the codebase", prompt: "List every module under src/ and its imports.", subagent_type: "general-purpose"}
+    elif $tool == "WebFetch" then {url: "https://docs.anthropic.com/en/docs/claude-code/hooks", prompt: "Summarize the hook input schema"}
+    elif $tool == "WebSearch" then {query: "claude code hooks input schema"}
+    elif $tool == "NotebookEdit" then {notebook_path: ($cwd + "/notebook.ipynb"), cell_id: "cell-1", new_source: "print(1)"}
+    elif $tool == "TodoWrite" then {todos: [{content: "Run tests", status: "in_progress", activeForm: "Running tests"}]}
+    else {query: "example"}
+    end;
+  def tool_response:
+    if $tool == "Bash" then {stdout: " M src/app.py\n", stderr: "", interrupted: false, isImage: false}
+    elif $tool == "Read" then {type: "text", file: {filePath: ($cwd + "/src/app.py"), content: "def add(a, b):\n    return a + b\n", numLines: 2, startLine: 1, totalLines: 2}}
+    elif ($tool == "Edit" or $tool == "MultiEdit" or $tool == "Write") then {filePath: tool_input.file_path, success: true}
+    else {success: true}
+    end;
+  {
+    session_id: "00000000-0000-4000-8000-000000000000",
+    transcript_path: $transcript,
+    cwd: $cwd,
+    permission_mode: "default",
+    hook_event_name: $event
+  }
+  + if $event == "PreToolUse" or $event == "PermissionRequest" then
+      {tool_name: $tool, tool_input: tool_input, tool_use_id: "toolu_profile"}
+    elif $event == "PostToolUse" then
+      {tool_name: $tool, tool_input: tool_input, tool_response: tool_response, tool_use_id: "toolu_profile"}
+    elif $event == "PostToolUseFailure" then
+      {tool_name: $tool, tool_input: tool_input, tool_use_id: "toolu_profile", error: "Command failed with exit code 1"}
+    elif $event == "UserPromptSubmit" then
+      {prompt: "Refactor src/app.py so add() handles lists, then run the tests."}
+    elif $event == "Notification" then
+      {message: "Claude needs your permission to use Bash", notification_type: $tool}
+    elif $event == "Stop" then
+      {stop_hook_active: false}
+    elif $event == "SubagentStart" then
+      {agent_id: "agent_profile", agent_type: $tool}
+    elif $event == "SubagentStop" then
+      {stop_hook_active: false, agent_id: "agent_profile", agent_type: $tool, agent_transcript_path: $transcript}
+    elif $event == "PreCompact" then
+      {trigger: $tool, custom_instructions: ""}
+    elif $event == "SessionStart" then
+      {source: $tool}
+    elif $event == "SessionEnd" then
+      {reason: $tool}
+    elif $event == "TaskCompleted" then
+      {task_id: "1", task_subject: "Run tests", task_description: "Run the test suite"}
+    elif $event == "TeammateIdle" then
+      {teammate_name: "implementer", team_name: "profile"}
+    else {} end'
+
+# Command hooks as rows: event, matcher, timeout (s), command — \x1f-separated
+HOOK_ROWS_JQ='
+  .hooks | objects | to_entries[] | .key as $event
+  | .value[]? | objects | (.matcher // "" | tostring) as $matcher
+  | .hooks[]? | objects | select((.type // "command") == "command" and (.command | type) == "string")
+  | [$event, $matcher, (.timeout // 60 | tostring), .command] | join("\u001f")'
+
+# ─── Sandbox ────────────────────────────────────────────────────────
+WORK="$(mktemp -d "${TMPDIR:-/tmp}/profile-hooks.XXXXXX")"
+trap 'rm -rf "$WORK"' EXIT
+PROJECT="$WORK/project"
+TRANSCRIPT="$WORK/transcript.jsonl"
+RESULTS="$WORK/results.tsv"
+: > "$RESULTS"
+
+mkdir -p "$PROJECT/src" "$WORK/home" "$WORK/plugins" "$WORK/payloads"
+printf 'def add(a, b):\n    return a + b\n' > "$PROJECT/src/app.py"
+printf '# Sandbox project\n' > "$PROJECT/README.md"
+git -C "$PROJECT" init -q
+git -C "$PROJECT" add -A
+git -C "$PROJECT" -c user.name=profile -c user.email=profile@localhost commit -q -m "sandbox project"
+jq -cn '{type: "user", message: {role: "user", content: "Refactor src/app.py"}},
+        {type: "assistant", message: {role: "assistant", content: [{type: "text", text: "Reading src/app.py first."}]}}' > "$TRANSCRIPT"
+
+fail() { echo -e "${RED}FAIL: $1${NC}"; FAILURES=$((FAILURES + 1)); }
+warn() { echo -e "${YELLOW}WARN: $1${NC}"; WARNINGS=$((WARNINGS + 1)); }
+
+# Percentiles (nearest rank) of the ms values on stdin: "p50 p95 p99 max"
+percentiles() {
+    sort -n | awk '
+        { v[++n] = $1 }
+        function rank(p,    r) { r = int(p * n / 100); if (r < p * n / 100) r++; return v[r < 1 ? 1 : r] }
+        END { if (n) printf "%s %s %s %s\n", rank(50), rank(95), rank(99), v[n] }'
+}
+
+# run_hook <plugin-root> <timeout> <command> <payload>: exit code in HOOK_EXIT
+run_hook() {
+    local root="$1" timeout="$2" command="$3" payload="$4"
+    HOOK_EXIT=0
+    if [ -n "$TIMEOUT_BIN" ]; then
+        (cd "$PROJECT" && HOME="$WORK/home" CLAUDE_PLUGIN_ROOT="$root" CLAUDE_PROJECT_DIR="$PROJECT" \
+            "$TIMEOUT_BIN" "$timeout" bash -c "$command" < "$payload" > "$WORK/stdout" 2> "$WORK/stderr") || HOOK_EXIT=$?
+    else
+        (cd "$PROJECT" && HOME="$WORK/home" CLAUDE_PLUGIN_ROOT="$root" CLAUDE_PROJECT_DIR="$PROJECT" \
+            bash -c "$command" < "$payload" > "$WORK/stdout" 2> "$WORK/stderr") || HOOK_EXIT=$?
+    fi
+}
+
+# profile_hook <plugin> <root> <event> <matcher> <timeout> <hooks.json command> <target>
+profile_hook() {
+    local plugin="$1" root="$2" event="$3" matcher="$4" timeout="$5" original="$6" target="$7"
+    local payload="$WORK/payloads/$event-${target//[^A-Za-z0-9_-]/_}.json"
+    local command=${original//'${CLAUDE_PLUGIN_ROOT}'/$root}
+    local label="$event${matcher:+[$matcher]}"
+    local run start samples="" stats p50 p95 p99 max rss budget measured errors=0 status
+    command=${command//'$CLAUDE_PLUGIN_ROOT'/$root}
+    [ "$target" != "-" ] && [ "$target" != "$matcher" ] && label="$label($target)"
+    label="$plugin $label: ${original//'${CLAUDE_PLUGIN_ROOT}/'/}"
+
+    HOOK_EXIT=0
+    jq -n --arg event "$event" --arg tool "$target" --arg cwd "$PROJECT" \
+        --arg transcript "$TRANSCRIPT" "$PAYLOAD_JQ" > "$payload"
+
+    for ((run = 1; run <= WARMUP; run++)); do
+        run_hook "$root" "$timeout" "$command" "$payload"
+        [ "$HOOK_EXIT" -eq 124 ] && break
+    done
+    if [ "$HOOK_EXIT" -ne 124 ]; then
+        for ((run = 1; run <= RUNS; run++)); do
+            now_us; start=$NOW_US
+            run_hook "$root" "$timeout" "$command" "$payload"
+            now_us
+            samples="$samples$(( (NOW_US - start) / 1000 )).$(printf '%03d' $(( (NOW_US - start) % 1000 )))"$'\n'
+            [ "$HOOK_EXIT" -eq 124 ] && break
+            # 0 = allow, 2 = block (a legitimate verdict); anything else is a hook error
+            [ "$HOOK_EXIT" -ne 0 ] && [ "$HOOK_EXIT" -ne 2 ] && errors=$((errors + 1))
+        done
+    fi
+
+    if [ "$HOOK_EXIT" -eq 124 ]; then
+        fail "$label timed out after ${timeout}s"
+        printf '%s\t%s\t%s\t%s\t%s\t\t\t\t\t\t%s\t%s\ttimeout\n' \
+            "$plugin" "$event" "$matcher" "$target" "$original" "$(budget_for "$event")" "$HOOK_EXIT" >> "$RESULTS"
+        return 0
+    fi
+
+    # One extra, untimed run under the RSS backend for peak memory
+    (cd "$PROJECT" && HOME="$WORK/home" CLAUDE_PLUGIN_ROOT="$root" CLAUDE_PROJECT_DIR="$PROJECT" \
+        run_with_rss "$WORK/rss" bash -c "$command" < "$payload" > /dev/null 2>&1) || true
+    rss=$(tail -n 1 "$WORK/rss" | tr -dc '0-9')
+
+    stats=$(printf '%s' "$samples" | percentiles)
+    read -r p50 p95 p99 max <<< "$stats"
+    budget=$(budget_for "$event")
+    case "$PERCENTILE" in
+        50) measured=$p50 ;;
+        95) measured=$p95 ;;
+        99) measured=$p99 ;;
+    esac
+
+    status=ok
+    if awk -v m="$measured" -v b="$budget" 'BEGIN { exit !(m > b) }'; then
+        status=over-budget
+        fail "$label p$PERCENTILE ${measured}ms exceeds the $event budget of ${budget}ms"
+    elif [ "$errors" -gt 0 ]; then
+        status=error
+        warn "$label exited $HOOK_EXIT on $errors/$RUNS runs: $(head -n 1 "$WORK/stderr" | cut -c1-120)"
+    fi
+    printf '%9s %9s %9s %9s %9s %7s  %s\n' "$p50" "$p95" "$p99" "$max" "${rss:-n/a}" "$budget" "$label"
+    printf '%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
+        "$plugin" "$event" "$matcher" "$target" "$original" "$p50" "$p95" "$p99" "$max" "$rss" "$budget" "$HOOK_EXIT" "$status" >> "$RESULTS"
+}
+
+# ─── Run ────────────────────────────────────────────────────────────
+echo -e "${BLUE}Hook profile: ${#TARGETS[@]} plugin(s), $RUNS runs + $WARMUP warmup, budget at p$PERCENTILE, peak RSS via $RSS_METHOD${NC}"
+[ -n "$TIMEOUT_BIN" ] || echo -e "${YELLOW}timeout(1) not found — hook timeouts are not enforced${NC}"
+[ "$RSS_METHOD" = "unavailable" ] && echo -e "${YELLOW}GNU time not found — peak RSS is reported as n/a (install the time / gnu-time package)${NC}"
+echo ""
+printf '%9s %9s %9s %9s %9s %7s  %s\n' "p50_ms" "p95_ms" "p99_ms" "max_ms" "rss_kb" "budget" "hook"
+
+HOOK_COUNT=0
+# Plugin-root script path in a hook command (may be preceded by an interpreter)
+script_ref='\$\{?CLAUDE_PLUGIN_ROOT\}?/([^ '"'"'"]+)'
+for plugin in "${TARGETS[@]}"; do
+    hooks_json="$MARKETPLACE_ROOT/$plugin/hooks/hooks.json"
+    [ -f "$hooks_json" ] || continue
+    if ! rows=$(jq -r "$HOOK_ROWS_JQ" "$hooks_json" 2>/dev/null); then
+        fail "$plugin: hooks/hooks.json is invalid JSON"
+        continue
+    fi
+    [ -n "$rows" ] || continue
+
+    # Hooks run against a copy, so state they write never lands in the source tree
+    root="$WORK/plugins/$plugin"
+    cp -R "$MARKETPLACE_ROOT/$plugin" "$root"
+
+    while IFS=$'\x1f' read -r event matcher timeout command; do
+        if [[ "$command" =~ $script_ref ]] && [ ! -x "$root/${BASH_REMATCH[1]}" ]; then
+            fail "$plugin: $event hook script is missing or not executable: ${BASH_REMATCH[1]}"
+            continue
+        fi
+        while read -r target; do
+            HOOK_COUNT=$((HOOK_COUNT + 1))
+            profile_hook "$plugin" "$root" "$event" "$matcher" "$timeout" "$command" "$target"
+        done < <(payload_targets "$event" "$matcher")
+    done <<< "$rows"
+done
+
+echo ""
+if [ "$HOOK_COUNT" -eq 0 ] && [ "$FAILURES" -eq 0 ]; then
+    echo -e "${YELLOW}No command hooks found${NC}"
+fi
+
+if [ "$OUTPUT_FORMAT" = "json" ]; then
+    report=$(jq -R -s --argjson runs "$RUNS" --argjson percentile "$PERCENTILE" --arg rss_method "$RSS_METHOD" '
+        def num: if . == "" then null else tonumber end;
+        {
+          tool: "profile-hooks",
+          runs: $runs,
+          percentile: $percentile,
+          rss_method: $rss_method,
+          hooks: [split("\n")[] | select(length > 0) | split("\t")
+            | {plugin: .[0], event: .[1], matcher: .[2], payload: .[3], command: .[4],
+               p50_ms: (.[5] | num), p95_ms: (.[6] | num), p99_ms: (.[7] | num), max_ms: (.[8] | num),
+               peak_rss_kb: (.[9] | num), budget_ms: (.[10] | num), exit_code: (.[11] | num), status: .[12]}]
+        }' "$RESULTS")
+    if [ -n "$OUTPUT_FILE" ]; then
+        printf '%s\n' "$report" > "$OUTPUT_FILE"
+        echo -e "${BLUE}JSON report written to $OUTPUT_FILE${NC}"
+    else
+        printf '%s\n' "$report" >&4
+    fi
+fi
+
+if [ "$FAILURES" -gt 0 ]; then
+    echo -e "${RED}$HOOK_COUNT hook payload(s) profiled: $FAILURES failure(s), $WARNINGS warning(s)${NC}"
+    exit 1
+fi
+echo -e "${GREEN}$HOOK_COUNT hook payload(s) profiled: all within budget, $WARNINGS warning(s)${NC}"
+exit 0
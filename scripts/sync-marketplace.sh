@@ -0,0 +1,180 @@
+#!/bin/bash
+set -euo pipefail
+
+# Marketplace Sync — batched submodule update + marketplace.json version sync
+# Usage: ./scripts/sync-marketplace.sh [--plugin NAME]... [--no-fetch] [--commit] [--allow-file-protocol]
+#
+#   --plugin NAME          Only fetch/sync this plugin's submodule (repeatable).
+#                          Default: every submodule.
+#   --no-fetch             Skip `git submodule update --remote`; sync whatever
+#                          the submodule checkouts currently point at.
+#   --commit               Stage the changed submodules + marketplace.json and commit
+#                          (push is left to the caller).
+#   --allow-file-protocol  Allow file:// submodule URLs, for running offline
+#                          against local bare repos:
+#                            git config submodule.<name>.url file:///tmp/remotes/<name>.git
+#                            ./scripts/sync-marketplace.sh --plugin <name> --allow-file-protocol
+#
+# All submodule deltas (vs HEAD) come from a single `git diff --submodule=short` pass,
+# all plugin.json versions from a single jq read, and every version change plus
+# the marketplace patch bump is applied in one atomic write of marketplace.json.
+#
+# When $GITHUB_OUTPUT is set, writes: has_changes, updates, new_marketplace_version.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
+USAGE="Usage: $0 [--plugin NAME]... [--no-fetch] [--commit] [--allow-file-protocol]"
+TARGETS=()
+FETCH=true
+COMMIT=false
+GIT_OPTS=()
+
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --plugin|-p)
+      [ $# -ge 2 ] || { echo "$USAGE"; exit 1; }
+      [ -n "$2" ] && TARGETS+=("$2")
+      shift ;;
+    --plugin=*) [ -n "${1#*=}" ] && TARGETS+=("${1#*=}") ;;
+    --no-fetch) FETCH=false ;;
+    --commit) COMMIT=true ;;
+    --allow-file-protocol) GIT_OPTS=(-c protocol.file.allow=always) ;;
+    -h|--help) echo "$USAGE"; exit 0 ;;
+    *) echo -e "${RED}Unknown option: $1${NC}"; echo "$USAGE"; exit 1 ;;
+  esac
+  shift
+done
+
+cd "$MARKETPLACE_ROOT"
+MARKETPLACE_REL=".claude-plugin/marketplace.json"
+read -ra ALL_PLUGINS <<< "$(get_plugins_string)"
+
+for plugin in ${TARGETS[@]+"${TARGETS[@]}"}; do
+  if ! is_valid_plugin "$plugin"; then
+    echo -e "${RED}Error: Unknown plugin '$plugin'${NC}"
+    echo "Valid plugins: $(get_plugins_string)"
+    exit 1
+  fi
+done
+
+# ─── Fetch ──────────────────────────────────────────────────────────
+if [ "$FETCH" = true ]; then
+  if [ ${#TARGETS[@]} -gt 0 ]; then
+    echo -e "${BLUE}Updating submodules: ${TARGETS[*]}${NC}"
+    git ${GIT_OPTS[@]+"${GIT_OPTS[@]}"} submodule update --init --remote --recursive -- "${TARGETS[@]}"
+  else
+    echo -e "${BLUE}Updating all submodules...${NC}"
+    git ${GIT_OPTS[@]+"${GIT_OPTS[@]}"} submodule update --init --remote --recursive
+  fi
+fi
+
+# ─── Deltas: one diff pass over all plugin submodules ──────────────
+SCOPE=(${TARGETS[@]+"${TARGETS[@]}"})
+[ ${#SCOPE[@]} -eq 0 ] && SCOPE=("${ALL_PLUGINS[@]}")
+
+CHANGED=()
+OLD_COMMITS=()
+NEW_COMMITS=()
+while IFS=$'\t' read -r path old new; do
+  CHANGED+=("$path")
+  OLD_COMMITS+=("$old")
+  NEW_COMMITS+=("$new")
+done < <(git diff --no-color --submodule=short HEAD -- "${SCOPE[@]}" | awk '
+  /^diff --git / { path = substr($3, 3); old = "" }
+  /^-Subproject commit / { old = $3 }
+  /^\+Subproject commit / { new = $3; sub(/-dirty$/, "", new); print path "\t" old "\t" new }
+')
+
+write_output() {
+  [ -n "${GITHUB_OUTPUT:-}" ] || return 0
+  printf '%s\n' "$@" >> "$GITHUB_OUTPUT"
+}
+
+if [ ${#CHANGED[@]} -eq 0 ]; then
+  echo -e "${GREEN}✅ All plugins are already up to date${NC}"
+  write_output "has_changes=false"
+  exit 0
+fi
+
+# ─── Versions: one jq read of every checked-out plugin.json ────────
+MANIFESTS=()
+for plugin in "${SCOPE[@]}"; do
+  [ -f "$plugin/.claude-plugin/plugin.json" ] && MANIFESTS+=("$plugin/.claude-plugin/plugin.json")
+done
+
+VERSIONS='{}'
+if [ ${#MANIFESTS[@]} -gt 0 ]; then
+  VERSIONS=$(jq -cn '
+    [inputs | select(.version | type == "string")
+      | {key: (input_filename | split("/")[0]), value: .version}]
+    | from_entries' "${MANIFESTS[@]}") || {
+    echo -e "${RED}Error: could not read plugin.json versions${NC}"
+    exit 1
+  }
+fi
+
+UPDATES=""
+for i in "${!CHANGED[@]}"; do
+  plugin=${CHANGED[$i]}
+  old=${OLD_COMMITS[$i]}
+  new=${NEW_COMMITS[$i]}
+  version=$(jq -r --arg p "$plugin" '.[$p] // empty' <<< "$VERSIONS")
+  if [ -n "$version" ]; then
+    echo "Updated ${plugin} to version ${version} (${new:0:7})"
+    UPDATES="${UPDATES}- ${plugin}: ${version} (${old:0:7} → ${new:0:7})"$'\n'
+  else
+    echo "Updated ${plugin} (${new:0:7})"
+    UPDATES="${UPDATES}- ${plugin}: ${old:0:7} → ${new:0:7}"$'\n'
+  fi
+done
+
+# ─── Single atomic write of marketplace.json ───────────────────────
+CURRENT_VERSION=$(jq -r '.version' "$MARKETPLACE_JSON")
+TMP_JSON=$(mktemp "$MARKETPLACE_JSON.XXXXXX")
+trap 'rm -f "$TMP_JSON"' EXIT
+
+if ! jq --argjson versions "$VERSIONS" '
+  .plugins |= map(if $versions[.name] then .version = $versions[.name] else . end)
+  | .version |= (split(".") | .[2] = ((.[2] | tonumber) + 1 | tostring) | join("."))
+' "$MARKETPLACE_JSON" > "$TMP_JSON"; then
+  echo -e "${RED}Error: could not update $MARKETPLACE_REL (version '$CURRENT_VERSION')${NC}"
+  exit 1
+fi
+
+jq -r --argjson versions "$VERSIONS" '
+  .plugins[] | select($versions[.name] and $versions[.name] != .version)
+  | "Updated \(.name) version to \($versions[.name]) in marketplace.json"
+' "$MARKETPLACE_JSON"
+
+chmod 644 "$TMP_JSON"
+mv "$TMP_JSON" "$MARKETPLACE_JSON"
+NEW_MARKETPLACE_VERSION=$(jq -r '.version' "$MARKETPLACE_JSON")
+echo -e "${GREEN}Bumped marketplace version: ${CURRENT_VERSION} → ${NEW_MARKETPLACE_VERSION}${NC}"
+
+write_output "has_changes=true" \
+  "new_marketplace_version=${NEW_MARKETPLACE_VERSION}" \
+  "updates<<SYNC_UPDATES_EOF" "${UPDATES%$'\n'}" "SYNC_UPDATES_EOF"
+
+# ─── Commit ─────────────────────────────────────────────────────────
+if [ "$COMMIT" = true ]; then
+  git add -- "${CHANGED[@]}" "$MARKETPLACE_REL"
+  git commit -q -F - <<EOF
+chore: auto-update plugin submodules
+
+Automated submodule updates:
+${UPDATES%$'\n'}
+
+Marketplace version: ${NEW_MARKETPLACE_VERSION}
+EOF
+  echo -e "${GREEN}Committed $(git rev-parse --short HEAD)${NC}"
+else
+  echo -e "${YELLOW}Changes left uncommitted in the work tree (use --commit to commit)${NC}"
+fi
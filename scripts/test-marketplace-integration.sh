@@ -4,6 +4,8 @@ set -eo pipefail
 # Comprehensive marketplace integration testing script
 # Tests plugins in isolation and together to verify no conflicts
 # Compatible with Bash 3.2+ (macOS default)
+# Usage: ./scripts/test-marketplace-integration.sh [--jobs N]
+#   --jobs N  Run the per-plugin structure checks on N workers (0 = all cores)
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 MARKETPLACE_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
@@ -22,6 +24,20 @@ NC='\033[0m' # No Color
 # Plugin list (from marketplace.json)
 read -ra PLUGINS <<< "$(get_plugins_string)"
 
+JOBS=1
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --jobs|-j)
+            [ $# -ge 2 ] || { echo "Usage: $0 [--jobs N]"; exit 1; }
+            JOBS="$2"; shift ;;
+        --jobs=*) JOBS="${1#*=}" ;;
+        -h|--help) echo "Usage: $0 [--jobs N]"; exit 0 ;;
+        *) echo -e "${RED}Unknown option: $1${NC}"; echo "Usage: $0 [--jobs N]"; exit 1 ;;
+    esac
+    shift
+done
+JOBS=$(resolve_jobs "$JOBS") || exit 1
+
 # Helper functions to get plugin-specific info
 get_plugin_path() {
     local plugin=$1
@@ -161,6 +177,19 @@ test_plugin_structure() {
     log_pass "$plugin: Structure valid (v$version)"
 }
 
+# Parallel workers only write to their output buffer; the report copy is
+# appended when the buffer is replayed, so the report keeps plugin order
+test_plugin_structure_worker() {
+    if [ "${PLUGIN_POOL_WORKER:-}" = 1 ]; then
+        REPORT_FILE=/dev/null
+    fi
+    test_plugin_structure "$1"
+}
+
+replay_to_report() {
+    tee -a "$REPORT_FILE" < "$1"
+}
+
 # Test plugin in isolation
 test_plugin_isolation() {
     local plugin=$1
@@ -211,11 +240,10 @@ test_plugins_together() {
 
     for plugin in "${PLUGINS[@]}"; do
         local path=$(get_plugin_path "$plugin")
-        if [ -d "$path/commands" ]; then
-            find "$path/commands" -name "*.md" -type f 2>/dev/null | while read cmd_file; do
-                local cmd_name=$(basename "$cmd_file" .md)
-                echo "$plugin:$cmd_name" >> "$temp_file"
-            done
+        local catalog
+        if [ -d "$path" ] && catalog=$(component_catalog "$path"); then
+            jq -r --arg plugin "$plugin" '.components[] | select(.kind == "command") | "\($plugin):\(.name)"' \
+                "$catalog" >> "$temp_file"
         fi
     done
 
@@ -260,8 +288,9 @@ test_command_availability() {
 
     for plugin in "${PLUGINS[@]}"; do
         local path=$(get_plugin_path "$plugin")
-        if [ -d "$path/commands" ]; then
-            local count=$(find "$path/commands" -name "*.md" -type f 2>/dev/null | wc -l | tr -d ' ')
+        local catalog
+        if [ -d "$path/commands" ] && catalog=$(component_catalog "$path"); then
+            local count=$(catalog_count "$catalog" command)
             total_commands=$((total_commands + count))
             log_info "$plugin: $count commands found"
         fi
@@ -278,8 +307,9 @@ test_skills_availability() {
 
     for plugin in "${PLUGINS[@]}"; do
         local path=$(get_plugin_path "$plugin")
-        if [ -d "$path/skills" ]; then
-            local count=$(find "$path/skills" -name "SKILL.md" -type f 2>/dev/null | wc -l | tr -d ' ')
+        local catalog
+        if [ -d "$path/skills" ] && catalog=$(component_catalog "$path"); then
+            local count=$(catalog_count "$catalog" skill)
             total_skills=$((total_skills + count))
             log_info "$plugin: $count skills found"
         fi
@@ -296,8 +326,9 @@ test_agents_availability() {
 
     for plugin in "${PLUGINS[@]}"; do
         local path=$(get_plugin_path "$plugin")
-        if [ -d "$path/agents" ]; then
-            local count=$(find "$path/agents" -name "*.md" -type f 2>/dev/null | wc -l | tr -d ' ')
+        local catalog
+        if [ -d "$path/agents" ] && catalog=$(component_catalog "$path"); then
+            local count=$(catalog_count "$catalog" agent)
             total_agents=$((total_agents + count))
             log_info "$plugin: $count agents found"
         fi
@@ -408,9 +439,8 @@ main() {
 
     # Phase 1: Structure validation
     log_section "Phase 1: Plugin Structure Validation"
-    for plugin in "${PLUGINS[@]}"; do
-        test_plugin_structure "$plugin"
-    done
+    PLUGIN_POOL_REPLAY=replay_to_report \
+        run_plugins_parallel "$JOBS" "TESTS_RUN TESTS_PASSED TESTS_FAILED" test_plugin_structure_worker "${PLUGINS[@]}"
 
     # Phase 2: Marketplace manifest validation
     log_section "Phase 2: Marketplace Manifest Validation"
@@ -0,0 +1,648 @@
+#!/bin/bash
+set -euo pipefail
+
+# Regression tests for the marketplace scripts themselves
+# Compatible with Bash 3.2+ (macOS default)
+# Usage: ./scripts/test-scripts.sh [suite...]
+#   Suites: pool, frontmatter, reports, budgets, formats, cache, drift, sync, rss, queue
+#
+# Every test runs against throwaway fixtures in a temporary directory; the
+# checked-out plugins, the marketplace caches and ~/.claude are never touched.
+#
+# Exit 0 = all tests pass, Exit 1 = any failure.
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
+# Colors
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+BLUE='\033[0;34m'
+NC='\033[0m'
+
+ALL_SUITES="pool frontmatter reports budgets formats cache drift sync rss queue"
+TESTS_RUN=0
+TESTS_FAILED=0
+
+SUITES=("$@")
+if [ ${#SUITES[@]} -eq 0 ]; then
+    read -ra SUITES <<< "$ALL_SUITES"
+fi
+for suite in "${SUITES[@]}"; do
+    case " $ALL_SUITES " in
+        *" $suite "*) ;;
+        *) echo -e "${RED}Unknown suite: $suite${NC}"; echo "Suites: $ALL_SUITES"; exit 1 ;;
+    esac
+done
+
+WORK="$(mktemp -d "${TMPDIR:-/tmp}/test-scripts.XXXXXX")"
+trap 'rm -rf "$WORK"' EXIT
+
+section() { echo ""; echo -e "${BLUE}━━━ $1 ━━━${NC}"; }
+pass() { echo -e "${GREEN}  OK: $1${NC}"; TESTS_RUN=$((TESTS_RUN + 1)); }
+fail() { echo -e "${RED}FAIL: $1${NC}"; TESTS_RUN=$((TESTS_RUN + 1)); TESTS_FAILED=$((TESTS_FAILED + 1)); }
+
+# expect_eq <description> <expected> <actual>
+expect_eq() {
+    if [ "$2" = "$3" ]; then
+        pass "$1"
+    else
+        fail "$1 — expected '$2', got '$3'"
+    fi
+}
+
+# expect_contains <description> <needle> <haystack>
+expect_contains() {
+    case "$3" in
+        *"$2"*) pass "$1" ;;
+        *) fail "$1 — '$2' not found in: $3" ;;
+    esac
+}
+
+# Drop ANSI color codes from piped output
+strip_colors() {
+    sed $'s/\033\\[[0-9;]*m//g'
+}
+
+# Pinned identity for every commit made by the fixtures or the scripts under test
+export GIT_AUTHOR_NAME=test GIT_AUTHOR_EMAIL=test@localhost
+export GIT_COMMITTER_NAME=test GIT_COMMITTER_EMAIL=test@localhost
+
+# git for building fixtures: unsigned commits, local clones of file:// remotes
+fixture_git() {
+    git -c commit.gpgsign=false -c protocol.file.allow=always "$@"
+}
+
+# Bare remote <remotes>/<plugin>.git per plugin, each with a 1.0.0 plugin.json,
+# and a marketplace repo at <root> that has them as submodules
+make_submodule_marketplace() {
+    local root="$1" remotes="$2" plugin
+    shift 2
+    mkdir -p "$root/.claude-plugin" "$remotes"
+    cp -R "$SCRIPT_DIR" "$root/scripts"
+    fixture_git init -q "$root"
+    for plugin in "$@"; do
+        fixture_git init -q --bare "$remotes/$plugin.git"
+        push_plugin_release "$remotes" "$plugin" 1.0.0
+        fixture_git -C "$root" submodule add -q "$remotes/$plugin.git" "$plugin"
+    done
+    jq -n '{name: "flight505-plugins", version: "1.0.0", owner: {name: "Test"},
+            plugins: [$ARGS.positional[] | {name: ., description: "Fixture plugin", version: "1.0.0", source: "./\(.)"}]}' \
+        --args "$@" > "$root/.claude-plugin/marketplace.json"
+    fixture_git -C "$root" add -A
+    fixture_git -C "$root" commit -q -m "marketplace"
+}
+
+# Push a commit setting <plugin>'s plugin.json to <version>
+push_plugin_release() {
+    local remotes="$1" plugin="$2" version="$3" work="$1/$2.work"
+    [ -d "$work" ] || fixture_git clone -q "$remotes/$plugin.git" "$work" 2>/dev/null
+    mkdir -p "$work/.claude-plugin"
+    printf '{"name": "%s", "version": "%s", "description": "Fixture plugin", "author": {"name": "Test"}}\n' \
+        "$plugin" "$version" > "$work/.claude-plugin/plugin.json"
+    fixture_git -C "$work" add -A
+    fixture_git -C "$work" commit -q -m "v$version"
+    fixture_git -C "$work" push -q origin HEAD
+}
+
+# ─── pool: run_plugins_parallel ─────────────────────────────────────
+
+test_pool() {
+    section "run_plugins_parallel"
+
+    # A check whose second command fails for "broken": set -e must stop it
+    # there (+1 only), and the other plugins still run (+11 each)
+    cat > "$WORK/pool.sh" <<'EOF'
+set -euo pipefail
+source "$1"
+COUNT=0
+check() {
+    COUNT=$((COUNT + 1))
+    [ "$1" != broken ]
+    COUNT=$((COUNT + 10))
+}
+[ "$3" = allow ] && PLUGIN_POOL_ALLOW_FAILURES=1
+run_plugins_parallel "$2" COUNT check good broken good
+echo "count=$COUNT status=${PLUGIN_POOL_STATUS[*]}"
+EOF
+
+    local jobs out rc
+    for jobs in 1 3; do
+        out=$(bash "$WORK/pool.sh" "$SCRIPT_DIR/common.sh" "$jobs" allow 2>&1) || true
+        expect_eq "--jobs $jobs: set -e stops a failing check, counters and statuses merged" \
+            "count=23 status=0 1 0" "$out"
+
+        rc=0
+        out=$(bash "$WORK/pool.sh" "$SCRIPT_DIR/common.sh" "$jobs" strict 2>&1) || rc=$?
+        expect_eq "--jobs $jobs: a failed check fails the run" "1" "$rc"
+        expect_contains "--jobs $jobs: the failing plugin is named" "check broken exited with status 1" "$out"
+    done
+
+    # Per-plugin results must reach the integration report in both modes
+    local root="$WORK/pool-report"
+    make_fixture_marketplace "$root"
+    cp -R "$root/demo" "$root/extra"
+    jq '.name = "extra"' "$root/demo/.claude-plugin/plugin.json" > "$root/extra/.claude-plugin/plugin.json"
+    jq '.plugins += [.plugins[0] | .name = "extra" | .source = "./extra"]' \
+        "$root/.claude-plugin/marketplace.json" > "$WORK/marketplace.json"
+    mv "$WORK/marketplace.json" "$root/.claude-plugin/marketplace.json"
+    for jobs in 1 3; do
+        rm -f "$root/marketplace-test-report.txt"
+        run_in_fixture "$root/scripts/test-marketplace-integration.sh" --jobs "$jobs" < /dev/null > /dev/null 2>&1 || true
+        expect_eq "--jobs $jobs: Phase 1 results are in the integration report" \
+            "demo: Structure valid (v1.0.0)|extra: Structure valid (v1.0.0)" \
+            "$(strip_colors < "$root/marketplace-test-report.txt" | sed -n 's/.*PASS: \(.*: Structure valid.*\)/\1/p' | paste -sd '|' -)"
+    done
+}
+
+# ─── frontmatter: parser limits vs malformed YAML ───────────────────
+
+# Minimal marketplace with one plugin "demo" (one agent, one skill) and a copy
+# of these scripts, so MARKETPLACE_ROOT resolves to the fixture
+make_fixture_marketplace() {
+    local root="$1"
+    mkdir -p "$root/.claude-plugin" "$root/demo/.claude-plugin" "$root/demo/agents" "$root/demo/skills/lint"
+    cp -R "$SCRIPT_DIR" "$root/scripts"
+    cat > "$root/.claude-plugin/marketplace.json" <<'EOF'
+{
+  "name": "flight505-plugins",
+  "version": "1.0.0",
+  "owner": {"name": "Test"},
+  "plugins": [{"name": "demo", "description": "Fixture plugin", "version": "1.0.0", "source": "./demo"}]
+}
+EOF
+    cat > "$root/demo/.claude-plugin/plugin.json" <<'EOF'
+{
+  "name": "demo",
+  "version": "1.0.0",
+  "description": "Fixture plugin",
+  "author": {"name": "Test"},
+  "skills": ["./skills/lint"],
+  "agents": ["./agents/reviewer.md"]
+}
+EOF
+    cat > "$root/demo/skills/lint/SKILL.md" <<'EOF'
+---
+name: lint
+description: Lint the project
+---
+Run the linters.
+EOF
+}
+
+# Run a copied script against its fixture marketplace, not this checkout, with
+# an empty $HOME (or $FIXTURE_HOME) and a `claude` stub that accepts everything
+run_in_fixture() {
+    local home="${FIXTURE_HOME:-$WORK/home}"
+    mkdir -p "$home"
+    if [ ! -x "$WORK/bin/claude" ]; then
+        mkdir -p "$WORK/bin"
+        printf '#!/bin/sh\nexit 0\n' > "$WORK/bin/claude"
+        chmod +x "$WORK/bin/claude"
+    fi
+    env -u MARKETPLACE_ROOT -u COMPONENT_CATALOG_DIR -u VALIDATE_CACHE_DIR -u DOCTOR_INDEX_DIR \
+        HOME="$home" PATH="$WORK/bin:$PATH" "$@"
+}
+
+test_frontmatter() {
+    section "frontmatter parser, validator and doctor"
+
+    local root="$WORK/frontmatter" out rc parsed
+    make_fixture_marketplace "$root"
+
+    # Valid YAML beyond the parser's subset: skipped with a warning, not an error
+    cat > "$root/demo/agents/reviewer.md" <<'EOF'
+---
+name: reviewer
+description: Reviews code. Examples: <example>Context: a pull request</example>
+model: sonnet
+permissionMode: plan
+hooks:
+  PreToolUse:
+    - matcher: Bash
+      hooks:
+        - type: command
+          command: echo checked
+tools:
+  - name: Read
+  - name: Grep
+---
+Review the diff.
+EOF
+    parsed=$(cd "$root/demo" && LC_ALL=C awk -f "$SCRIPT_DIR/frontmatter.awk" agents/reviewer.md)
+    expect_eq "unsupported constructs are not errors" "0" "$(jq '.errors | length' <<< "$parsed")"
+    expect_eq "one warning per unsupported construct" "3" "$(jq '.warnings | length' <<< "$parsed")"
+    expect_eq "skipped keys are left out, the rest is read" "description,model,name,permissionMode" \
+        "$(jq -r '.frontmatter | keys | join(",")' <<< "$parsed")"
+    expect_eq "a plain value with ': ' is kept as text" \
+        "Reviews code. Examples: <example>Context: a pull request</example>" \
+        "$(jq -r '.frontmatter.description' <<< "$parsed")"
+
+    rc=0
+    out=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" 2>&1) || rc=$?
+    expect_eq "validator passes frontmatter with unsupported constructs" "0" "$rc"
+    expect_contains "validator notes the skipped key" "nested value for 'hooks.PreToolUse' is not supported" "$out"
+    out=$(run_in_fixture "$root/scripts/plugin-doctor.sh" 2>&1) || true
+    expect_contains "doctor warns about the skipped key" "WARN: demo: unsupported frontmatter skipped — agents/reviewer.md" "$out"
+    expect_contains "doctor still passes the frontmatter" "OK: demo: 1 agents, 1 skills — frontmatter valid" "$out"
+
+    # Commas inside quoted flow sequence entries do not split them
+    cat > "$root/demo/agents/reviewer.md" <<'EOF'
+---
+name: reviewer
+description: Reviews code
+model: sonnet
+permissionMode: plan
+tools: ["Bash(git add, commit)", Read]
+---
+Review the diff.
+EOF
+    parsed=$(cd "$root/demo" && LC_ALL=C awk -f "$SCRIPT_DIR/frontmatter.awk" agents/reviewer.md)
+    expect_eq "a quoted flow entry keeps its commas" '["Bash(git add, commit)","Read"] [] []' \
+        "$(jq -c '.frontmatter.tools, .errors, .warnings' <<< "$parsed" | paste -sd ' ' -)"
+    rc=0
+    out=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" 2>&1) || rc=$?
+    expect_eq "validator passes the quoted flow sequence" "0" "$rc"
+    out=$(run_in_fixture "$root/scripts/plugin-doctor.sh" 2>&1) || true
+    expect_contains "doctor passes the quoted flow sequence" "OK: demo: 1 agents, 1 skills — frontmatter valid" "$out"
+
+    # Malformed YAML is still an error
+    cat > "$root/demo/skills/lint/SKILL.md" <<'EOF'
+---
+name: lint
+description: "Lint the project
+---
+Run the linters.
+EOF
+    parsed=$(cd "$root/demo" && LC_ALL=C awk -f "$SCRIPT_DIR/frontmatter.awk" skills/lint/SKILL.md)
+    expect_eq "an unterminated quote is an error" '["line 3: unterminated double-quoted string"]' \
+        "$(jq -c '.errors' <<< "$parsed")"
+
+    rc=0
+    out=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" 2>&1) || rc=$?
+    expect_eq "validator fails malformed frontmatter" "1" "$rc"
+    expect_contains "validator reports the parse error" "skills/lint frontmatter: line 3: unterminated double-quoted string" "$out"
+    out=$(run_in_fixture "$root/scripts/plugin-doctor.sh" 2>&1) || true
+    expect_contains "doctor fails malformed frontmatter" "FAIL: demo: invalid frontmatter — skills/lint/SKILL.md" "$out"
+}
+
+# ─── reports: --format json keeps stdout for the report ─────────────
+
+test_reports() {
+    section "JSON reports on stdout"
+
+    local root="$WORK/reports" out
+    make_fixture_marketplace "$root"
+    printf -- '---\nname: reviewer\ndescription: Reviews code\nmodel: sonnet\npermissionMode: plan\n---\nReview the diff.\n' \
+        > "$root/demo/agents/reviewer.md"
+    mkdir -p "$root/demo/hooks"
+    printf '#!/bin/sh\ncat > /dev/null\necho checked\n' > "$root/demo/hooks/check.sh"
+    chmod +x "$root/demo/hooks/check.sh"
+    cat > "$root/demo/hooks/hooks.json" <<'EOF'
+{"hooks": {"PreToolUse": [{"matcher": "Bash", "hooks": [{"type": "command", "command": "${CLAUDE_PLUGIN_ROOT}/hooks/check.sh"}]}]}}
+EOF
+
+    out=$(run_in_fixture "$root/scripts/profile-hooks.sh" --runs 2 --warmup 0 --format json 2>/dev/null) || true
+    expect_eq "profile-hooks --format json prints only JSON" "profile-hooks 1" \
+        "$(jq -r '"\(.tool) \(.hooks | length)"' <<< "$out" 2>&1)"
+
+    out=$(run_in_fixture "$root/scripts/context-footprint.sh" --format json 2>/dev/null) || true
+    expect_eq "context-footprint --format json prints only JSON" "context-footprint demo" \
+        "$(jq -r '"\(.tool) \(.plugins[0].plugin)"' <<< "$out" 2>&1)"
+}
+
+# ─── budgets: context-footprint.sh contextBudget ────────────────────
+
+test_budgets() {
+    section "context-footprint.sh budgets"
+
+    local root="$WORK/budgets" out rc
+    make_fixture_marketplace "$root"
+    printf -- '---\nname: reviewer\ndescription: Reviews code\nmodel: sonnet\npermissionMode: plan\n---\nReview the diff.\n' \
+        > "$root/demo/agents/reviewer.md"
+    # Plugin limit far above the fixture, per-component limit below the skill body
+    jq '.contextBudget = {plugin: {alwaysLoadedTokens: 1000}, component: {onInvokeTokens: 1000},
+                          plugins: {demo: {component: {onInvokeTokens: 3}}}}' \
+        "$root/.claude-plugin/marketplace.json" > "$WORK/marketplace.json"
+    mv "$WORK/marketplace.json" "$root/.claude-plugin/marketplace.json"
+
+    rc=0
+    out=$(run_in_fixture "$root/scripts/context-footprint.sh" 2>&1 | strip_colors) || rc=$?
+    expect_eq "an exceeded component budget fails" "1" "$rc"
+    expect_contains "component.onInvokeTokens is checked per component, with per-plugin overrides" \
+        "FAIL: demo: skill lint loads" "$out"
+    case "$out" in
+        *"always-loaded tokens exceeds"*) fail "plugin.alwaysLoadedTokens is not mixed up with the component limit" ;;
+        *) pass "plugin.alwaysLoadedTokens is not mixed up with the component limit" ;;
+    esac
+
+    rc=0
+    out=$(run_in_fixture "$root/scripts/context-footprint.sh" --warn-only 2>&1 | strip_colors) || rc=$?
+    expect_eq "--warn-only exits 0" "0" "$rc"
+    expect_contains "--warn-only still reports the violation" "WARN: demo: skill lint loads" "$out"
+}
+
+# ─── formats: validator json/sarif reports match the text log ───────
+
+test_formats() {
+    section "validate-plugin-manifests.sh --format json|sarif"
+
+    local root="$WORK/formats" text errors warnings out
+    make_fixture_marketplace "$root"
+    # 2 errors (missing manifest, bad permissionMode), 2 warnings (no model, no skill description)
+    jq '.plugins += [{"name": "ghost", "description": "Fixture plugin", "version": "1.0.0", "source": "./ghost"}]' \
+        "$root/.claude-plugin/marketplace.json" > "$WORK/marketplace.json"
+    mv "$WORK/marketplace.json" "$root/.claude-plugin/marketplace.json"
+    printf -- '---\nname: reviewer\ndescription: Reviews code\npermissionMode: bogus\n---\nReview the diff.\n' \
+        > "$root/demo/agents/reviewer.md"
+    printf -- '---\nname: lint\n---\nRun the linters.\n' > "$root/demo/skills/lint/SKILL.md"
+
+    text=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" 2>&1 | strip_colors) || true
+    errors=$(sed -n 's/.*Validation failed with \([0-9]*\) error(s).*/\1/p' <<< "$text")
+    warnings=$(sed -n 's/.*Found \([0-9]*\) warning(s).*/\1/p' <<< "$text")
+    expect_eq "text log counts the fixture's findings" "2 2" "$errors $warnings"
+    expect_contains "a missing manifest keeps the baseline wording" \
+        "✗ Plugin manifest not found: ghost/.claude-plugin/plugin.json" "$text"
+
+    out=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" --format json 2>/dev/null) || true
+    expect_eq "json report has the documented fields" "true" "$(jq '
+        (keys == ["errors", "findings", "notes", "plugins", "tool", "version", "warnings"])
+        and .tool == "validate-plugin-manifests" and .plugins == ["demo", "ghost"]
+        and all(.findings[]; keys == ["file", "level", "message", "plugin", "rule"])' <<< "$out" 2>&1)"
+    expect_eq "json counts match the text log" "$errors $warnings" \
+        "$(jq -r '"\(.errors) \(.warnings)"' <<< "$out" 2>&1)"
+    expect_eq "json findings match its counts" "$errors $warnings" \
+        "$(jq -r '.findings as $f
+            | "\([$f[] | select(.level == "error")] | length) \([$f[] | select(.level == "warning")] | length)"' <<< "$out" 2>&1)"
+
+    run_in_fixture "$root/scripts/validate-plugin-manifests.sh" --format sarif --output "$WORK/report.sarif" > /dev/null 2>&1 || true
+    expect_eq "sarif report is SARIF 2.1.0 with known rules and levels" "true" "$(jq '
+        [.runs[0].tool.driver.rules[].id] as $rules
+        | .version == "2.1.0" and (."$schema" | endswith("sarif-2.1.0.json")) and (.runs | length) == 1
+          and .runs[0].tool.driver.name == "validate-plugin-manifests"
+          and all(.runs[0].results[];
+            (.ruleId as $id | $rules | index($id)) != null
+            and (.level | IN("error", "warning", "note"))
+            and (.message.text | length) > 0
+            and (.locations[0].physicalLocation.artifactLocation.uri | length) > 0)' \
+        "$WORK/report.sarif" 2>&1)"
+    expect_eq "sarif counts match the text log" "$errors $warnings" \
+        "$(jq -r '.runs[0].results as $r
+            | "\([$r[] | select(.level == "error")] | length) \([$r[] | select(.level == "warning")] | length)"' \
+            "$WORK/report.sarif" 2>&1)"
+}
+
+# ─── cache: validate-plugin-manifests.sh --incremental ──────────────
+
+test_cache() {
+    section "validate-plugin-manifests.sh --incremental"
+
+    local root="$WORK/cache" cache="$WORK/cache/.cache/validate-plugin-manifests" out
+    make_fixture_marketplace "$root"
+    printf -- '---\nname: reviewer\ndescription: Reviews code\nmodel: sonnet\npermissionMode: plan\n---\nReview the diff.\n' \
+        > "$root/demo/agents/reviewer.md"
+    fixture_git -C "$root" init -q
+    fixture_git -C "$root" add -A
+    fixture_git -C "$root" commit -q -m "marketplace"
+
+    run_in_fixture "$root/scripts/validate-plugin-manifests.sh" --incremental > /dev/null 2>&1 || true
+    out=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" --incremental 2>&1 | strip_colors) || true
+    expect_contains "an unchanged plugin is served from the cache" "✓ demo validation passed (cached)" "$out"
+
+    echo "Check the style guide too." >> "$root/demo/skills/lint/SKILL.md"
+    fixture_git -C "$root" commit -q -am "demo: lint docs"
+    out=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" --incremental 2>&1 | strip_colors) || true
+    expect_contains "a changed plugin tree is re-checked" "✓ demo validation passed"$'\n' "$out"$'\n'
+
+    jq '.plugins[0].description = "Fixture plugin, renamed"' "$root/.claude-plugin/marketplace.json" > "$WORK/marketplace.json"
+    mv "$WORK/marketplace.json" "$root/.claude-plugin/marketplace.json"
+    fixture_git -C "$root" commit -q -am "marketplace: demo description"
+    out=$(run_in_fixture "$root/scripts/validate-plugin-manifests.sh" --incremental 2>&1 | strip_colors) || true
+    expect_contains "a changed marketplace entry is re-checked" "✓ demo validation passed"$'\n' "$out"$'\n'
+
+    # A worker killed mid-check must not leave its half-written record behind
+    mkdir -p "$WORK/killer"
+    printf '#!/bin/sh\nkill -TERM $PPID\n' > "$WORK/killer/bash"
+    chmod +x "$WORK/killer/bash"
+    mkdir -p "$root/demo/hooks"
+    printf '#!/bin/sh\necho checked\n' > "$root/demo/hooks/check.sh"
+    fixture_git -C "$root" add -A
+    fixture_git -C "$root" commit -q -m "demo: hook"
+    PATH="$WORK/killer:$PATH" run_in_fixture "$root/scripts/validate-plugin-manifests.sh" --incremental > /dev/null 2>&1 || true
+    expect_eq "no temporary records are left in the cache" "" "$(cd "$cache" && ls -A | grep '^\.tmp' || true)"
+}
+
+# ─── drift: plugin-doctor.sh --deep ─────────────────────────────────
+
+test_drift() {
+    section "plugin-doctor.sh --deep"
+
+    local root="$WORK/drift" home="$WORK/drift-home" cache out
+    cache="$home/.claude/plugins/cache/flight505-plugins/demo/1.0.0"
+    make_fixture_marketplace "$root"
+    printf -- '---\nname: reviewer\ndescription: Reviews code\nmodel: sonnet\npermissionMode: plan\n---\nReview the diff.\n' \
+        > "$root/demo/agents/reviewer.md"
+
+    # A fake install: registered marketplace, demo installed from a copy of its source
+    mkdir -p "$home/.claude/plugins/cache/flight505-plugins/demo"
+    cp -R "$root/demo" "$cache"
+    mkdir -p "$cache/node_modules/left-pad"
+    echo "module.exports = 1" > "$cache/node_modules/left-pad/index.js"
+    echo '{"flight505-plugins": {"source": {"source": "github", "repo": "flight505/flight505-marketplace"}}}' \
+        > "$home/.claude/plugins/known_marketplaces.json"
+    jq -n --arg path "$cache" '{version: 2, plugins: {"demo@flight505-plugins": [{version: "1.0.0", installPath: $path}]}}' \
+        > "$home/.claude/plugins/installed_plugins.json"
+
+    out=$(FIXTURE_HOME="$home" run_in_fixture "$root/scripts/plugin-doctor.sh" --deep 2>&1 | strip_colors) || true
+    expect_contains "identical trees pass; node_modules in the cache is ignored" "OK: demo v1.0.0 (sha , tree " "$out"
+
+    # Second run reuses the persisted index, so these edits must still be seen
+    rm "$cache/skills/lint/SKILL.md"
+    echo "stale" > "$cache/agents/old.md"
+    sed 's/Review the diff\./Review the tree\./' "$root/demo/agents/reviewer.md" > "$cache/agents/reviewer.md"
+    out=$(FIXTURE_HOME="$home" run_in_fixture "$root/scripts/plugin-doctor.sh" --deep 2>&1 | strip_colors) || true
+    expect_contains "differing files are counted" "FAIL: demo v1.0.0: 3 file(s) differ between source and cache" "$out"
+    expect_contains "a file missing from the cache is listed" "skills/lint/SKILL.md  (missing from cache)" "$out"
+    expect_contains "an extra cached file is listed" "agents/old.md  (only in cache)" "$out"
+    expect_contains "changed content is listed" "agents/reviewer.md  (content differs)" "$out"
+    case "$out" in
+        *node_modules*) fail "node_modules is excluded from the comparison" ;;
+        *) pass "node_modules is excluded from the comparison" ;;
+    esac
+}
+
+# ─── sync: sync-marketplace.sh against bare remotes ─────────────────
+
+test_sync() {
+    section "sync-marketplace.sh"
+
+    local root="$WORK/sync" remotes="$WORK/sync-remotes" before beta_pin out rc
+    make_submodule_marketplace "$root" "$remotes" alpha beta
+    push_plugin_release "$remotes" alpha 1.1.0
+    push_plugin_release "$remotes" beta 1.0.1
+    before=$(git -C "$root" rev-parse HEAD)
+    beta_pin=$(git -C "$root" rev-parse HEAD:beta)
+
+    rc=0
+    out=$(run_in_fixture "$root/scripts/sync-marketplace.sh" --plugin alpha --commit --allow-file-protocol 2>&1) || rc=$?
+    expect_eq "sync exits 0" "0" "$rc"
+    expect_eq "the selected plugin moves to its remote tip" \
+        "$(git --git-dir="$remotes/alpha.git" rev-parse HEAD)" "$(git -C "$root" rev-parse HEAD:alpha)"
+    expect_eq "other plugins stay at their recorded commit" "$beta_pin" "$(git -C "$root" rev-parse HEAD:beta)"
+    expect_eq "marketplace.json gets the new plugin version only" "1.1.0 1.0.0" \
+        "$(jq -r '[.plugins[].version] | join(" ")' "$root/.claude-plugin/marketplace.json")"
+    expect_eq "the marketplace version is bumped" "1.0.1" "$(jq -r '.version' "$root/.claude-plugin/marketplace.json")"
+    expect_eq "--commit makes exactly one commit" "1" "$(git -C "$root" rev-list --count "$before..HEAD")"
+    expect_eq "the commit covers every change" "" "$(git -C "$root" status --porcelain)"
+
+    # A write that fails must leave marketplace.json as it was, with no temp file
+    jq '.version = "1.0.x"' "$root/.claude-plugin/marketplace.json" > "$WORK/marketplace.json"
+    mv "$WORK/marketplace.json" "$root/.claude-plugin/marketplace.json"
+    cp "$root/.claude-plugin/marketplace.json" "$WORK/marketplace.before"
+    rc=0
+    run_in_fixture "$root/scripts/sync-marketplace.sh" --plugin beta --allow-file-protocol > /dev/null 2>&1 || rc=$?
+    expect_eq "a failed marketplace.json update exits 1" "1" "$rc"
+    if cmp -s "$WORK/marketplace.before" "$root/.claude-plugin/marketplace.json"; then
+        pass "a failed update leaves marketplace.json untouched"
+    else
+        fail "a failed update leaves marketplace.json untouched"
+    fi
+    expect_eq "no temporary marketplace.json is left behind" "marketplace.json" "$(ls -A "$root/.claude-plugin")"
+}
+
+# ─── rss: peak memory is the command's, not the wrapper's ───────────
+
+test_rss() {
+    local rss
+    detect_rss_method
+    section "run_with_rss ($RSS_METHOD)"
+
+    run_with_rss "$WORK/rss" true
+    rss=$(tail -n 1 "$WORK/rss" | tr -dc '0-9')
+    if [ "$RSS_METHOD" = "unavailable" ]; then
+        expect_eq "no peak RSS without GNU time" "" "$rss"
+    elif [ -n "$rss" ] && [ "$rss" -lt 5000 ]; then
+        pass "true(1) measures ${rss} KB"
+    else
+        fail "true(1) measures '${rss}' KB; expected a value under 5000"
+    fi
+}
+
+# ─── queue: update-queue.sh remote tips ─────────────────────────────
+
+test_queue() {
+    section "update-queue.sh"
+
+    local root remotes queue out rc before drain_pid holder origin branch other
+
+    # moved: one remote moved, one is unreachable
+    root="$WORK/queue-moved"
+    remotes="$WORK/queue-moved-remotes"
+    make_submodule_marketplace "$root" "$remotes" demo gone
+    push_plugin_release "$remotes" demo 1.0.1
+    rm -rf "$remotes/gone.git"
+    rc=0
+    out=$(run_in_fixture "$root/scripts/update-queue.sh" moved --allow-file-protocol 2> "$WORK/queue.err") || rc=$?
+    expect_eq "moved exits 0 when one remote is unreachable" "0" "$rc"
+    expect_eq "moved lists the plugin whose remote moved" "demo" "$out"
+    expect_contains "the unreachable remote is reported, not dropped silently" \
+        "Warning: could not read HEAD of gone" "$(cat "$WORK/queue.err")"
+
+    # drain: an event arriving inside the debounce window joins the same sync
+    root="$WORK/queue-drain"
+    remotes="$WORK/queue-drain-remotes"
+    queue="$root/.cache/update-queue"
+    make_submodule_marketplace "$root" "$remotes" alpha beta
+    push_plugin_release "$remotes" alpha 1.1.0
+    push_plugin_release "$remotes" beta 1.0.1
+    before=$(git -C "$root" rev-parse HEAD)
+    run_in_fixture "$root/scripts/update-queue.sh" enqueue alpha 1.1.0 > /dev/null
+    run_in_fixture "$root/scripts/update-queue.sh" drain --debounce 3 --allow-file-protocol > "$WORK/drain.out" 2>&1 &
+    drain_pid=$!
+    sleep 1
+    run_in_fixture "$root/scripts/update-queue.sh" enqueue beta 1.0.1 > /dev/null
+    rc=0
+    wait "$drain_pid" || rc=$?
+    expect_eq "drain exits 0" "0" "$rc"
+    expect_contains "two enqueues are applied as one sync" "Applying 2 plugin update(s) as one sync: alpha beta" \
+        "$(strip_colors < "$WORK/drain.out")"
+    expect_eq "two enqueues make one commit" "1" "$(git -C "$root" rev-list --count "$before..HEAD")"
+    expect_eq "the commit carries both versions and one marketplace bump" "1.1.0 1.0.1 1.0.1" \
+        "$(jq -r '[.plugins[].version, .version] | join(" ")' "$root/.claude-plugin/marketplace.json")"
+    expect_eq "the drained events are gone" "" "$(ls -A "$queue/pending")$(ls -A "$queue/processing")"
+
+    # lock: a second drain waits while the lock holder is alive
+    mkdir -p "$queue/lock"
+    sleep 30 &
+    holder=$!
+    echo "$holder" > "$queue/lock/pid"
+    push_plugin_release "$remotes" alpha 1.2.0
+    run_in_fixture "$root/scripts/update-queue.sh" enqueue alpha 1.2.0 > /dev/null
+    before=$(git -C "$root" rev-parse HEAD)
+    run_in_fixture "$root/scripts/update-queue.sh" drain --debounce 0 --allow-file-protocol > "$WORK/drain.out" 2>&1 &
+    drain_pid=$!
+    sleep 1
+    expect_eq "a held lock keeps the drain from syncing" "$before" "$(git -C "$root" rev-parse HEAD)"
+    kill "$holder"
+    wait "$holder" 2>/dev/null || true
+    rc=0
+    wait "$drain_pid" || rc=$?
+    expect_eq "the drain runs once the lock holder is gone" "0 1" \
+        "$rc $(git -C "$root" rev-list --count "$before..HEAD")"
+    expect_contains "the waiting drain names the lock holder" "Another drain is running (PID $holder)" \
+        "$(strip_colors < "$WORK/drain.out")"
+
+    # A failed sync puts the claimed events back
+    run_in_fixture "$root/scripts/update-queue.sh" enqueue beta 1.0.2 > /dev/null
+    mv "$remotes/beta.git" "$remotes/beta.offline"
+    before=$(git -C "$root" rev-parse HEAD)
+    rc=0
+    run_in_fixture "$root/scripts/update-queue.sh" drain --debounce 0 --allow-file-protocol > /dev/null 2>&1 || rc=$?
+    expect_eq "a failed sync exits 1 and leaves HEAD alone" "1 $before" "$rc $(git -C "$root" rev-parse HEAD)"
+    expect_contains "the claimed event is back in the queue" "1 pending event(s)" \
+        "$(run_in_fixture "$root/scripts/update-queue.sh" status)"
+    expect_eq "nothing is left in processing" "" "$(ls -A "$queue/processing")"
+    mv "$remotes/beta.offline" "$remotes/beta.git"
+
+    # A push rejected because the remote moved is replayed on the new tip
+    origin="$WORK/queue-origin.git"
+    other="$WORK/queue-other"
+    branch=$(git -C "$root" symbolic-ref --short HEAD)
+    fixture_git clone -q --bare "$root" "$origin"
+    fixture_git -C "$root" remote add origin "$origin"
+    fixture_git clone -q "$origin" "$other"
+    echo "# Notes" > "$other/NOTES.md"
+    fixture_git -C "$other" add NOTES.md
+    fixture_git -C "$other" commit -q -m "docs: notes"
+    fixture_git -C "$other" push -q origin HEAD
+    push_plugin_release "$remotes" alpha 1.3.0
+    run_in_fixture "$root/scripts/update-queue.sh" enqueue alpha 1.3.0 > /dev/null
+    rc=0
+    out=$(run_in_fixture "$root/scripts/update-queue.sh" drain --debounce 0 --push --branch "$branch" \
+        --allow-file-protocol 2>&1 | strip_colors) || rc=$?
+    expect_eq "the replayed push succeeds" "0" "$rc"
+    expect_contains "the rejected push is replayed" "Push rejected (origin/$branch moved)" "$out"
+    expect_eq "the sync commit sits on top of the commit that moved the remote" \
+        "$(git -C "$other" rev-parse HEAD)" "$(git --git-dir="$origin" rev-parse "$branch^")"
+    expect_eq "the pushed marketplace.json has the synced versions" "1.3.0 1.0.1" \
+        "$(git --git-dir="$origin" show "$branch:.claude-plugin/marketplace.json" | jq -r '[.plugins[].version] | join(" ")')"
+    expect_eq "the queue is empty after the push" "0 pending event(s)" \
+        "$(run_in_fixture "$root/scripts/update-queue.sh" status | sed -n 's/ in .*//p')"
+}
+
+# ─── Main ───────────────────────────────────────────────────────────
+echo -e "${BLUE}Script regression tests${NC}"
+
+for suite in "${SUITES[@]}"; do
+    "test_$suite"
+done
+
+echo ""
+if [ "$TESTS_FAILED" -eq 0 ]; then
+    echo -e "${GREEN}All $TESTS_RUN tests passed.${NC}"
+    exit 0
+else
+    echo -e "${RED}$TESTS_FAILED of $TESTS_RUN tests failed.${NC}"
+    exit 1
+fi
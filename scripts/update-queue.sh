@@ -0,0 +1,340 @@
+#!/bin/bash
+set -euo pipefail
+
+# Marketplace Update Queue — coalesces bursts of plugin-updated events
+# Usage: ./scripts/update-queue.sh enqueue PLUGIN [VERSION]
+#        ./scripts/update-queue.sh status
+#        ./scripts/update-queue.sh moved [--allow-file-protocol]
+#        ./scripts/update-queue.sh drain [--debounce SECONDS] [--max-wait SECONDS] [--moved]
+#                                        [--push] [--remote NAME] [--branch NAME]
+#                                        [--attempts N] [--allow-file-protocol]
+#
+#   enqueue   Record a pending update for PLUGIN (one file per event, safe to
+#             call concurrently).
+#   status    List pending events.
+#   moved     Print the plugins whose remote branch tip differs from the commit
+#             recorded in HEAD (one `git ls-remote` per submodule, no fetch).
+#   drain     Wait until no event has arrived for --debounce seconds (default: 30,
+#             at most --max-wait, default: 300), then apply every queued plugin
+#             with a single sync-marketplace.sh run: one submodule update, one
+#             marketplace.json write, one patch bump, one commit.
+#               --moved     Also include every plugin `moved` reports
+#               --push      Push the commit to --remote/--branch (default: origin/main).
+#                           If the push is rejected because the remote moved, reset to
+#                           the new remote tip and replay the sync on top of it
+#                           (up to --attempts, default: 3). Replaying instead of
+#                           rebasing avoids conflicts on the marketplace version.
+#
+# Only one drain runs at a time (lock in the queue directory). Events are claimed
+# before syncing and put back if the drain fails, so nothing is lost.
+# Queue location: $UPDATE_QUEUE_DIR (default .cache/update-queue).
+#
+# When $GITHUB_OUTPUT is set, drain writes the outputs of the sync run that was
+# pushed: has_changes, updates, new_marketplace_version.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/common.sh"
+
+QUEUE_DIR="${UPDATE_QUEUE_DIR:-$MARKETPLACE_ROOT/.cache/update-queue}"
+USAGE="Usage: $0 enqueue PLUGIN [VERSION] | status | moved | drain [--debounce S] [--max-wait S] [--moved] [--push] [--remote NAME] [--branch NAME] [--attempts N] [--allow-file-protocol]"
+
+[ $# -ge 1 ] || { echo "$USAGE"; exit 1; }
+COMMAND="$1"
+shift
+
+DEBOUNCE=30
+MAX_WAIT=300
+INCLUDE_MOVED=false
+PUSH=false
+REMOTE="origin"
+BRANCH="main"
+ATTEMPTS=3
+GIT_OPTS=()
+SYNC_OPTS=()
+
+# ─── Queue ──────────────────────────────────────────────────────────
+# Events are files named <epoch>-<pid>-<random>-<plugin>; the name carries
+# the arrival time so the debounce window needs no stat(1) portability shims.
+
+enqueue() {
+  local plugin="$1" version="${2:-}" name
+  if ! is_valid_plugin "$plugin"; then
+    echo -e "${RED}Error: Unknown plugin '$plugin'${NC}"
+    echo "Valid plugins: $(get_plugins_string)"
+    exit 1
+  fi
+  mkdir -p "$QUEUE_DIR/pending"
+  name="$(date +%s)-$$-$RANDOM-$plugin"
+  printf '%s\t%s\n' "$plugin" "$version" > "$QUEUE_DIR/.$name"
+  mv "$QUEUE_DIR/.$name" "$QUEUE_DIR/pending/$name"
+  echo -e "${GREEN}Queued $plugin${version:+ $version}${NC}"
+}
+
+# Event files in a queue subdirectory, oldest first
+events_in() {
+  [ -d "$QUEUE_DIR/$1" ] || return 0
+  (cd "$QUEUE_DIR/$1" && ls -1 | LC_ALL=C sort -t- -k1,1n -k2,2n)
+}
+
+show_status() {
+  local event plugin version count=0
+  while read -r event; do
+    [ -n "$event" ] || continue
+    IFS=$'\t' read -r plugin version < "$QUEUE_DIR/pending/$event" || true
+    echo "  ${event%%-*}  $plugin${version:+ $version}"
+    count=$((count + 1))
+  done < <(events_in pending)
+  echo "$count pending event(s) in $QUEUE_DIR"
+}
+
+# ─── Remote tips ────────────────────────────────────────────────────
+
+# Plugins whose submodule branch tip on the remote differs from the gitlink in HEAD.
+# All ls-remote calls run concurrently; vendored (non-submodule) plugins are skipped.
+moved_plugins() {
+  local plugin recorded name url branch ref work refs tip
+  work="$(mktemp -d "${TMPDIR:-/tmp}/update-queue.XXXXXX")"
+  for plugin in $(get_plugins_string); do
+    recorded=$(git -C "$MARKETPLACE_ROOT" ls-tree HEAD -- "$plugin" | awk '$2 == "commit" { print $3 }')
+    [ -n "$recorded" ] || continue
+    name=$(git -C "$MARKETPLACE_ROOT" config -f .gitmodules --get-regexp '^submodule\..*\.path$' \
+      | awk -v p="$plugin" '$2 == p { sub(/^submodule\./, "", $1); sub(/\.path$/, "", $1); print $1; exit }')
+    [ -n "$name" ] || continue
+    # A local URL override (git config submodule.<name>.url) wins, as it does for `git submodule`
+    url=$(git -C "$MARKETPLACE_ROOT" config --get "submodule.$name.url" \
+      || git -C "$MARKETPLACE_ROOT" config -f .gitmodules --get "submodule.$name.url" || true)
+    branch=$(git -C "$MARKETPLACE_ROOT" config -f .gitmodules --get "submodule.$name.branch" || true)
+    ref="HEAD"
+    [ -n "$branch" ] && [ "$branch" != "." ] && ref="refs/heads/$branch"
+    (
+      # Checked explicitly: under set -e a failing ls-remote would end this
+      # subshell silently and the plugin would just drop out of the list
+      if [ -z "$url" ] || ! refs=$(git ${GIT_OPTS[@]+"${GIT_OPTS[@]}"} ls-remote "$url" "$ref" 2>/dev/null); then
+        echo -e "${YELLOW}Warning: could not read $ref of $plugin (${url:-no URL}); skipped${NC}" >&2
+        exit 0
+      fi
+      tip=$(printf '%s\n' "$refs" | awk 'NR == 1 { print $1 }')
+      if [ -z "$tip" ]; then
+        echo -e "${YELLOW}Warning: $ref not found on $plugin's remote ($url); skipped${NC}" >&2
+      elif [ "$tip" != "$recorded" ]; then
+        echo "$plugin" > "$work/$plugin"
+      fi
+    ) &
+  done
+  wait
+  # Print in marketplace.json order
+  for plugin in $(get_plugins_string); do
+    [ -f "$work/$plugin" ] && echo "$plugin"
+  done
+  rm -rf "$work"
+}
+
+# ─── Drain ──────────────────────────────────────────────────────────
+
+LOCK_DIR="$QUEUE_DIR/lock"
+
+acquire_lock() {
+  local holder
+  mkdir -p "$QUEUE_DIR"
+  while ! mkdir "$LOCK_DIR" 2>/dev/null; do
+    holder=$(cat "$LOCK_DIR/pid" 2>/dev/null || true)
+    if [ -n "$holder" ] && ! kill -0 "$holder" 2>/dev/null; then
+      echo -e "${YELLOW}Removing stale lock held by PID $holder${NC}"
+      rm -rf "$LOCK_DIR"
+      continue
+    fi
+    echo -e "${BLUE}Another drain is running (PID ${holder:-?}); waiting...${NC}"
+    sleep 2
+  done
+  echo $$ > "$LOCK_DIR/pid"
+}
+
+# Block until the newest pending event is at least DEBOUNCE seconds old
+wait_for_quiet() {
+  local start now newest quiet
+  start=$(date +%s)
+  while :; do
+    newest=$(events_in pending | awk -F- '$1 > max { max = $1 } END { print max + 0 }')
+    now=$(date +%s)
+    quiet=$((now - newest))
+    [ "$newest" -eq 0 ] && return 0
+    [ "$quiet" -ge "$DEBOUNCE" ] && return 0
+    if [ $((now - start)) -ge "$MAX_WAIT" ]; then
+      echo -e "${YELLOW}Events still arriving after ${MAX_WAIT}s; draining anyway${NC}"
+      return 0
+    fi
+    echo -e "${BLUE}Last event ${quiet}s ago; waiting $((DEBOUNCE - quiet))s for more...${NC}"
+    sleep $((DEBOUNCE - quiet))
+  done
+}
+
+# Move pending events to processing/ and collect their plugins in QUEUED
+claim_events() {
+  local event plugin version
+  mkdir -p "$QUEUE_DIR/processing"
+  # Events left behind by an interrupted drain are retried first
+  QUEUED=()
+  while read -r event; do
+    [ -n "$event" ] || continue
+    [ -f "$QUEUE_DIR/pending/$event" ] && mv "$QUEUE_DIR/pending/$event" "$QUEUE_DIR/processing/$event"
+  done < <(events_in pending)
+  while read -r event; do
+    [ -n "$event" ] || continue
+    IFS=$'\t' read -r plugin version < "$QUEUE_DIR/processing/$event" || true
+    add_plugin "$plugin"
+  done < <(events_in processing)
+}
+
+add_plugin() {
+  case " ${QUEUED[*]+${QUEUED[*]}} " in
+    *" $1 "*) ;;
+    *) QUEUED+=("$1") ;;
+  esac
+}
+
+finish_events() {
+  if [ "$1" = done ]; then
+    rm -f "$QUEUE_DIR"/processing/*
+  else
+    mkdir -p "$QUEUE_DIR/pending"
+    mv "$QUEUE_DIR"/processing/* "$QUEUE_DIR/pending/" 2>/dev/null || true
+  fi
+}
+
+# One sync-marketplace.sh run for every queued plugin; its GITHUB_OUTPUT lines
+# go to SYNC_OUTPUT so only the attempt that is pushed is reported
+run_sync() {
+  local plugin args=()
+  for plugin in "${QUEUED[@]}"; do
+    args+=(--plugin "$plugin")
+  done
+  : > "$SYNC_OUTPUT"
+  GITHUB_OUTPUT="$SYNC_OUTPUT" "$SCRIPT_DIR/sync-marketplace.sh" --commit \
+    ${SYNC_OPTS[@]+"${SYNC_OPTS[@]}"} "${args[@]}"
+}
+
+drain() {
+  local attempt base
+  acquire_lock
+  SYNC_OUTPUT="$(mktemp "${TMPDIR:-/tmp}/update-queue-output.XXXXXX")"
+  trap 'rm -rf "$LOCK_DIR" "$SYNC_OUTPUT"' EXIT
+
+  wait_for_quiet
+  claim_events
+  if [ "$INCLUDE_MOVED" = true ]; then
+    while read -r plugin; do
+      [ -n "$plugin" ] && add_plugin "$plugin"
+    done < <(moved_plugins)
+  fi
+
+  if [ ${#QUEUED[@]} -eq 0 ]; then
+    echo -e "${GREEN}✅ Nothing queued and no plugin moved${NC}"
+    [ -n "${GITHUB_OUTPUT:-}" ] && echo "has_changes=false" >> "$GITHUB_OUTPUT"
+    return 0
+  fi
+  echo -e "${BLUE}Applying ${#QUEUED[@]} plugin update(s) as one sync: ${QUEUED[*]}${NC}"
+
+  cd "$MARKETPLACE_ROOT"
+  if [ "$PUSH" = true ] && ! git diff --quiet --ignore-submodules HEAD; then
+    echo -e "${RED}Error: uncommitted changes in $MARKETPLACE_ROOT; refusing to push${NC}"
+    finish_events retry
+    exit 1
+  fi
+
+  for ((attempt = 1; attempt <= ATTEMPTS; attempt++)); do
+    base=$(git rev-parse HEAD)
+    if ! run_sync; then
+      echo -e "${RED}Error: sync failed; queued events were put back for the next drain${NC}"
+      git reset -q --hard "$base"
+      finish_events retry
+      exit 1
+    fi
+    if [ "$PUSH" != true ] || [ "$(git rev-parse HEAD)" = "$base" ]; then
+      break
+    fi
+
+    if git ${GIT_OPTS[@]+"${GIT_OPTS[@]}"} push -q "$REMOTE" "HEAD:$BRANCH"; then
+      echo -e "${GREEN}Pushed $(git rev-parse --short HEAD) to $REMOTE/$BRANCH${NC}"
+      break
+    fi
+
+    # Rejected: drop our commit, move to the remote tip and replay the same plugins.
+    # The submodule checkouts are left alone; the replay re-fetches them anyway.
+    if ! git ${GIT_OPTS[@]+"${GIT_OPTS[@]}"} fetch -q "$REMOTE" "$BRANCH"; then
+      echo -e "${RED}Error: push failed and $REMOTE/$BRANCH could not be fetched; queued events were put back${NC}"
+      git reset -q --hard "$base"
+      finish_events retry
+      exit 1
+    fi
+    if [ "$(git rev-parse FETCH_HEAD)" = "$base" ]; then
+      echo -e "${RED}Error: push to $REMOTE/$BRANCH failed and the remote has not moved${NC}"
+      git reset -q --hard "$base"
+      finish_events retry
+      exit 1
+    fi
+    if [ "$attempt" -eq "$ATTEMPTS" ]; then
+      echo -e "${RED}Error: push still rejected after $ATTEMPTS attempt(s)${NC}"
+      git reset -q --hard "$base"
+      finish_events retry
+      exit 1
+    fi
+    echo -e "${YELLOW}Push rejected ($REMOTE/$BRANCH moved); replaying on $(git rev-parse --short FETCH_HEAD) (attempt $((attempt + 1))/$ATTEMPTS)${NC}"
+    git reset -q --hard FETCH_HEAD
+    sleep $((attempt * 2))
+  done
+
+  [ -n "${GITHUB_OUTPUT:-}" ] && cat "$SYNC_OUTPUT" >> "$GITHUB_OUTPUT"
+  finish_events done
+}
+
+# ─── Main ───────────────────────────────────────────────────────────
+
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --debounce|--max-wait|--remote|--branch|--attempts)
+      [ $# -ge 2 ] || { echo "$USAGE"; exit 1; }
+      case "$1" in
+        --debounce) DEBOUNCE="$2" ;;
+        --max-wait) MAX_WAIT="$2" ;;
+        --remote) REMOTE="$2" ;;
+        --branch) BRANCH="$2" ;;
+        --attempts) ATTEMPTS="$2" ;;
+      esac
+      shift ;;
+    --moved) INCLUDE_MOVED=true ;;
+    --push) PUSH=true ;;
+    --allow-file-protocol)
+      GIT_OPTS=(-c protocol.file.allow=always)
+      SYNC_OPTS=(--allow-file-protocol) ;;
+    -h|--help) echo "$USAGE"; exit 0 ;;
+    -*) echo -e "${RED}Unknown option: $1${NC}"; echo "$USAGE"; exit 1 ;;
+    *) break ;;
+  esac
+  shift
+done
+
+for value in "$DEBOUNCE" "$MAX_WAIT" "$ATTEMPTS"; do
+  if [[ ! "$value" =~ ^[0-9]+$ ]]; then
+    echo -e "${RED}Expected a number, got '$value'${NC}"
+    exit 1
+  fi
+done
+[ "$ATTEMPTS" -ge 1 ] || ATTEMPTS=1
+
+case "$COMMAND" in
+  enqueue)
+    [ $# -ge 1 ] || { echo "$USAGE"; exit 1; }
+    enqueue "$1" "${2:-}" ;;
+  status) show_status ;;
+  moved) moved_plugins ;;
+  drain) drain ;;
+  -h|--help) echo "$USAGE" ;;
+  *) echo -e "${RED}Unknown command: $COMMAND${NC}"; echo "$USAGE"; exit 1 ;;
+esac
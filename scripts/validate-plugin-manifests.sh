@@ -3,7 +3,23 @@ set -euo pipefail
 
 # Plugin Manifest Validation Script
 # Validates all plugin.json files in the marketplace
-# Usage: ./scripts/validate-plugin-manifests.sh [--fix]
+# Usage: ./scripts/validate-plugin-manifests.sh [--fix] [--jobs N] [--incremental] [--clear-cache]
+#                                              [--format text|json|sarif] [--output FILE]
+#
+# marketplace.json is parsed once per run and each plugin.json / hooks.json once
+# per plugin; every rule then runs against that in-memory model. Findings are
+# always printed as colored log lines and can also be written as JSON or SARIF.
+# With --jobs, plugins are validated concurrently and the per-plugin logs are
+# printed in marketplace.json order, so the output matches a serial run.
+#
+# With --incremental, each plugin's verdict is cached under a key made of its
+# git tree SHA, its marketplace.json entry and the validator version; plugins
+# whose key is already cached are not re-validated. The marketplace version
+# sync check is cheap and always runs live, so marketplace.json edits are
+# never masked by the cache. Plugins with uncommitted changes are never cached.
+#
+# Exit 0 = no errors and no warnings, Exit 1 = anything reported. Notes (valid
+# frontmatter YAML the parser skips) are reported but never fail the run.
 
 # Colors
 RED='\033[0;31m'
@@ -15,17 +31,89 @@ NC='\033[0m'
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 MARKETPLACE_ROOT="$(dirname "$SCRIPT_DIR")"
 source "$SCRIPT_DIR/common.sh"
+VALIDATOR_VERSION="2.0.0"
 FIX_MODE=false
+OUTPUT_FORMAT="text"
+OUTPUT_FILE=""
+JOBS=1
+INCREMENTAL=false
+CLEAR_CACHE=false
+CACHE_DIR="${VALIDATE_CACHE_DIR:-$MARKETPLACE_ROOT/.cache/validate-plugin-manifests}"
+CACHE_RECORD=""
+PLUGIN_CATALOG=""
 ERRORS_FOUND=0
 WARNINGS_FOUND=0
 
+usage() {
+  echo "Usage: $0 [--fix] [--jobs N] [--incremental] [--clear-cache] [--format text|json|sarif] [--output FILE]"
+  echo ""
+  echo "  --fix            Auto-fix skill/agent path issues in plugin.json"
+  echo "  --jobs N         Validate N plugins in parallel (0 = all cores, default: 1)"
+  echo "  --incremental    Reuse cached verdicts for plugins whose tree has not changed"
+  echo "  --cache-dir DIR  Verdict cache location (default: .cache/validate-plugin-manifests)"
+  echo "  --clear-cache    Delete all cached verdicts before validating"
+  echo "  --format FORMAT  Also emit findings as json or sarif (default: text)"
+  echo "  --output FILE    Write the json/sarif report to FILE instead of stdout"
+  exit "${1:-1}"
+}
+
 # Parse arguments
-if [ $# -eq 1 ] && [ "$1" = "--fix" ]; then
-  FIX_MODE=true
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --fix) FIX_MODE=true ;;
+    --jobs|-j) [ $# -ge 2 ] || usage; JOBS="$2"; shift ;;
+    --jobs=*) JOBS="${1#*=}" ;;
+    --incremental) INCREMENTAL=true ;;
+    --clear-cache) CLEAR_CACHE=true ;;
+    --cache-dir) [ $# -ge 2 ] || usage; CACHE_DIR="$2"; shift ;;
+    --cache-dir=*) CACHE_DIR="${1#*=}" ;;
+    --format) [ $# -ge 2 ] || usage; OUTPUT_FORMAT="$2"; shift ;;
+    --format=*) OUTPUT_FORMAT="${1#*=}" ;;
+    --output) [ $# -ge 2 ] || usage; OUTPUT_FILE="$2"; shift ;;
+    --output=*) OUTPUT_FILE="${1#*=}" ;;
+    -h|--help) usage 0 ;;
+    *) echo -e "${RED}Error: Unknown option '$1'${NC}"; usage ;;
+  esac
+  shift
+done
+
+case "$OUTPUT_FORMAT" in
+  text|json|sarif) ;;
+  *) echo -e "${RED}Error: Unknown format '$OUTPUT_FORMAT'${NC}"; usage ;;
+esac
+JOBS=$(resolve_jobs "$JOBS") || usage
+if [ -n "$OUTPUT_FILE" ] && [ "$OUTPUT_FORMAT" = "text" ]; then
+  echo -e "${RED}Error: --output requires --format json or --format sarif${NC}"
+  usage
+fi
+
+# Keep stdout clean for the machine-readable report; the log goes to stderr
+if [ "$OUTPUT_FORMAT" != "text" ] && [ -z "$OUTPUT_FILE" ]; then
+  exec 4>&1 1>&2
+fi
+
+# One line per finding: level, plugin, rule, file, message (tab-separated).
+# Parallel workers append whole lines; write_report restores plugin order.
+FINDINGS_FILE="$(mktemp "${TMPDIR:-/tmp}/validate-findings.XXXXXX")"
+CACHE_TMP=""
+trap 'rm -f "$FINDINGS_FILE"; [ -z "$CACHE_TMP" ] || rm -rf "$CACHE_TMP"' EXIT
+
+if [ "$FIX_MODE" = true ]; then
   echo -e "${YELLOW}🔧 FIX MODE ENABLED - Will attempt to auto-fix issues${NC}"
   echo ""
 fi
 
+if [ "$CLEAR_CACHE" = true ]; then
+  rm -rf "$CACHE_DIR"
+  echo -e "${YELLOW}Cleared validation cache: $CACHE_DIR${NC}"
+fi
+
+# --fix rewrites plugin.json, so cached verdicts must not short-circuit it
+if [ "$INCREMENTAL" = true ] && [ "$FIX_MODE" = true ]; then
+  echo -e "${YELLOW}Incremental mode is disabled with --fix${NC}"
+  INCREMENTAL=false
+fi
+
 echo -e "${BLUE}═══════════════════════════════════════════════════${NC}"
 echo -e "${BLUE}  Plugin Manifest Validation${NC}"
 echo -e "${BLUE}═══════════════════════════════════════════════════${NC}"
@@ -36,15 +124,131 @@ get_plugin_dir() {
   echo "$1"
 }
 
+# Record a finding and print it to the log
+# Usage: report <error|warning|note> <plugin> <rule> <file> <message>
+report() {
+  local level="$1" plugin="$2" rule="$3" file="$4" message="$5"
+  local logged="$plugin: $message"
+
+  # The manifest path already names the plugin
+  [ "$rule" = "manifest-missing" ] && logged="$message"
+
+  if [ "$level" = "error" ]; then
+    echo -e "${RED}✗${NC} $logged"
+    ERRORS_FOUND=$((ERRORS_FOUND + 1))
+  elif [ "$level" = "note" ]; then
+    echo -e "${BLUE}ℹ${NC} $logged"
+  else
+    echo -e "${YELLOW}⚠${NC} $logged"
+    WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+  fi
+  local line
+  printf -v line '%s\t%s\t%s\t%s\t%s' "$level" "$plugin" "$rule" "$file" "${message//$'\t'/ }"
+  echo "$line" >> "$FINDINGS_FILE"
+
+  # The sync verdict is never cached; see record_sync_marker
+  if [ -n "$CACHE_RECORD" ] && [ "$rule" != "marketplace-sync" ]; then
+    printf 'finding\t%s\n' "$line" >> "$CACHE_RECORD"
+  fi
+}
+
+# ─── In-memory model ────────────────────────────────────────────────
+# Each jq program below emits tab-separated "key<TAB>value" rows that are
+# read back with shell builtins, so every file is parsed exactly once.
+
+MODEL_JQ_DEFS='def text: if type == "string" then . else tojson end;'
+
+# plugin.json is slurped so an empty file still reports its missing fields
+PLUGIN_MODEL_JQ="$MODEL_JQ_DEFS"'
+  (if length > 0 then .[0] else null end | if type == "object" then . else {} end) as $m
+  | (["name", "version", "description", "author"][] | select(($m[.] // null) == null) | ["missing", .]),
+    ["version", ($m.version | text)],
+    ($m.skills // empty | .[]? | ["skill", text]),
+    ($m.agents // empty | .[]? | ["agent", text]),
+    ($m.commands // empty
+      | if type == "string" then ["commands_dir", .] else (.[]? | ["command", text]) end)
+  | @tsv'
+
+HOOKS_MODEL_JQ="$MODEL_JQ_DEFS"'
+  (.hooks | objects | keys[] | ["event", .]),
+  (.. | objects | .command? // empty | ["command", text]),
+  ([.hooks | objects | to_entries[]
+     | select(.key == "SubagentStart" or .key == "SubagentStop")
+     | .value[]? | objects | .matcher // empty | text] | unique[] | ["matcher", .])
+  | @tsv'
+
+MP_PLUGINS=()
+MP_VERSIONS=()
+MP_ENTRIES=()
+
+load_marketplace_model() {
+  local rows name version
+
+  if ! rows=$(jq -r "$MODEL_JQ_DEFS"' .plugins[] | [(.name | text), (.version | text), tojson] | @tsv' "$MARKETPLACE_JSON" 2>/dev/null); then
+    echo -e "${RED}✗${NC} marketplace.json: Invalid JSON or missing plugins array"
+    exit 1
+  fi
+
+  local entry
+  while IFS=$'\t' read -r name version entry; do
+    [ -z "$name" ] && continue
+    MP_PLUGINS+=("$name")
+    MP_VERSIONS+=("$version")
+    MP_ENTRIES+=("$entry")
+  done <<< "$rows"
+}
+
+marketplace_index_of() {
+  local name="$1" i
+  for i in ${MP_PLUGINS[@]+"${!MP_PLUGINS[@]}"}; do
+    if [ "${MP_PLUGINS[$i]}" = "$name" ]; then
+      echo "$i"
+      return 0
+    fi
+  done
+  return 1
+}
+
+marketplace_version_of() {
+  local i
+  i=$(marketplace_index_of "$1") || return 1
+  echo "${MP_VERSIONS[$i]}"
+}
+
+# Parse plugin.json into the PM_* globals. Returns 1 if it is not valid JSON.
+load_plugin_model() {
+  local plugin_json="$1" rows key value
+
+  PM_MISSING=()
+  PM_VERSION=""
+  PM_SKILLS=()
+  PM_AGENTS=()
+  PM_COMMANDS=()
+  PM_COMMANDS_DIR=""
+
+  rows=$(jq -r -s "$PLUGIN_MODEL_JQ" "$plugin_json" 2>/dev/null) || return 1
+
+  while IFS=$'\t' read -r key value; do
+    case "$key" in
+      missing) PM_MISSING+=("$value") ;;
+      version) PM_VERSION="$value" ;;
+      skill) PM_SKILLS+=("$value") ;;
+      agent) PM_AGENTS+=("$value") ;;
+      commands_dir) PM_COMMANDS_DIR="$value" ;;
+      command) PM_COMMANDS+=("$value") ;;
+    esac
+  done <<< "$rows"
+  return 0
+}
+
 # Validation functions
 
 validate_json_syntax() {
   local plugin_json="$1"
   local plugin_name="$2"
 
-  if ! jq empty "$plugin_json" 2>/dev/null; then
-    echo -e "${RED}✗${NC} $plugin_name: Invalid JSON syntax"
-    ERRORS_FOUND=$((ERRORS_FOUND + 1))
+  if ! load_plugin_model "$plugin_json"; then
+    report error "$plugin_name" json-syntax "$plugin_json" "Invalid JSON syntax"
     return 1
   fi
   return 0
@@ -54,18 +258,8 @@ validate_required_fields() {
   local plugin_json="$1"
   local plugin_name="$2"
 
-  local required_fields=("name" "version" "description" "author")
-  local missing_fields=()
-
-  for field in "${required_fields[@]}"; do
-    if ! jq -e ".$field" "$plugin_json" >/dev/null 2>&1; then
-      missing_fields+=("$field")
-    fi
-  done
-
-  if [ ${#missing_fields[@]} -gt 0 ]; then
-    echo -e "${RED}✗${NC} $plugin_name: Missing required fields: ${missing_fields[*]}"
-    ERRORS_FOUND=$((ERRORS_FOUND + 1))
+  if [ ${#PM_MISSING[@]} -gt 0 ]; then
+    report error "$plugin_name" required-fields "$plugin_json" "Missing required fields: ${PM_MISSING[*]}"
     return 1
   fi
 
@@ -76,11 +270,8 @@ validate_version_format() {
   local plugin_json="$1"
   local plugin_name="$2"
 
-  local version=$(jq -r '.version' "$plugin_json")
-
-  if ! echo "$version" | grep -qE '^[0-9]+\.[0-9]+\.[0-9]+$'; then
-    echo -e "${RED}✗${NC} $plugin_name: Invalid version format '$version' (expected X.Y.Z)"
-    ERRORS_FOUND=$((ERRORS_FOUND + 1))
+  if [[ ! "$PM_VERSION" =~ ^[0-9]+\.[0-9]+\.[0-9]+$ ]]; then
+    report error "$plugin_name" version-format "$plugin_json" "Invalid version format '$PM_VERSION' (expected X.Y.Z)"
     return 1
   fi
 
@@ -92,25 +283,14 @@ validate_skills_format() {
   local plugin_name="$2"
   local plugin_dir="$3"
 
-  # Check if skills field exists
-  if ! jq -e '.skills' "$plugin_json" >/dev/null 2>&1; then
-    return 0  # Skills are optional
-  fi
-
-  local skills=$(jq -r '.skills[]?' "$plugin_json" 2>/dev/null || echo "")
-
-  if [ -z "$skills" ]; then
-    return 0  # Empty skills array is OK
-  fi
-
   local has_errors=false
+  local skill
 
-  while IFS= read -r skill; do
+  for skill in ${PM_SKILLS[@]+"${PM_SKILLS[@]}"}; do
     # Check if it starts with ./ (relative path)
     if [[ ! "$skill" =~ ^\.\/ ]]; then
-      echo -e "${RED}✗${NC} $plugin_name: Skill '$skill' must be a relative path starting with './' (e.g., './skills/$skill')"
+      report error "$plugin_name" skill-path "$plugin_json" "Skill '$skill' must be a relative path starting with './' (e.g., './skills/$skill')"
       has_errors=true
-      ERRORS_FOUND=$((ERRORS_FOUND + 1))
       continue
     fi
 
@@ -118,17 +298,15 @@ validate_skills_format() {
     local skill_path="$MARKETPLACE_ROOT/$plugin_dir/${skill#./}"
 
     if [ ! -d "$skill_path" ]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: Skill directory not found: $skill"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+      report warning "$plugin_name" skill-path "$plugin_json" "Skill directory not found: $skill"
       continue
     fi
 
     # Check if SKILL.md exists in the directory
     if [ ! -f "$skill_path/SKILL.md" ]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: Missing SKILL.md in $skill"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+      report warning "$plugin_name" skill-path "$plugin_json" "Missing SKILL.md in $skill"
     fi
-  done <<< "$skills"
+  done
 
   if [ "$has_errors" = true ]; then
     return 1
@@ -142,33 +320,21 @@ validate_agents_format() {
   local plugin_name="$2"
   local plugin_dir="$3"
 
-  # Check if agents field exists
-  if ! jq -e '.agents' "$plugin_json" >/dev/null 2>&1; then
-    return 0  # Agents are optional
-  fi
-
-  local agents=$(jq -r '.agents[]?' "$plugin_json" 2>/dev/null || echo "")
-
-  if [ -z "$agents" ]; then
-    return 0  # Empty agents array is OK
-  fi
-
   local has_errors=false
+  local agent
 
-  while IFS= read -r agent; do
+  for agent in ${PM_AGENTS[@]+"${PM_AGENTS[@]}"}; do
     # Check if it starts with ./ (relative path)
     if [[ ! "$agent" =~ ^\.\/ ]]; then
-      echo -e "${RED}✗${NC} $plugin_name: Agent '$agent' must be a relative path starting with './' (e.g., './agents/$agent.md')"
+      report error "$plugin_name" agent-path "$plugin_json" "Agent '$agent' must be a relative path starting with './' (e.g., './agents/$agent.md')"
       has_errors=true
-      ERRORS_FOUND=$((ERRORS_FOUND + 1))
       continue
     fi
 
     # Check if it ends with .md
     if [[ ! "$agent" =~ \.md$ ]]; then
-      echo -e "${RED}✗${NC} $plugin_name: Agent '$agent' must end with '.md'"
+      report error "$plugin_name" agent-path "$plugin_json" "Agent '$agent' must end with '.md'"
       has_errors=true
-      ERRORS_FOUND=$((ERRORS_FOUND + 1))
       continue
     fi
 
@@ -176,10 +342,9 @@ validate_agents_format() {
     local agent_path="$MARKETPLACE_ROOT/$plugin_dir/${agent#./}"
 
     if [ ! -f "$agent_path" ]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: Agent file not found: $agent"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+      report warning "$plugin_name" agent-path "$plugin_json" "Agent file not found: $agent"
     fi
-  done <<< "$agents"
+  done
 
   if [ "$has_errors" = true ]; then
     return 1
@@ -193,44 +358,27 @@ validate_commands_format() {
   local plugin_name="$2"
   local plugin_dir="$3"
 
-  # Check if commands field exists
-  if ! jq -e '.commands' "$plugin_json" >/dev/null 2>&1; then
-    return 0  # Commands are optional
-  fi
-
   # Commands can be a string (directory) or array of files
-  local commands_type=$(jq -r '.commands | type' "$plugin_json" 2>/dev/null)
-
-  if [ "$commands_type" = "string" ]; then
-    local commands_dir=$(jq -r '.commands' "$plugin_json")
-    local full_path="$MARKETPLACE_ROOT/$plugin_dir/${commands_dir#./}"
+  if [ -n "$PM_COMMANDS_DIR" ]; then
+    local full_path="$MARKETPLACE_ROOT/$plugin_dir/${PM_COMMANDS_DIR#./}"
 
     if [ ! -d "$full_path" ]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: Commands directory not found: $commands_dir"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+      report warning "$plugin_name" command-path "$plugin_json" "Commands directory not found: $PM_COMMANDS_DIR"
     fi
     return 0
   fi
 
-  # Array of command files
-  local commands=$(jq -r '.commands[]?' "$plugin_json" 2>/dev/null || echo "")
-
-  if [ -z "$commands" ]; then
-    return 0
-  fi
-
-  while IFS= read -r command; do
+  local command
+  for command in ${PM_COMMANDS[@]+"${PM_COMMANDS[@]}"}; do
     # Check if it starts with ./
     if [[ ! "$command" =~ ^\.\/ ]]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: Command '$command' should start with './' (recommended)"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+      report warning "$plugin_name" command-path "$plugin_json" "Command '$command' should start with './' (recommended)"
       continue
     fi
 
     # Check if it ends with .md
     if [[ ! "$command" =~ \.md$ ]]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: Command '$command' should end with '.md'"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+      report warning "$plugin_name" command-path "$plugin_json" "Command '$command' should end with '.md'"
       continue
     fi
 
@@ -238,10 +386,9 @@ validate_commands_format() {
     local command_path="$MARKETPLACE_ROOT/$plugin_dir/${command#./}"
 
     if [ ! -f "$command_path" ]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: Command file not found: $command"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+      report warning "$plugin_name" command-path "$plugin_json" "Command file not found: $command"
     fi
-  done <<< "$commands"
+  done
 
   return 0
 }
@@ -250,94 +397,104 @@ validate_marketplace_sync() {
   local plugin_json="$1"
   local plugin_name="$2"
 
-  local plugin_version=$(jq -r '.version' "$plugin_json")
-  local marketplace_version=$(jq -r --arg name "$plugin_name" '.plugins[] | select(.name == $name) | .version' "$MARKETPLACE_ROOT/.claude-plugin/marketplace.json")
-
-  if [ -z "$marketplace_version" ]; then
-    echo -e "${YELLOW}⚠${NC} $plugin_name: Not found in marketplace.json"
-    WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
+  local marketplace_version
+  if ! marketplace_version=$(marketplace_version_of "$plugin_name"); then
+    report warning "$plugin_name" marketplace-sync "$plugin_json" "Not found in marketplace.json"
     return 0
   fi
 
-  if [ "$plugin_version" != "$marketplace_version" ]; then
-    echo -e "${RED}✗${NC} $plugin_name: Version mismatch - plugin.json: $plugin_version, marketplace.json: $marketplace_version"
-    ERRORS_FOUND=$((ERRORS_FOUND + 1))
+  if [ "$PM_VERSION" != "$marketplace_version" ]; then
+    report error "$plugin_name" marketplace-sync "$plugin_json" "Version mismatch - plugin.json: $PM_VERSION, marketplace.json: $marketplace_version"
     return 1
   fi
 
   return 0
 }
 
+# Valid hook events
+VALID_HOOK_EVENTS="PreToolUse PostToolUse PostToolUseFailure Stop Notification SubagentStart SubagentStop TaskCompleted PreCompact SessionStart SessionEnd PermissionRequest TeammateIdle UserPromptSubmit"
+
 validate_hooks_json() {
   local plugin_name="$1"
   local plugin_dir="$2"
 
-  local hooks_json="$MARKETPLACE_ROOT/$plugin_dir/hooks/hooks.json"
+  local hooks_rel="$plugin_dir/hooks/hooks.json"
+  local hooks_json="$MARKETPLACE_ROOT/$hooks_rel"
   [ ! -f "$hooks_json" ] && return 0
 
-  if ! jq empty "$hooks_json" 2>/dev/null; then
-    echo -e "${RED}✗${NC} $plugin_name: hooks/hooks.json is invalid JSON"
-    ERRORS_FOUND=$((ERRORS_FOUND + 1))
+  local rows
+  if ! rows=$(jq -r "$HOOKS_MODEL_JQ" "$hooks_json" 2>/dev/null); then
+    report error "$plugin_name" hooks-json "$hooks_rel" "hooks/hooks.json is invalid JSON"
     return 1
   fi
 
-  # Valid hook events
-  local valid_events="PreToolUse PostToolUse PostToolUseFailure Stop Notification SubagentStart SubagentStop TaskCompleted PreCompact SessionStart SessionEnd PermissionRequest TeammateIdle UserPromptSubmit"
-
-  local events
-  events=$(jq -r '.hooks | keys[]' "$hooks_json" 2>/dev/null) || true
-  for event in $events; do
-    if ! echo "$valid_events" | tr ' ' '\n' | grep -qx "$event"; then
-      echo -e "${RED}✗${NC} $plugin_name: unknown hook event '$event'"
-      ERRORS_FOUND=$((ERRORS_FOUND + 1))
-    fi
-  done
-
-  # Hook script commands must resolve to existing executables
-  local commands
-  commands=$(jq -r '.. | objects | .command? // empty' "$hooks_json" 2>/dev/null) || true
-  while IFS= read -r cmd; do
-    [ -z "$cmd" ] && continue
-    # Extract the CLAUDE_PLUGIN_ROOT path from the command (may be preceded by interpreter)
-    local script_path
-    script_path=$(echo "$cmd" | grep -o '\${CLAUDE_PLUGIN_ROOT}/[^ '"'"']*' | head -1 | sed "s|\${CLAUDE_PLUGIN_ROOT}/||")
-    [ -z "$script_path" ] && continue  # No plugin-root path (e.g. system command)
-    local full="$MARKETPLACE_ROOT/$plugin_dir/$script_path"
-    if [ ! -f "$full" ]; then
-      echo -e "${RED}✗${NC} $plugin_name: hook script not found: $script_path"
-      ERRORS_FOUND=$((ERRORS_FOUND + 1))
-    elif [ ! -x "$full" ]; then
-      echo -e "${YELLOW}⚠${NC} $plugin_name: hook script not executable: $script_path"
-      WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
-    fi
-  done <<< "$commands"
-
-  # SubagentStart/Stop matchers must have matching agent files
-  local matchers
-  matchers=$(jq -r '.hooks | to_entries[] | select(.key == "SubagentStart" or .key == "SubagentStop") | .value[] | .matcher // empty' "$hooks_json" 2>/dev/null | sort -u) || true
-  while IFS= read -r matcher; do
-    [ -z "$matcher" ] && continue
-    # Matchers can be pipe-separated regex patterns — check each part
-    echo "$matcher" | tr '|' '\n' | while IFS= read -r part; do
-      [ -z "$part" ] && continue
-      local agent_file="$MARKETPLACE_ROOT/$plugin_dir/agents/${part}.md"
-      if [ ! -f "$agent_file" ]; then
-        echo -e "${RED}✗${NC} $plugin_name: hook matcher '$part' has no agents/${part}.md"
-        ERRORS_FOUND=$((ERRORS_FOUND + 1))
-      fi
-    done
-  done <<< "$matchers"
+  # Plugin-root script path in a hook command (may be preceded by interpreter)
+  local root_ref='\$\{CLAUDE_PLUGIN_ROOT\}/([^ '"'"']*)'
+  local key value part
+
+  while IFS=$'\t' read -r key value; do
+    case "$key" in
+      event)
+        case " $VALID_HOOK_EVENTS " in
+          *" $value "*) ;;
+          *) report error "$plugin_name" hook-event "$hooks_rel" "unknown hook event '$value'" ;;
+        esac
+        ;;
+      command)
+        # Hook script commands must resolve to existing executables
+        [[ "$value" =~ $root_ref ]] || continue  # No plugin-root path (e.g. system command)
+        local script_path="${BASH_REMATCH[1]}"
+        [ -z "$script_path" ] && continue
+        local full="$MARKETPLACE_ROOT/$plugin_dir/$script_path"
+        if [ ! -f "$full" ]; then
+          report error "$plugin_name" hook-script "$hooks_rel" "hook script not found: $script_path"
+        elif [ ! -x "$full" ]; then
+          report warning "$plugin_name" hook-script "$hooks_rel" "hook script not executable: $script_path"
+        fi
+        ;;
+      matcher)
+        # SubagentStart/Stop matchers must have matching agent files.
+        # Matchers can be pipe-separated regex patterns — check each part
+        local parts=()
+        IFS='|' read -ra parts <<< "$value"
+        for part in ${parts[@]+"${parts[@]}"}; do
+          [ -z "$part" ] && continue
+          if [ ! -f "$MARKETPLACE_ROOT/$plugin_dir/agents/${part}.md" ]; then
+            report error "$plugin_name" hook-matcher "$hooks_rel" "hook matcher '$part' has no agents/${part}.md"
+          fi
+        done
+        ;;
+    esac
+  done <<< "$rows"
 
   return 0
 }
 
-# Extract YAML frontmatter field (awk-based, BSD/macOS compatible)
-_get_fm_field() {
-  local file="$1" field="$2"
-  awk '/^---$/{if(f)exit;f=1;next} f{print}' "$file" 2>/dev/null \
-    | grep "^${field}:" \
-    | sed "s/^${field}:[[:space:]]*//" \
-    | head -1 || true
+# Frontmatter rows for the given catalog paths, one per component found:
+# path, name, description, model, permissionMode, skills (comma-joined),
+# parse errors and skipped-key warnings ("; "-joined). Fields are
+# \x1f-separated so empty ones survive read.
+FRONTMATTER_JQ='
+  def text: if type == "string" then . elif . == null then "" else tojson end | gsub("[\n\u001f]"; " ");
+  (.components | map({(.path): .}) | add // {}) as $c
+  | $ARGS.positional[] | $c[.] // empty
+  | (.frontmatter // {}) as $fm
+  | [.path,
+     ($fm.name | text),
+     ($fm.description | text),
+     ($fm.model | text),
+     ($fm.permissionMode | text),
+     ($fm.skills | if type == "array" then map(text) | join(",")
+                   elif type == "string" then gsub("\\s"; "") else "" end),
+     (.errors | join("; ") | text),
+     (.warnings // [] | join("; ") | text)]
+  | join("\u001f")'
+
+# Print frontmatter rows (see FRONTMATTER_JQ) for paths relative to the plugin dir
+load_frontmatter_rows() {
+  [ $# -eq 0 ] && return 0
+  [ -n "$PLUGIN_CATALOG" ] || return 1
+  jq -r "$FRONTMATTER_JQ" "$PLUGIN_CATALOG" --args "$@"
 }
 
 validate_agent_frontmatter() {
@@ -345,72 +502,66 @@ validate_agent_frontmatter() {
   local plugin_name="$2"
   local plugin_dir="$3"
 
-  local agents
-  agents=$(jq -r '.agents[]?' "$plugin_json" 2>/dev/null) || true
-  [ -z "$agents" ] && return 0
-
   local valid_models="sonnet opus haiku inherit"
   local valid_perms="default acceptEdits dontAsk bypassPermissions plan"
 
-  while IFS= read -r agent_path; do
-    [ -z "$agent_path" ] && continue
-    local full="$MARKETPLACE_ROOT/$plugin_dir/${agent_path#./}"
-    [ ! -f "$full" ] && continue
+  local agent_path paths=()
+  for agent_path in ${PM_AGENTS[@]+"${PM_AGENTS[@]}"}; do
+    [ -n "$agent_path" ] && paths+=("${agent_path#./}")
+  done
+
+  local rows
+  rows=$(load_frontmatter_rows ${paths[@]+"${paths[@]}"}) || return 0
 
+  local path name description model_val perm_val skills errors unsupported
+  while IFS=$'\x1f' read -r path name description model_val perm_val skills errors unsupported; do
+    [ -z "$path" ] && continue
+    local rel="$plugin_dir/$path"
     local agent_name
-    agent_name=$(basename "$agent_path" .md)
+    agent_name=$(basename "$path" .md)
+
+    # Block-style YAML the agent loader would reject or misread
+    if [ -n "$errors" ]; then
+      report error "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name frontmatter: $errors"
+    fi
+    # Valid YAML the parser does not read; the skipped keys are not checked
+    if [ -n "$unsupported" ]; then
+      report note "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name frontmatter: $unsupported"
+    fi
 
     # Check required frontmatter fields
-    for field in name description model permissionMode; do
-      local val
-      val=$(_get_fm_field "$full" "$field")
-      if [ -z "$val" ]; then
-        echo -e "${YELLOW}⚠${NC} $plugin_name: agents/$agent_name missing frontmatter '$field'"
-        WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
-      fi
-    done
+    [ -z "$name" ] && report warning "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name missing frontmatter 'name'"
+    [ -z "$description" ] && report warning "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name missing frontmatter 'description'"
+    [ -z "$model_val" ] && report warning "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name missing frontmatter 'model'"
+    [ -z "$perm_val" ] && report warning "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name missing frontmatter 'permissionMode'"
 
     # Validate model enum
-    local model_val
-    model_val=$(_get_fm_field "$full" "model")
     if [ -n "$model_val" ]; then
-      local model_ok=0
-      for m in $valid_models; do [ "$model_val" = "$m" ] && model_ok=1 && break; done
-      if [ "$model_ok" -eq 0 ]; then
-        echo -e "${RED}✗${NC} $plugin_name: agents/$agent_name has invalid model '$model_val'"
-        ERRORS_FOUND=$((ERRORS_FOUND + 1))
-      fi
+      case " $valid_models " in
+        *" $model_val "*) ;;
+        *) report error "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name has invalid model '$model_val'" ;;
+      esac
     fi
 
     # Validate permissionMode enum
-    local perm_val
-    perm_val=$(_get_fm_field "$full" "permissionMode")
     if [ -n "$perm_val" ]; then
-      local perm_ok=0
-      for p in $valid_perms; do [ "$perm_val" = "$p" ] && perm_ok=1 && break; done
-      if [ "$perm_ok" -eq 0 ]; then
-        echo -e "${RED}✗${NC} $plugin_name: agents/$agent_name has invalid permissionMode '$perm_val'"
-        ERRORS_FOUND=$((ERRORS_FOUND + 1))
-      fi
+      case " $valid_perms " in
+        *" $perm_val "*) ;;
+        *) report error "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name has invalid permissionMode '$perm_val'" ;;
+      esac
     fi
 
     # Validate frontmatter skills list references exist
-    local impl_skills
-    impl_skills=$(awk '
-      /^---$/{if(f)exit;f=1;next}
-      f && /^skills:/{s=1;next}
-      f && s && /^[a-z]/{s=0}
-      f && s && /^  - /{gsub(/^[[:space:]]*-[[:space:]]*/,"");print}
-    ' "$full" 2>/dev/null)
-    while IFS= read -r skill; do
+    local skill skill_list=()
+    IFS=',' read -ra skill_list <<< "$skills"
+    for skill in ${skill_list[@]+"${skill_list[@]}"}; do
       [ -z "$skill" ] && continue
       local skill_md="$MARKETPLACE_ROOT/$plugin_dir/skills/$skill/SKILL.md"
       if [ ! -f "$skill_md" ]; then
-        echo -e "${RED}✗${NC} $plugin_name: agents/$agent_name references skill '$skill' but skills/$skill/SKILL.md not found"
-        ERRORS_FOUND=$((ERRORS_FOUND + 1))
+        report error "$plugin_name" agent-frontmatter "$rel" "agents/$agent_name references skill '$skill' but skills/$skill/SKILL.md not found"
       fi
-    done <<< "$impl_skills"
-  done <<< "$agents"
+    done
+  done <<< "$rows"
 
   return 0
 }
@@ -420,28 +571,32 @@ validate_skill_frontmatter() {
   local plugin_name="$2"
   local plugin_dir="$3"
 
-  local skills
-  skills=$(jq -r '.skills[]?' "$plugin_json" 2>/dev/null) || true
-  [ -z "$skills" ] && return 0
+  local skill_path paths=()
+  for skill_path in ${PM_SKILLS[@]+"${PM_SKILLS[@]}"}; do
+    [ -n "$skill_path" ] && paths+=("${skill_path#./}/SKILL.md")
+  done
 
-  while IFS= read -r skill_path; do
-    [ -z "$skill_path" ] && continue
-    local skill_md="$MARKETPLACE_ROOT/$plugin_dir/${skill_path#./}/SKILL.md"
-    [ ! -f "$skill_md" ] && continue
+  local rows
+  rows=$(load_frontmatter_rows ${paths[@]+"${paths[@]}"}) || return 0
 
+  local path name description model_val perm_val skills errors unsupported
+  while IFS=$'\x1f' read -r path name description model_val perm_val skills errors unsupported; do
+    [ -z "$path" ] && continue
+    local rel="$plugin_dir/$path"
     local skill_name
-    skill_name=$(basename "$skill_path")
+    skill_name=$(basename "$(dirname "$path")")
+
+    if [ -n "$errors" ]; then
+      report error "$plugin_name" skill-frontmatter "$rel" "skills/$skill_name frontmatter: $errors"
+    fi
+    if [ -n "$unsupported" ]; then
+      report note "$plugin_name" skill-frontmatter "$rel" "skills/$skill_name frontmatter: $unsupported"
+    fi
 
     # Check required frontmatter fields
-    for field in name description; do
-      local val
-      val=$(_get_fm_field "$skill_md" "$field")
-      if [ -z "$val" ]; then
-        echo -e "${YELLOW}⚠${NC} $plugin_name: skills/$skill_name missing frontmatter '$field'"
-        WARNINGS_FOUND=$((WARNINGS_FOUND + 1))
-      fi
-    done
-  done <<< "$skills"
+    [ -z "$name" ] && report warning "$plugin_name" skill-frontmatter "$rel" "skills/$skill_name missing frontmatter 'name'"
+    [ -z "$description" ] && report warning "$plugin_name" skill-frontmatter "$rel" "skills/$skill_name missing frontmatter 'description'"
+  done <<< "$rows"
 
   return 0
 }
@@ -461,8 +616,7 @@ validate_shell_scripts() {
       [ -z "$script" ] && continue
       local rel="${script#$full_dir/}"
       if ! bash -n "$script" 2>/dev/null; then
-        echo -e "${RED}✗${NC} $plugin_name: $rel has syntax errors"
-        ERRORS_FOUND=$((ERRORS_FOUND + 1))
+        report error "$plugin_name" shell-syntax "$plugin_dir/$rel" "$rel has syntax errors"
       fi
     done < <(find "$search_dir" -maxdepth 2 -name "*.sh" -type f -not -path "*/node_modules/*" 2>/dev/null)
   done
@@ -478,81 +632,143 @@ auto_fix_paths() {
 
   echo -e "${BLUE}Attempting to fix $plugin_name...${NC}"
 
-  local temp_file="${plugin_json}.tmp"
-  cp "$plugin_json" "$temp_file"
-
-  # Fix skills - add ./skills/ prefix
-  local skills=$(jq -r '.skills[]?' "$temp_file" 2>/dev/null || echo "")
-  if [ -n "$skills" ]; then
-    local fixed_skills="[]"
-    while IFS= read -r skill; do
-      if [[ ! "$skill" =~ ^\.\/ ]]; then
-        fixed_skills=$(echo "$fixed_skills" | jq --arg skill "./skills/$skill" '. += [$skill]')
-        echo -e "  ${GREEN}→${NC} Fixed skill: $skill → ./skills/$skill"
-      else
-        fixed_skills=$(echo "$fixed_skills" | jq --arg skill "$skill" '. += [$skill]')
-      fi
-    done <<< "$skills"
-
-    jq --argjson skills "$fixed_skills" '.skills = $skills' "$temp_file" > "${temp_file}.2"
-    mv "${temp_file}.2" "$temp_file"
-  fi
-
-  # Fix agents - add ./agents/ prefix and .md suffix
-  local agents=$(jq -r '.agents[]?' "$temp_file" 2>/dev/null || echo "")
-  if [ -n "$agents" ]; then
-    local fixed_agents="[]"
-    while IFS= read -r agent; do
-      if [[ ! "$agent" =~ ^\.\/ ]]; then
-        local fixed_agent="./agents/$agent"
-        if [[ ! "$fixed_agent" =~ \.md$ ]]; then
-          fixed_agent="${fixed_agent}.md"
-        fi
-        fixed_agents=$(echo "$fixed_agents" | jq --arg agent "$fixed_agent" '. += [$agent]')
-        echo -e "  ${GREEN}→${NC} Fixed agent: $agent → $fixed_agent"
-      else
-        fixed_agents=$(echo "$fixed_agents" | jq --arg agent "$agent" '. += [$agent]')
-      fi
-    done <<< "$agents"
+  local skill agent
+  for skill in ${PM_SKILLS[@]+"${PM_SKILLS[@]}"}; do
+    if [[ ! "$skill" =~ ^\.\/ ]]; then
+      echo -e "  ${GREEN}→${NC} Fixed skill: $skill → ./skills/$skill"
+    fi
+  done
+  for agent in ${PM_AGENTS[@]+"${PM_AGENTS[@]}"}; do
+    if [[ ! "$agent" =~ ^\.\/ ]]; then
+      local fixed_agent="./agents/$agent"
+      [[ "$fixed_agent" =~ \.md$ ]] || fixed_agent="${fixed_agent}.md"
+      echo -e "  ${GREEN}→${NC} Fixed agent: $agent → $fixed_agent"
+    fi
+  done
 
-    jq --argjson agents "$fixed_agents" '.agents = $agents' "$temp_file" > "${temp_file}.2"
-    mv "${temp_file}.2" "$temp_file"
-  fi
+  # Skills get a ./skills/ prefix, agents a ./agents/ prefix and .md suffix
+  local temp_file="${plugin_json}.tmp"
+  jq '
+    def relative($prefix): if type == "string" and (startswith("./") | not) then $prefix + . else . end;
+    (if (.skills | type) == "array" then .skills |= map(relative("./skills/")) else . end)
+    | (if (.agents | type) == "array"
+       then .agents |= map(if type == "string" and (startswith("./") | not)
+                           then relative("./agents/") | (if endswith(".md") then . else . + ".md" end)
+                           else . end)
+       else . end)
+  ' "$plugin_json" > "$temp_file"
 
   # Move fixed file
   mv "$temp_file" "$plugin_json"
   echo -e "${GREEN}✓${NC} Fixed $plugin_json"
 }
 
-# Main validation loop
-cd "$MARKETPLACE_ROOT"
+# ─── Incremental cache ──────────────────────────────────────────────
+# One file per key: "finding<TAB><finding line>" rows in log order, plus a
+# "sync<TAB><plugin.json version>" row where the marketplace sync check ran.
+
+# Changes whenever the rules change, even without a version bump
+validator_fingerprint() {
+  echo "$VALIDATOR_VERSION"
+  git hash-object "$SCRIPT_DIR/validate-plugin-manifests.sh" "$SCRIPT_DIR/common.sh" "$SCRIPT_DIR/frontmatter.awk"
+}
+
+# Print the cache key for a plugin; fails if the plugin cannot be cached
+plugin_cache_key() {
+  local plugin_name="$1"
+  local dir i tree
+  dir="$MARKETPLACE_ROOT/$(get_plugin_dir "$plugin_name")"
+  i=$(marketplace_index_of "$plugin_name") || return 1
 
-for plugin_name in $(get_plugins); do
+  # HEAD:./ is the plugin's own tree, whether it is a submodule or a subdirectory
+  tree=$(git -C "$dir" rev-parse --verify -q 'HEAD:./' 2>/dev/null) || return 1
+  [ -z "$(git -C "$dir" status --porcelain --untracked-files=all -- . 2>/dev/null)" ] || return 1
+
+  printf '%s\n%s\n%s\n' "$tree" "${MP_ENTRIES[$i]}" "$VALIDATOR_FINGERPRINT" | git hash-object --stdin
+}
+
+record_sync_marker() {
+  if [ -n "$CACHE_RECORD" ]; then
+    printf 'sync\t%s\n' "$PM_VERSION" >> "$CACHE_RECORD"
+  fi
+}
+
+# Replay a cached verdict; only the marketplace sync check is re-run
+replay_cached_verdict() {
+  local plugin_name="$1" plugin_json="$2" entry="$3"
+  local plugin_valid=true kind level plugin rule file message
+
+  touch "$entry"
+  while IFS=$'\t' read -r kind level plugin rule file message; do
+    case "$kind" in
+      finding)
+        report "$level" "$plugin" "$rule" "$file" "$message"
+        case "$rule" in
+          manifest-missing|json-syntax|required-fields|version-format) plugin_valid=false ;;
+        esac
+        ;;
+      sync)
+        PM_VERSION="$level"
+        validate_marketplace_sync "$plugin_json" "$plugin_name" || plugin_valid=false
+        ;;
+    esac
+  done < "$entry"
+
+  if [ "$plugin_valid" = true ]; then
+    echo -e "${GREEN}✓${NC} $plugin_name validation passed (cached)"
+  fi
+}
+
+validate_plugin() {
+  local plugin_name="$1"
+  local plugin_dir plugin_json
   plugin_dir=$(get_plugin_dir "$plugin_name")
   plugin_json="$plugin_dir/.claude-plugin/plugin.json"
 
   echo -e "${BLUE}Validating:${NC} $plugin_name"
   echo "  Path: $plugin_json"
 
+  local cache_key=""
+  if [ "$INCREMENTAL" = true ] && cache_key=$(plugin_cache_key "$plugin_name"); then
+    if [ -f "$CACHE_DIR/$cache_key" ]; then
+      replay_cached_verdict "$plugin_name" "$plugin_json" "$CACHE_DIR/$cache_key"
+      echo ""
+      return 0
+    fi
+    CACHE_RECORD="$(mktemp "$CACHE_TMP/record.XXXXXX")"
+  fi
+
+  validate_plugin_rules "$plugin_name" "$plugin_dir" "$plugin_json"
+
+  # Publish atomically: parallel workers may share the cache directory
+  if [ -n "$CACHE_RECORD" ]; then
+    mv "$CACHE_RECORD" "$CACHE_DIR/$cache_key"
+    CACHE_RECORD=""
+  fi
+  echo ""
+}
+
+validate_plugin_rules() {
+  local plugin_name="$1" plugin_dir="$2" plugin_json="$3"
+
   if [ ! -f "$plugin_json" ]; then
-    echo -e "${RED}✗${NC} Plugin manifest not found: $plugin_json"
-    ERRORS_FOUND=$((ERRORS_FOUND + 1))
-    echo ""
-    continue
+    report error "$plugin_name" manifest-missing "$plugin_json" "Plugin manifest not found: $plugin_json"
+    return 0
   fi
 
   # Run validations
-  plugin_valid=true
+  local plugin_valid=true
 
   validate_json_syntax "$plugin_json" "$plugin_name" || plugin_valid=false
 
   if [ "$plugin_valid" = true ]; then
     validate_required_fields "$plugin_json" "$plugin_name" || plugin_valid=false
     validate_version_format "$plugin_json" "$plugin_name" || plugin_valid=false
+    record_sync_marker
     validate_marketplace_sync "$plugin_json" "$plugin_name" || plugin_valid=false
 
     # Format validations (can be auto-fixed)
-    needs_fix=false
+    local needs_fix=false
     validate_skills_format "$plugin_json" "$plugin_name" "$plugin_dir" || needs_fix=true
     validate_agents_format "$plugin_json" "$plugin_name" "$plugin_dir" || needs_fix=true
     validate_commands_format "$plugin_json" "$plugin_name" "$plugin_dir"
@@ -561,12 +777,17 @@ for plugin_name in $(get_plugins); do
     if [ "$FIX_MODE" = true ] && [ "$needs_fix" = true ]; then
       auto_fix_paths "$plugin_json" "$plugin_name" "$plugin_dir"
       echo -e "${GREEN}✓${NC} Re-validating after fixes..."
-      validate_skills_format "$plugin_json" "$plugin_name" "$plugin_dir"
-      validate_agents_format "$plugin_json" "$plugin_name" "$plugin_dir"
+      load_plugin_model "$plugin_json"
+      validate_skills_format "$plugin_json" "$plugin_name" "$plugin_dir" || true
+      validate_agents_format "$plugin_json" "$plugin_name" "$plugin_dir" || true
     fi
 
     # Deep validation: hooks, frontmatter, scripts, cross-refs
-    validate_hooks_json "$plugin_name" "$plugin_dir"
+    validate_hooks_json "$plugin_name" "$plugin_dir" || true
+    if ! PLUGIN_CATALOG=$(component_catalog "$MARKETPLACE_ROOT/$plugin_dir"); then
+      PLUGIN_CATALOG=""
+      report warning "$plugin_name" agent-frontmatter "$plugin_json" "Could not build the component catalog; frontmatter not checked"
+    fi
     validate_agent_frontmatter "$plugin_json" "$plugin_name" "$plugin_dir"
     validate_skill_frontmatter "$plugin_json" "$plugin_name" "$plugin_dir"
     validate_shell_scripts "$plugin_name" "$plugin_dir"
@@ -575,9 +796,98 @@ for plugin_name in $(get_plugins); do
   if [ "$plugin_valid" = true ]; then
     echo -e "${GREEN}✓${NC} $plugin_name validation passed"
   fi
+}
 
-  echo ""
-done
+# ─── Reports ────────────────────────────────────────────────────────
+
+RULE_DESCRIPTIONS='{
+  "manifest-missing": "Each marketplace plugin must have .claude-plugin/plugin.json",
+  "json-syntax": "plugin.json must be valid JSON",
+  "required-fields": "plugin.json must define name, version, description and author",
+  "version-format": "Versions must use semantic versioning (X.Y.Z)",
+  "marketplace-sync": "plugin.json version must match marketplace.json",
+  "skill-path": "Skills must be ./-relative directories containing SKILL.md",
+  "agent-path": "Agents must be ./-relative .md files that exist",
+  "command-path": "Commands should be ./-relative .md files or an existing directory",
+  "hooks-json": "hooks/hooks.json must be valid JSON",
+  "hook-event": "Hook events must be valid Claude Code event names",
+  "hook-script": "Hook scripts under ${CLAUDE_PLUGIN_ROOT} must exist and be executable",
+  "hook-matcher": "SubagentStart/SubagentStop matchers must name existing agents",
+  "agent-frontmatter": "Agent frontmatter must be complete and reference existing skills",
+  "skill-frontmatter": "Skill frontmatter must define name and description",
+  "shell-syntax": "Shell scripts must pass bash -n"
+}'
+
+write_report() {
+  local report
+  report=$(jq -R -s \
+    --arg format "$OUTPUT_FORMAT" \
+    --arg version "$VALIDATOR_VERSION" \
+    --argjson rules "$RULE_DESCRIPTIONS" \
+    --argjson plugins "$(jq -n '$ARGS.positional' --args ${MP_PLUGINS[@]+"${MP_PLUGINS[@]}"})" '
+    ($plugins | to_entries | map({(.value): .key}) | add // {}) as $rank
+    | [split("\n")[] | select(length > 0) | split("\t")
+      | {level: .[0], plugin: .[1], rule: .[2], file: .[3], message: .[4]}]
+    | sort_by($rank[.plugin]) as $findings
+    | if $format == "json" then
+        {
+          tool: "validate-plugin-manifests",
+          version: $version,
+          plugins: $plugins,
+          errors: ($findings | map(select(.level == "error")) | length),
+          warnings: ($findings | map(select(.level == "warning")) | length),
+          notes: ($findings | map(select(.level == "note")) | length),
+          findings: $findings
+        }
+      else
+        {
+          "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+          version: "2.1.0",
+          runs: [{
+            tool: {driver: {
+              name: "validate-plugin-manifests",
+              version: $version,
+              informationUri: "https://github.com/flight505/flight505-marketplace",
+              rules: [$rules | to_entries[] | {id: .key, shortDescription: {text: .value}}]
+            }},
+            results: [$findings[] | {
+              ruleId: .rule,
+              level: .level,
+              message: {text: "\(.plugin): \(.message)"},
+              locations: [{physicalLocation: {artifactLocation: {uri: .file, uriBaseId: "%SRCROOT%"}}}]
+            }]
+          }]
+        }
+      end
+  ' "$FINDINGS_FILE")
+
+  if [ -n "$OUTPUT_FILE" ]; then
+    printf '%s\n' "$report" > "$OUTPUT_FILE"
+    echo -e "${BLUE}Wrote $OUTPUT_FORMAT report to $OUTPUT_FILE${NC}"
+  else
+    printf '%s\n' "$report" >&4
+  fi
+}
+
+# Main validation loop
+cd "$MARKETPLACE_ROOT"
+load_marketplace_model
+
+if [ "$INCREMENTAL" = true ]; then
+  mkdir -p "$CACHE_DIR"
+  VALIDATOR_FINGERPRINT="$(validator_fingerprint)"
+  # Drop verdicts nobody has used for a month
+  find "$CACHE_DIR" -type f -mtime +30 -exec rm -f {} + 2>/dev/null || true
+  # Records are built here and moved into place when complete; anything a
+  # worker leaves behind when it aborts goes with the EXIT trap
+  CACHE_TMP="$(mktemp -d "$CACHE_DIR/.tmp.XXXXXX")"
+fi
+
+run_plugins_parallel "$JOBS" "ERRORS_FOUND WARNINGS_FOUND" validate_plugin ${MP_PLUGINS[@]+"${MP_PLUGINS[@]}"}
+
+if [ "$OUTPUT_FORMAT" != "text" ]; then
+  write_report
+fi
 
 # Summary
 echo -e "${BLUE}═══════════════════════════════════════════════════${NC}"